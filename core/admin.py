@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from django.contrib import admin
 
-from .models import Budget, Category, Tag, Transaction
+from .models import Budget, CategorizationRule, Category, Tag, Transaction
 
 
 @admin.register(Category)
@@ -43,3 +43,12 @@ class BudgetAdmin(admin.ModelAdmin):
     list_filter = ("period", "start_month", "rollover")
     search_fields = ("category__name",)
     autocomplete_fields = ("user", "category")
+
+
+@admin.register(CategorizationRule)
+class CategorizationRuleAdmin(admin.ModelAdmin):
+    list_display = ("pattern", "match_type", "category", "priority", "active", "user")
+    list_filter = ("match_type", "active")
+    search_fields = ("name", "pattern")
+    autocomplete_fields = ("user", "category", "tags")
+    ordering = ("user", "priority", "id")
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+from core.concurrency import gather_queries
+from core.models import Budget, Transaction
+from core.money import from_minor
+
+ZERO = Decimal("0")
+
+
+def month_index(start: date, value: date) -> int:
+    return (value.year - start.year) * 12 + (value.month - start.month)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class BudgetMatrix:
+    """Category x month grid of budgeted and spent amounts.
+
+    Cells are stored row-major in flat lists so the whole grid can be filled
+    and combined without per-cell lookups.
+    """
+
+    months: list[date]
+    categories: list[tuple[int, str]]
+    budgeted: list[Decimal]
+    spent: list[Decimal]
+
+    @property
+    def width(self) -> int:
+        return len(self.months)
+
+    @property
+    def variance(self) -> list[Decimal]:
+        return [budget - spent for budget, spent in zip(self.budgeted, self.spent)]
+
+    def row(self, values: list[Decimal], index: int) -> list[Decimal]:
+        return values[index * self.width : (index + 1) * self.width]
+
+    def column_totals(self, values: list[Decimal]) -> list[Decimal]:
+        width = self.width
+        return [sum(values[col::width], ZERO) for col in range(width)]
+
+    def rows(self) -> list[dict]:
+        variance = self.variance
+        rows = []
+        for index, (category_id, name) in enumerate(self.categories):
+            budgeted = self.row(self.budgeted, index)
+            spent = self.row(self.spent, index)
+            row_variance = self.row(variance, index)
+            rows.append(
+                {
+                    "id": category_id,
+                    "name": name,
+                    "budgeted": budgeted,
+                    "spent": spent,
+                    "variance": row_variance,
+                    "cells": list(zip(budgeted, spent, row_variance)),
+                    "total_budgeted": sum(budgeted, ZERO),
+                    "total_spent": sum(spent, ZERO),
+                    "total_variance": sum(budgeted, ZERO) - sum(spent, ZERO),
+                }
+            )
+        return rows
+
+    def totals(self) -> dict[str, list[Decimal]]:
+        budgeted = self.column_totals(self.budgeted)
+        spent = self.column_totals(self.spent)
+        return {
+            "budgeted": budgeted,
+            "spent": spent,
+            "variance": [b - s for b, s in zip(budgeted, spent)],
+        }
+
+    def as_dict(self) -> dict:
+        def fmt(values: list[Decimal]) -> list[str]:
+            return [f"{value:.2f}" for value in values]
+
+        totals = self.totals()
+        return {
+            "months": [f"{month:%Y-%m}" for month in self.months],
+            "categories": [
+                {
+                    "id": row["id"],
+                    "name": row["name"],
+                    "budgeted": fmt(row["budgeted"]),
+                    "spent": fmt(row["spent"]),
+                    "variance": fmt(row["variance"]),
+                }
+                for row in self.rows()
+            ],
+            "totals": {key: fmt(values) for key, values in totals.items()},
+        }
+
+
+def _matrix_queries(user, start: date, end: date):
+    range_end = add_months(end, 1)
+    spent_rows = (
+        Transaction.objects.for_user(user)
+        .filter(
+            type=Transaction.Type.EXPENSE,
+            category__isnull=False,
+            date__gte=start,
+            date__lt=range_end,
+        )
+        .annotate(month=TruncMonth("date"))
+        .values("category_id", "category__name", "month")
+        .annotate(total=Sum("amount_minor"))
+        .order_by()
+    )
+    budget_rows = (
+        Budget.objects.filter(
+            user=user, start_month__gte=start, start_month__lt=range_end
+        )
+        .values("category_id", "category__name", "start_month", "amount")
+        .order_by()
+    )
+    return spent_rows, budget_rows
+
+
+def build_budget_matrix(user, start: date, end: date) -> BudgetMatrix:
+    """Build the budget-vs-actual grid for the months ``start`` to ``end``.
+
+    Runs exactly two queries: one grouped sum of expense transactions per
+    category and month, and one fetch of the budgets in range.
+    """
+    start = start.replace(day=1)
+    end = end.replace(day=1)
+    spent_rows, budget_rows = _matrix_queries(user, start, end)
+    return _assemble_matrix(start, end, spent_rows, budget_rows)
+
+
+async def abuild_budget_matrix(user, start: date, end: date) -> BudgetMatrix:
+    """``build_budget_matrix()`` with its two queries run concurrently."""
+    start = start.replace(day=1)
+    end = end.replace(day=1)
+    spent_rows, budget_rows = _matrix_queries(user, start, end)
+    spent_rows, budget_rows = await gather_queries(
+        lambda: list(spent_rows), lambda: list(budget_rows)
+    )
+    return _assemble_matrix(start, end, spent_rows, budget_rows)
+
+
+def _assemble_matrix(start: date, end: date, spent_rows, budget_rows) -> BudgetMatrix:
+    months = [
+        add_months(start, offset) for offset in range(month_index(start, end) + 1)
+    ]
+    spent_cells: list[tuple[int, int, str, Decimal]] = [
+        (
+            row["category_id"],
+            month_index(start, row["month"]),
+            row["category__name"],
+            from_minor(row["total"]),
+        )
+        for row in spent_rows
+    ]
+    budget_cells: list[tuple[int, int, str, Decimal]] = [
+        (
+            row["category_id"],
+            month_index(start, row["start_month"]),
+            row["category__name"],
+            row["amount"],
+        )
+        for row in budget_rows
+    ]
+
+    names = {
+        category_id: name for category_id, _, name, _ in spent_cells + budget_cells
+    }
+    categories = sorted(names.items(), key=lambda item: (item[1].lower(), item[0]))
+    row_index = {
+        category_id: index for index, (category_id, _) in enumerate(categories)
+    }
+
+    width = len(months)
+    size = len(categories) * width
+    budgeted = [ZERO] * size
+    spent = [ZERO] * size
+    for category_id, col, _, amount in budget_cells:
+        budgeted[row_index[category_id] * width + col] += amount
+    for category_id, col, _, amount in spent_cells:
+        spent[row_index[category_id] * width + col] += amount
+
+    return BudgetMatrix(
+        months=months, categories=categories, budgeted=budgeted, spent=spent
+    )
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from django.db.models import FloatField, Value
+from rest_framework import filters
+
+from core.search import search_transactions
+
+
+class TransactionSearchFilter(filters.SearchFilter):
+    """``?search=`` on transaction notes through the configured search backend.
+
+    Requests that order by ``search_rank`` get the backend's relevance score
+    annotated onto each row.
+    """
+
+    rank_field = "search_rank"
+
+    def filter_queryset(self, request, queryset, view):
+        term = " ".join(self.get_search_terms(request))
+        ordering = request.query_params.get(filters.OrderingFilter.ordering_param, "")
+        rank = self.rank_field in ordering
+        if not term:
+            if rank:
+                return queryset.annotate(
+                    search_rank=Value(0.0, output_field=FloatField())
+                )
+            return queryset
+        return search_transactions(queryset, term, rank=rank)
@@ -1,15 +1,111 @@
 from __future__ import annotations
 
-from rest_framework import serializers
+from collections import defaultdict
 
-from core.models import Budget, Category, Tag, Transaction
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+
+from core.bulk import BulkAction
+from core.caching import bump_data_version
+from core.live import publish_dashboard_stale
+from core.forms import TransactionFilterForm
+from core.merge import MergeError, validate_merge
+from core.models import (
+    Budget,
+    CategorizationRule,
+    Category,
+    ChangeSequence,
+    Tag,
+    Transaction,
+)
+from core.reference import reference_data_for
+from core.usage import record_usage
+
+
+class SparseFieldsetMixin:
+    """Limit read responses to the fields named in ``?fields=a,b,c``.
+
+    Unknown names are ignored and writes always use the full field set.
+    """
+
+    fields_query_param = "fields"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.requested_fields()
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+    def requested_fields(self) -> set[str] | None:
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = getattr(request, "query_params", request.GET)
+        raw = params.get(self.fields_query_param)
+        if not raw:
+            return None
+        return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+class UserReferenceField(serializers.PrimaryKeyRelatedField):
+    """Primary key field for the current user's categories or tags.
+
+    Ids resolve through the request's ``UserReferenceData`` rather than a
+    query per value; ``kind`` optionally restricts the accepted categories.
+    """
+
+    lookups = {Category: "categories_by_id", Tag: "tags_by_id"}
+
+    def __init__(self, kind: str | None = None, **kwargs):
+        self.kind = kind
+        super().__init__(**kwargs)
+
+    def get_queryset(self):
+        request = self.context.get("request")
+        queryset = super().get_queryset()
+        if request is None:
+            return queryset.none()
+        queryset = queryset.filter(user=request.user)
+        if self.kind is not None:
+            queryset = queryset.filter(kind=self.kind)
+        return queryset
+
+    def to_internal_value(self, data):
+        request = self.context.get("request")
+        if request is None:
+            return super().to_internal_value(data)
+        reference = reference_data_for(request.user)
+        objects = getattr(reference, self.lookups[self.queryset.model])
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            obj = objects.get(int(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if obj is None or (self.kind is not None and obj.kind != self.kind):
+            self.fail("does_not_exist", pk_value=data)
+        return obj
 
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ["id", "name", "kind", "color", "archived", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        fields = [
+            "id",
+            "name",
+            "kind",
+            "color",
+            "archived",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "created_at", "updated_at"]
 
     def create(self, validated_data):
         validated_data["user"] = self.context["request"].user
@@ -23,8 +119,8 @@ class CategorySerializer(serializers.ModelSerializer):
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = ["id", "name", "archived", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        fields = ["id", "name", "archived", "created_at", "updated_at"]
+        read_only_fields = ["id", "created_at", "updated_at"]
 
     def create(self, validated_data):
         validated_data["user"] = self.context["request"].user
@@ -35,13 +131,61 @@ class TagSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class TransactionSerializer(serializers.ModelSerializer):
-    category = serializers.PrimaryKeyRelatedField(
-        queryset=Category.objects.none(), allow_null=True, required=False
-    )
-    tags = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), many=True, required=False
+class TransactionListSerializer(serializers.ListSerializer):
+    """Creates many transactions with set-based writes.
+
+    Category and tag ids across the whole payload resolve through the
+    request's ``UserReferenceData`` (one query each), rows sent without a
+    category go through the user's categorization rules, and the rows are
+    written with one ``bulk_create`` plus one bulk insert of tag links, all
+    stamped with a single change sequence number.
+    """
+
+    default_max_length = 1000
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", self.default_max_length)
+        super().__init__(*args, **kwargs)
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        rows, tag_lists = [], []
+        with transaction.atomic():
+            change_seq = ChangeSequence.allocate(user.pk)
+            matcher = reference_data_for(user).rule_matcher
+            for attrs in validated_data:
+                attrs = {**attrs, "user": user}
+                tags = {tag.pk for tag in attrs.pop("tags", [])}
+                if attrs.get("category") is None and matcher:
+                    rule = matcher.match(
+                        attrs.get("notes", ""), attrs["amount"], attrs["type"]
+                    )
+                    if rule is not None:
+                        attrs["category"] = rule.category
+                        tags.update(tag.pk for tag in rule.tags)
+                tag_lists.append(tags)
+                rows.append(Transaction(change_seq=change_seq, **attrs))
+            created = Transaction.objects.bulk_create(rows, batch_size=500)
+            through = Transaction.tags.through
+            through.objects.bulk_create(
+                [
+                    through(transaction_id=row.pk, tag_id=tag_id)
+                    for row, tag_ids in zip(created, tag_lists)
+                    for tag_id in sorted(tag_ids)
+                ],
+                batch_size=1000,
+            )
+            record_usage([row.pk for row in created])
+        bump_data_version(user.pk)
+        publish_dashboard_stale(user.pk)
+        return created
+
+
+class TransactionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    category = UserReferenceField(
+        queryset=Category.objects.all(), allow_null=True, required=False
     )
+    tags = UserReferenceField(queryset=Tag.objects.all(), many=True, required=False)
 
     class Meta:
         model = Transaction
@@ -55,16 +199,10 @@ class TransactionSerializer(serializers.ModelSerializer):
             "tags",
             "notes",
             "created_at",
+            "updated_at",
         ]
-        read_only_fields = ["id", "created_at"]
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        request = self.context.get("request")
-        if request:
-            user = request.user
-            self.fields["category"].queryset = Category.objects.filter(user=user)
-            self.fields["tags"].queryset = Tag.objects.filter(user=user)
+        read_only_fields = ["id", "created_at", "updated_at"]
+        list_serializer_class = TransactionListSerializer
 
     def validate_category(self, value):
         request = self.context.get("request")
@@ -74,13 +212,6 @@ class TransactionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Category must belong to the current user."
             )
-        txn_type = self.initial_data.get("type")
-        if txn_type is None and self.instance is not None:
-            txn_type = self.instance.type
-        if txn_type and value.kind != txn_type:
-            raise serializers.ValidationError(
-                "Category kind must match transaction type."
-            )
         return value
 
     def validate_tags(self, value):
@@ -93,6 +224,19 @@ class TransactionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Tags must belong to the current user.")
         return value
 
+    def validate(self, attrs):
+        # Checked here rather than in validate_category so each item of a
+        # list write is validated against its own type.
+        category = attrs.get("category")
+        txn_type = attrs.get("type")
+        if txn_type is None and self.instance is not None:
+            txn_type = self.instance.type
+        if category is not None and txn_type and category.kind != txn_type:
+            raise serializers.ValidationError(
+                {"category": "Category kind must match transaction type."}
+            )
+        return attrs
+
     def create(self, validated_data):
         tags = validated_data.pop("tags", [])
         validated_data["user"] = self.context["request"].user
@@ -110,8 +254,163 @@ class TransactionSerializer(serializers.ModelSerializer):
         return transaction
 
 
+class TransactionRowSerializer:
+    """Read-only serializer for ``values()`` rows of transactions.
+
+    Produces the same output as ``TransactionSerializer`` (including
+    ``?fields=``) by reusing its field objects, but never builds model
+    instances, and fetches tag ids for a whole page in one query.
+    """
+
+    columns = {
+        "id": "id",
+        "type": "type",
+        "amount": "amount",
+        "currency": "currency",
+        "date": "date",
+        "category": "category_id",
+        "notes": "notes",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    # Always selected so keyset pagination can build cursors from the rows.
+    required_columns = ("id", "date", "created_at")
+
+    def __init__(self, context):
+        self.fields = TransactionSerializer(context=context).fields
+
+    def values(self, queryset):
+        names = {self.columns[name] for name in self.fields if name in self.columns}
+        names.update(self.required_columns)
+        return queryset.select_related(None).prefetch_related(None).values(*names)
+
+    def serialize(self, rows) -> list[dict]:
+        rows = list(rows)
+        tags = None
+        if "tags" in self.fields:
+            tags = tag_ids_for([row["id"] for row in rows])
+        writers = [
+            (name, self.columns.get(name), fast_representation(field))
+            for name, field in self.fields.items()
+        ]
+        output = []
+        for row in rows:
+            item = {}
+            for name, column, to_representation in writers:
+                if name == "tags":
+                    item[name] = tags.get(row["id"], [])
+                elif name == "category":
+                    item[name] = row[column]
+                else:
+                    value = row[column]
+                    item[name] = None if value is None else to_representation(value)
+            output.append(item)
+        return output
+
+
+def fast_representation(field):
+    """Return a converter equivalent to ``field.to_representation`` for the
+    plain values ``values()`` produces, hoisting per-call setup out of the
+    row loop where DRF would repeat it."""
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+        field_timezone = field.default_timezone()
+
+        def datetime_representation(value):
+            if field_timezone is not None and timezone.is_aware(value):
+                value = value.astimezone(field_timezone)
+            text = value.isoformat()
+            return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+        return datetime_representation
+    if isinstance(field, serializers.CharField):
+        return str
+    return field.to_representation
+
+
+def tag_ids_for(transaction_ids: list[int]) -> dict[int, list[int]]:
+    """Map transaction id to its tag ids, ordered like ``Tag.Meta.ordering``."""
+    if not transaction_ids:
+        return {}
+    through = Transaction.tags.through
+    rows = through.objects.filter(transaction_id__in=transaction_ids)
+    if connections[rows.db].vendor == "postgresql":
+        aggregated = (
+            rows.values("transaction_id")
+            .annotate(tag_ids=ArrayAgg("tag_id", ordering=("tag__name", "tag_id")))
+            .values_list("transaction_id", "tag_ids")
+        )
+        return dict(aggregated)
+    grouped: dict[int, list[int]] = defaultdict(list)
+    for transaction_id, tag_id in rows.order_by(
+        "transaction_id", "tag__name", "tag_id"
+    ).values_list("transaction_id", "tag_id"):
+        grouped[transaction_id].append(tag_id)
+    return grouped
+
+
+class TransactionBulkActionSerializer(serializers.Serializer):
+    """Selects transactions by ``ids`` or by a ``filter`` using the same
+    parameters as the transactions page, and names the action to apply."""
+
+    action = serializers.ChoiceField(choices=BulkAction.choices)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    filter = serializers.DictField(required=False)
+    category = UserReferenceField(
+        queryset=Category.objects.all(), allow_null=True, required=False
+    )
+    tags = UserReferenceField(queryset=Tag.objects.all(), many=True, required=False)
+    type = serializers.ChoiceField(choices=Transaction.Type.choices, required=False)
+
+    def validate_filter(self, value):
+        request = self.context.get("request")
+        form = TransactionFilterForm(value, user=request.user if request else None)
+        if not form.is_valid():
+            raise serializers.ValidationError(form.errors)
+        return form
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide exactly one of ids or filter.")
+        action = attrs["action"]
+        if action in {BulkAction.ADD_TAGS, BulkAction.REMOVE_TAGS} and not attrs.get(
+            "tags"
+        ):
+            raise serializers.ValidationError({"tags": "Choose at least one tag."})
+        if action == BulkAction.SET_TYPE and not attrs.get("type"):
+            raise serializers.ValidationError({"type": "This field is required."})
+        if action == BulkAction.SET_CATEGORY and "category" not in attrs:
+            raise serializers.ValidationError({"category": "This field is required."})
+        return attrs
+
+
+class MergeSerializer(serializers.Serializer):
+    """Names the item that the ``source`` in the context is merged into."""
+
+    def validate_target(self, target):
+        try:
+            validate_merge(self.context["source"], target)
+        except MergeError as exc:
+            raise serializers.ValidationError(str(exc)) from exc
+        return target
+
+
+class CategoryMergeSerializer(MergeSerializer):
+    target = UserReferenceField(queryset=Category.objects.all())
+
+
+class TagMergeSerializer(MergeSerializer):
+    target = UserReferenceField(queryset=Tag.objects.all())
+
+
 class BudgetSerializer(serializers.ModelSerializer):
-    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.none())
+    category = UserReferenceField(
+        queryset=Category.objects.all(), kind=Category.Kind.EXPENSE
+    )
 
     class Meta:
         model = Budget
@@ -123,17 +422,9 @@ class BudgetSerializer(serializers.ModelSerializer):
             "rollover",
             "period",
             "created_at",
+            "updated_at",
         ]
-        read_only_fields = ["id", "created_at", "period"]
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        request = self.context.get("request")
-        if request:
-            user = request.user
-            self.fields["category"].queryset = Category.objects.filter(
-                user=user, kind=Category.Kind.EXPENSE
-            )
+        read_only_fields = ["id", "created_at", "updated_at", "period"]
 
     def validate_category(self, value):
         request = self.context.get("request")
@@ -156,3 +447,63 @@ class BudgetSerializer(serializers.ModelSerializer):
         validated_data.pop("user", None)
         validated_data.pop("period", None)
         return super().update(instance, validated_data)
+
+
+class CategorizationRuleSerializer(serializers.ModelSerializer):
+    category = UserReferenceField(
+        queryset=Category.objects.all(), allow_null=True, required=False
+    )
+    tags = UserReferenceField(queryset=Tag.objects.all(), many=True, required=False)
+
+    class Meta:
+        model = CategorizationRule
+        fields = [
+            "id",
+            "name",
+            "match_type",
+            "pattern",
+            "min_amount",
+            "max_amount",
+            "category",
+            "tags",
+            "priority",
+            "active",
+            "created_at",
+        ]
+        read_only_fields = ["id", "created_at"]
+
+    def validate(self, attrs):
+        merged = {
+            field: attrs.get(field, getattr(self.instance, field, None))
+            for field in ("match_type", "pattern", "min_amount", "max_amount")
+        }
+        rule = CategorizationRule(
+            user=self.context["request"].user,
+            match_type=merged["match_type"] or CategorizationRule.MatchType.KEYWORD,
+            pattern=merged["pattern"] or "",
+            min_amount=merged["min_amount"],
+            max_amount=merged["max_amount"],
+        )
+        try:
+            rule.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(exc.message_dict) from exc
+        category = attrs.get("category", getattr(self.instance, "category", None))
+        tags = attrs.get("tags")
+        if tags is None and self.instance is not None:
+            tags = list(self.instance.tags.all())
+        if category is None and not tags:
+            raise serializers.ValidationError("Choose a category or at least one tag.")
+        return attrs
+
+    def create(self, validated_data):
+        validated_data["user"] = self.context["request"].user
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        validated_data.pop("user", None)
+        return super().update(instance, validated_data)
+
+
+class RuleApplicationSerializer(serializers.Serializer):
+    overwrite = serializers.BooleanField(default=False)
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from core.api.views import (
+    AsyncBudgetMatrixView,
+    BudgetMatrixView,
     BudgetViewSet,
+    CategorizationRuleViewSet,
     CategoryViewSet,
+    SyncView,
     TagViewSet,
     TransactionViewSet,
 )
@@ -14,5 +20,18 @@ router.register("categories", CategoryViewSet, basename="category")
 router.register("tags", TagViewSet, basename="tag")
 router.register("transactions", TransactionViewSet, basename="transaction")
 router.register("budgets", BudgetViewSet, basename="budget")
+router.register("rules", CategorizationRuleViewSet, basename="rule")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path(
+        "reports/budget-matrix/",
+        (
+            AsyncBudgetMatrixView
+            if getattr(settings, "ASYNC_VIEWS", False)
+            else BudgetMatrixView
+        ).as_view(),
+        name="report-budget-matrix",
+    ),
+    path("sync/", SyncView.as_view(), name="sync"),
+    *router.urls,
+]
@@ -1,17 +1,47 @@
 from __future__ import annotations
 
-from rest_framework import filters, permissions, viewsets
+import inspect
+from dataclasses import asdict
 
+from asgiref.sync import sync_to_async
+
+from rest_framework import filters, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.analytics import abuild_budget_matrix, build_budget_matrix
+from core.api.filters import TransactionSearchFilter
+from core.bulk import apply_bulk_action, select_transactions
 from core.api.serializers import (
     BudgetSerializer,
+    CategorizationRuleSerializer,
+    CategoryMergeSerializer,
     CategorySerializer,
+    RuleApplicationSerializer,
+    TagMergeSerializer,
     TagSerializer,
+    TransactionBulkActionSerializer,
+    TransactionRowSerializer,
     TransactionSerializer,
 )
-from core.models import Budget, Category, Tag, Transaction
+from core.forms import BudgetMatrixForm
+from core.merge import merge_categories, merge_tags
+from core.models import Budget, CategorizationRule, Category, Tag, Transaction
+from core.pagination import TransactionPagination
+from core.reference import reference_data_for
+from core.rules import apply_rules
+from core.sync import (
+    InvalidSyncToken,
+    SyncTokenExpired,
+    collect_changes,
+    parse_token,
+)
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
+    query_budget = 4
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -25,8 +55,20 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=True, methods=["post"], url_path="merge")
+    def merge(self, request, pk=None):
+        source = self.get_object()
+        serializer = CategoryMergeSerializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "source": source},
+        )
+        serializer.is_valid(raise_exception=True)
+        result = merge_categories(source, serializer.validated_data["target"])
+        return Response(asdict(result))
+
 
 class TagViewSet(viewsets.ModelViewSet):
+    query_budget = 4
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -40,13 +82,25 @@ class TagViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=True, methods=["post"], url_path="merge")
+    def merge(self, request, pk=None):
+        source = self.get_object()
+        serializer = TagMergeSerializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "source": source},
+        )
+        serializer.is_valid(raise_exception=True)
+        result = merge_tags(source, serializer.validated_data["target"])
+        return Response(asdict(result))
+
 
 class TransactionViewSet(viewsets.ModelViewSet):
+    query_budget = 6
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["notes"]
-    ordering_fields = ["date", "amount", "created_at"]
+    pagination_class = TransactionPagination
+    filter_backends = [TransactionSearchFilter, filters.OrderingFilter]
+    ordering_fields = ["date", "amount", "created_at", "search_rank"]
     ordering = ["-date", "-created_at"]
 
     def get_queryset(self):
@@ -68,11 +122,63 @@ class TransactionViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(amount__lte=params["amount__lte"])
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        # Serialize straight from values() rows rather than model instances.
+        rows = TransactionRowSerializer(self.get_serializer_context())
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(queryset))
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        created = serializer.save(user=request.user)
+        ids = [row.pk for row in created]
+        rows = TransactionRowSerializer(self.get_serializer_context())
+        by_id = {
+            item["id"]: item
+            for item in rows.serialize(
+                rows.values(Transaction.objects.filter(pk__in=ids))
+            )
+        }
+        return Response([by_id[pk] for pk in ids], status=status.HTTP_201_CREATED)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        serializer = TransactionBulkActionSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = select_transactions(
+            request.user, ids=data.get("ids"), filter_form=data.get("filter")
+        )
+        result = apply_bulk_action(
+            request.user,
+            queryset,
+            data["action"],
+            category=data.get("category"),
+            tags=data.get("tags", ()),
+            txn_type=data.get("type"),
+        )
+        return Response(
+            {
+                "action": result.action,
+                "matched": result.matched,
+                "affected": result.affected,
+            }
+        )
+
 
 class BudgetViewSet(viewsets.ModelViewSet):
+    query_budget = 4
     serializer_class = BudgetSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.OrderingFilter]
@@ -84,3 +190,142 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class CategorizationRuleViewSet(viewsets.ModelViewSet):
+    serializer_class = CategorizationRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering = ["priority", "id"]
+    ordering_fields = ["priority", "created_at"]
+
+    def get_queryset(self):
+        return CategorizationRule.objects.filter(
+            user=self.request.user
+        ).prefetch_related("tags")
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["post"], url_path="apply")
+    def apply(self, request):
+        """Run the active rules over existing transactions."""
+        serializer = RuleApplicationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = apply_rules(
+            request.user,
+            reference_data_for(request.user).rule_matcher,
+            overwrite=serializer.validated_data["overwrite"],
+        )
+        return Response(asdict(result))
+
+
+class BudgetMatrixView(APIView):
+    query_budget = 4
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        form = BudgetMatrixForm(request.query_params)
+        if not form.is_valid():
+            return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
+        matrix = build_budget_matrix(
+            request.user, form.cleaned_data["start"], form.cleaned_data["end"]
+        )
+        return Response(matrix.as_dict())
+
+
+class AsyncAPIView(APIView):
+    """``APIView`` whose handlers may be coroutines.
+
+    DRF dispatches synchronously, so authentication, permission and throttle
+    checks (which may query the database) run in a thread before the handler
+    is awaited.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(
+                self, request.method.lower(), self.http_method_not_allowed
+            )
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncBudgetMatrixView(AsyncAPIView):
+    """``BudgetMatrixView`` with its queries run concurrently."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        form = BudgetMatrixForm(request.query_params)
+        if not form.is_valid():
+            return Response(form.errors, status=status.HTTP_400_BAD_REQUEST)
+        matrix = await abuild_budget_matrix(
+            request.user, form.cleaned_data["start"], form.cleaned_data["end"]
+        )
+        return Response(matrix.as_dict())
+
+
+class SyncView(APIView):
+    """Change feed for offline clients.
+
+    ``GET /api/sync/`` without a token returns every row and a token; passing
+    it back as ``?since=`` returns only rows changed or deleted after it.
+    Keep requesting with the returned token while ``more`` is true.
+    """
+
+    query_budget = 13
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 500
+    max_limit = 5000
+
+    def get(self, request):
+        try:
+            since = parse_token(request.query_params.get("since"))
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except (InvalidSyncToken, ValueError) as exc:
+            raise ValidationError({"since": str(exc)}) from exc
+        limit = max(1, min(limit, self.max_limit))
+        try:
+            changes = collect_changes(request.user, since, limit)
+        except SyncTokenExpired as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_410_GONE)
+        except InvalidSyncToken as exc:
+            raise ValidationError({"since": str(exc)}) from exc
+
+        context = {"request": request, "view": self}
+        rows = TransactionRowSerializer(context)
+        changed = changes.changed
+        return Response(
+            {
+                "token": str(changes.token),
+                "more": changes.more,
+                "full": since is None,
+                "changes": {
+                    "categories": CategorySerializer(
+                        changed["categories"], many=True, context=context
+                    ).data,
+                    "tags": TagSerializer(
+                        changed["tags"], many=True, context=context
+                    ).data,
+                    "budgets": BudgetSerializer(
+                        changed["budgets"], many=True, context=context
+                    ).data,
+                    "transactions": rows.serialize(
+                        rows.values(changed["transactions"])
+                    ),
+                },
+                "deleted": changes.deleted,
+            }
+        )
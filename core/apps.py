@@ -10,6 +10,6 @@ class CoreConfig(AppConfig):
     def ready(self) -> None:  # pragma: no cover
         # import signal handlers here when they are created
         try:
-            from . import signals  # noqa: F401
+            from . import signals, slow_queries  # noqa: F401
         except Exception:
             pass
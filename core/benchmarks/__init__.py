@@ -0,0 +1,12 @@
+"""Synthetic datasets and timed runs of the hot views; see ``manage.py benchmark``."""
+
+from .cases import CASES, Case, Session
+from .data import DatasetSpec, delete_dataset, generate_dataset
+from .runner import (
+    BenchmarkError,
+    Regression,
+    compare_reports,
+    load_report,
+    run_benchmarks,
+    run_case,
+)
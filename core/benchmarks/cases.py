@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import io
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Category, Tag, Transaction
+from core.pagination import KEYSET_ORDERING, Cursor
+from core.views import TransactionListView
+
+from .data import MERCHANTS, DatasetSpec
+
+
+@dataclass
+class Session:
+    """A logged-in client for the benchmark user plus a few fixed rows and
+    positions for the cases to aim at."""
+
+    user: Any
+    spec: DatasetSpec
+    client: APIClient
+    import_rows: int = 500
+    rng: random.Random = field(default_factory=lambda: random.Random(0))
+    transaction_ids: list[int] = field(default_factory=list)
+    category_ids: list[int] = field(default_factory=list)
+    tag_ids: list[int] = field(default_factory=list)
+    deep_page: int = 1
+    deep_cursor: str = ""
+
+    @classmethod
+    def start(cls, user, spec: DatasetSpec, host: str, import_rows: int = 500):
+        client = APIClient(HTTP_HOST=host)
+        client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+        session = cls(user=user, spec=spec, client=client, import_rows=import_rows)
+        session.rng.seed(spec.seed)
+        transactions = Transaction.objects.for_user(user)
+        session.transaction_ids = list(
+            transactions.order_by("pk").values_list("pk", flat=True)[:1000]
+        )
+        session.category_ids = list(
+            Category.objects.filter(user=user, kind=Category.Kind.EXPENSE)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        session.tag_ids = list(
+            Tag.objects.filter(user=user).order_by("pk").values_list("pk", flat=True)
+        )
+        # "Deep" is nine tenths of the way through the unfiltered list.
+        count = transactions.count()
+        depth = count * 9 // 10
+        session.deep_page = depth // TransactionListView.paginate_by + 1
+        row = (
+            transactions.order_by(*KEYSET_ORDERING)
+            .values("date", "created_at", "id")[max(depth - 1, 0) : depth]
+            .first()
+        )
+        session.deep_cursor = Cursor.from_row(row).encode() if row else ""
+        return session
+
+    def transaction_payload(self) -> dict:
+        return {
+            "type": Transaction.Type.EXPENSE,
+            "amount": f"{self.rng.randint(100, 9999) / 100:.2f}",
+            "currency": "GBP",
+            "date": "2024-02-12",
+            "category": self.rng.choice(self.category_ids),
+            "tags": self.tag_ids[:1],
+            "notes": self.rng.choice(MERCHANTS),
+        }
+
+    def import_csv(self) -> bytes:
+        lines = ["Date,Description,Amount,Type"]
+        for _ in range(self.import_rows):
+            lines.append(
+                f"2024-03-{self.rng.randint(1, 28):02d},"
+                f"{self.rng.choice(MERCHANTS)},"
+                f"{self.rng.randint(100, 9999) / 100:.2f},DEBIT"
+            )
+        return "\n".join(lines).encode()
+
+
+@dataclass(frozen=True)
+class Case:
+    """One hot path. ``prepare`` and ``cleanup`` run untimed around each
+    timed ``request``; all the responses ``request`` returns must succeed."""
+
+    name: str
+    request: Callable[[Session, Any], list[HttpResponse]]
+    prepare: Callable[[Session], Any] = lambda session: None
+    cleanup: Callable[[Session, Any, list[HttpResponse]], None] = (
+        lambda session, state, responses: None
+    )
+
+
+def _get(url_name: str, params: Callable[[Session], dict] = lambda session: {}):
+    def request(session: Session, state) -> list[HttpResponse]:
+        return [session.client.get(reverse(url_name), params(session))]
+
+    return request
+
+
+def _import_csv(session: Session, state) -> list[HttpResponse]:
+    upload = io.BytesIO(session.import_csv())
+    upload.name = "benchmark.csv"
+    url = reverse("core:import")
+    preview = session.client.post(url, {"file": upload})
+    mapping = {
+        "Date": "date",
+        "Description": "description",
+        "Amount": "amount",
+        "Type": "type",
+    }
+    commit = session.client.post(
+        url, {"action": "commit", "mapping": json.dumps(mapping)}
+    )
+    return [preview, commit]
+
+
+def _delete_imported(session: Session, state, responses) -> None:
+    Transaction.objects.for_user(session.user).filter(created_at__gte=state).delete()
+
+
+def _now(session: Session):
+    return timezone.now()
+
+
+def _create(session: Session, state) -> list[HttpResponse]:
+    return [
+        session.client.post(
+            reverse("transaction-list"), session.transaction_payload(), format="json"
+        )
+    ]
+
+
+def _delete_created(session: Session, state, responses) -> None:
+    Transaction.objects.filter(pk=responses[0].data["id"]).delete()
+
+
+def _pick(session: Session) -> int:
+    return session.rng.choice(session.transaction_ids)
+
+
+def _retrieve(session: Session, pk: int) -> list[HttpResponse]:
+    return [session.client.get(reverse("transaction-detail", args=[pk]))]
+
+
+def _update(session: Session, pk: int) -> list[HttpResponse]:
+    return [
+        session.client.patch(
+            reverse("transaction-detail", args=[pk]),
+            {"notes": session.rng.choice(MERCHANTS)},
+            format="json",
+        )
+    ]
+
+
+def _scratch_row(session: Session) -> int:
+    return Transaction.objects.create(
+        user=session.user, type="EXPENSE", amount="1.00", date="2024-02-12"
+    ).pk
+
+
+def _destroy(session: Session, pk: int) -> list[HttpResponse]:
+    return [session.client.delete(reverse("transaction-detail", args=[pk]))]
+
+
+CASES = [
+    Case("dashboard", _get("core:dashboard")),
+    Case("reports-monthly", _get("core:reports-monthly")),
+    Case("reports-categories", _get("core:reports-categories")),
+    Case("budgets", _get("core:budgets")),
+    Case("transactions-first-page", _get("core:transactions")),
+    Case(
+        "transactions-deep-offset",
+        _get("core:transactions", lambda session: {"page": session.deep_page}),
+    ),
+    Case(
+        "transactions-deep-keyset",
+        _get("core:transactions", lambda session: {"cursor": session.deep_cursor}),
+    ),
+    Case("export-csv", _get("core:export", lambda session: {"download": "1"})),
+    Case("import-csv", _import_csv, prepare=_now, cleanup=_delete_imported),
+    Case("api-transactions-list", _get("transaction-list")),
+    Case(
+        "api-transactions-search",
+        _get("transaction-list", lambda session: {"search": "coffee"}),
+    ),
+    Case("api-transactions-retrieve", _retrieve, prepare=_pick),
+    Case("api-transactions-create", _create, cleanup=_delete_created),
+    Case("api-transactions-update", _update, prepare=_pick),
+    Case("api-transactions-destroy", _destroy, prepare=_scratch_row),
+]
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Iterator
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.analytics import add_months
+from core.bulkload import load_rows, reserve_ids
+from core.caching import bump_data_version
+from core.models import Budget, Category, ChangeSequence, Tag, Transaction
+from core.search import deferred_sqlite_fts
+from core.usage import rebuild_usage_stats
+
+INCOME_CATEGORIES = ["Salary", "Freelance", "Interest", "Refunds"]
+EXPENSE_CATEGORIES = [
+    "Groceries",
+    "Rent",
+    "Transport",
+    "Eating out",
+    "Bills",
+    "Entertainment",
+    "Health",
+    "Shopping",
+    "Travel",
+    "Subscriptions",
+    "Gifts",
+    "Education",
+    "Insurance",
+    "Home",
+    "Pets",
+    "Charity",
+]
+MERCHANTS = [
+    "Tesco",
+    "Sainsbury's",
+    "Pret A Manger",
+    "Costa Coffee",
+    "Shell fuel",
+    "Amazon Marketplace",
+    "Netflix subscription",
+    "Council tax",
+    "Rent payment",
+    "Uber trip",
+    "Deliveroo order",
+    "Boots pharmacy",
+    "Gym membership",
+    "Train ticket",
+]
+TAG_NAMES = ["shared", "work", "holiday", "recurring", "cash", "refundable"]
+TRANSACTION_COLUMNS = (
+    "id",
+    "user_id",
+    "updated_at",
+    "change_seq",
+    "type",
+    "amount",
+    "amount_minor",
+    "signed_amount_minor",
+    "currency",
+    "date",
+    "category_id",
+    "notes",
+    "created_at",
+)
+AMOUNT_POOL_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Shape of one synthetic user's data. The same spec and seed always
+    produce the same rows."""
+
+    transactions: int = 10_000
+    categories: int = 12
+    tags: int = 12
+    months: int = 24
+    income_share: float = 0.1
+    tagged_share: float = 0.3
+    seed: int = 42
+    batch_size: int = 10_000
+
+
+def _category_names(spec: DatasetSpec) -> list[tuple[str, str]]:
+    income = max(1, spec.categories // 4)
+    names = [(name, Category.Kind.INCOME) for name in INCOME_CATEGORIES[:income]]
+    for index in range(spec.categories - len(names)):
+        base = EXPENSE_CATEGORIES[index % len(EXPENSE_CATEGORIES)]
+        suffix = index // len(EXPENSE_CATEGORIES)
+        names.append(
+            (f"{base} {suffix + 1}" if suffix else base, Category.Kind.EXPENSE)
+        )
+    return names
+
+
+def _tag_names(spec: DatasetSpec) -> list[str]:
+    return [
+        TAG_NAMES[index % len(TAG_NAMES)]
+        + (f" {index // len(TAG_NAMES) + 1}" if index >= len(TAG_NAMES) else "")
+        for index in range(spec.tags)
+    ]
+
+
+def _amounts(rng: random.Random, scale: int) -> list[tuple[object, int]]:
+    """A pool of (adapted amount, minor units) skewed towards small values,
+    like real spending."""
+    pool = []
+    for _ in range(AMOUNT_POOL_SIZE):
+        minor = int(rng.lognormvariate(7, 1.2) * scale) + 1
+        amount = connection.ops.adapt_decimalfield_value(
+            Decimal(minor).scaleb(-2), 12, 2
+        )
+        pool.append((amount, minor))
+    return pool
+
+
+def _transaction_rows(
+    user, spec, rng, ids, start, days, income, expense, tags, change_seq, links
+) -> Iterator[tuple]:
+    """Rows in ``TRANSACTION_COLUMNS`` order, already adapted for the
+    database; tag links are appended to ``links`` as rows are produced."""
+    ops = connection.ops
+    now = ops.adapt_datetimefield_value(timezone.now())
+    dates = [
+        ops.adapt_datefield_value(start + timedelta(days=offset))
+        for offset in range(days)
+    ]
+    pools = {
+        Transaction.Type.INCOME: _amounts(rng, 4),
+        Transaction.Type.EXPENSE: _amounts(rng, 1),
+    }
+    for pk in ids:
+        if rng.random() < spec.income_share:
+            kind, category, sign = Transaction.Type.INCOME, rng.choice(income), 1
+        else:
+            kind, category, sign = Transaction.Type.EXPENSE, rng.choice(expense), -1
+        amount, minor = pools[kind][rng.randrange(AMOUNT_POOL_SIZE)]
+        if tags and rng.random() < spec.tagged_share:
+            for tag in rng.sample(tags, rng.randint(1, min(2, len(tags)))):
+                links.append((pk, tag.pk))
+        yield (
+            pk,
+            user.pk,
+            now,
+            change_seq,
+            kind,
+            amount,
+            minor,
+            sign * minor,
+            "GBP",
+            dates[rng.randrange(days)],
+            category.pk,
+            f"{rng.choice(MERCHANTS)} #{rng.randrange(10_000)}",
+            now,
+        )
+
+
+def generate_dataset(user, spec: DatasetSpec) -> None:
+    """Fill ``user``'s account with categories, tags, a year of monthly
+    budgets and ``spec.transactions`` transactions over ``spec.months``.
+
+    Transactions and their tag links skip the ORM and go through
+    ``core.bulkload``, so signals do not run: usage stats are rebuilt once
+    at the end and every row shares one change sequence number.
+    """
+    rng = random.Random(spec.seed)
+    today = timezone.localdate()
+    start = add_months(today.replace(day=1), 1 - spec.months)
+    days = (today - start).days + 1
+    with transaction.atomic():
+        categories = [
+            Category.objects.create(user=user, name=name, kind=kind)
+            for name, kind in _category_names(spec)
+        ]
+        income = [c for c in categories if c.kind == Category.Kind.INCOME]
+        expense = [c for c in categories if c.kind == Category.Kind.EXPENSE]
+        tags = [Tag.objects.create(user=user, name=name) for name in _tag_names(spec)]
+        first_budget = add_months(today.replace(day=1), -11)
+        Budget.objects.bulk_create(
+            Budget(
+                user=user,
+                category=category,
+                start_month=add_months(first_budget, offset),
+                amount=Decimal(rng.randint(100, 1500)),
+            )
+            for category in expense
+            for offset in range(12)
+        )
+
+        change_seq = ChangeSequence.allocate(user.pk)
+        ids = reserve_ids(Transaction._meta.db_table, spec.transactions)
+        links: list[tuple[int, int]] = []
+        rows = _transaction_rows(
+            user, spec, rng, ids, start, days, income, expense, tags, change_seq, links
+        )
+        with deferred_sqlite_fts(connection):
+            load_rows(
+                Transaction._meta.db_table,
+                TRANSACTION_COLUMNS,
+                rows,
+                batch_size=spec.batch_size,
+            )
+        load_rows(
+            Transaction.tags.through._meta.db_table,
+            ("transaction_id", "tag_id"),
+            links,
+            batch_size=spec.batch_size,
+        )
+        rebuild_usage_stats(user)
+    bump_data_version(user.pk)
+
+
+def delete_dataset(user) -> None:
+    """Remove everything ``generate_dataset`` (and the cases) created."""
+    with transaction.atomic():
+        Transaction.tags.through.objects.filter(transaction__user=user).delete()
+        # A raw DELETE avoids loading every row through the deletion collector.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Transaction._meta.db_table} WHERE user_id = %s",
+                [user.pk],
+            )
+        Budget.objects.filter(user=user).delete()
+        Tag.objects.filter(user=user).delete()
+        Category.objects.filter(user=user).delete()
+    bump_data_version(user.pk)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from core.instrumentation import recording_queries
+
+from .cases import Case, Session
+from .data import DatasetSpec
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class BenchmarkError(RuntimeError):
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Linearly interpolated percentile of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class CaseResult:
+    name: str
+    timings_ms: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        summary = {"name": self.name, "iterations": len(self.timings_ms)}
+        for pct in PERCENTILES:
+            summary[f"p{pct}_ms"] = round(percentile(self.timings_ms, pct), 3)
+        summary["mean_ms"] = round(sum(self.timings_ms) / len(self.timings_ms), 3)
+        summary["min_ms"] = round(min(self.timings_ms), 3)
+        summary["max_ms"] = round(max(self.timings_ms), 3)
+        summary["queries"] = max(self.queries)
+        return summary
+
+
+def run_case(
+    case: Case, session: Session, iterations: int, warmup: int = 0
+) -> CaseResult:
+    result = CaseResult(case.name)
+    for iteration in range(warmup + iterations):
+        state = case.prepare(session)
+        with recording_queries() as stats:
+            started = time.perf_counter()
+            responses = case.request(session, state)
+            elapsed = (time.perf_counter() - started) * 1000
+        for response in responses:
+            if response.status_code >= 400:
+                raise BenchmarkError(
+                    f"{case.name}: {response.request['REQUEST_METHOD']} "
+                    f"{response.request['PATH_INFO']} returned "
+                    f"{response.status_code}",
+                    status_code=response.status_code,
+                )
+        case.cleanup(session, state, responses)
+        if iteration >= warmup:
+            result.timings_ms.append(elapsed)
+            result.queries.append(stats.count)
+    return result
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(settings.BASE_DIR),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "commit": commit,
+        "recorded_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "async_views": getattr(settings, "ASYNC_VIEWS", False),
+    }
+
+
+def run_benchmarks(
+    session: Session, cases: list[Case], iterations: int, warmup: int = 0
+) -> dict:
+    """Run ``cases`` and return a JSON-ready report."""
+    return {
+        "environment": environment(),
+        "dataset": asdict(session.spec),
+        "results": [
+            run_case(case, session, iterations, warmup).summary() for case in cases
+        ],
+    }
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.metric} {self.baseline:g} -> {self.current:g}"
+
+
+def compare_reports(
+    baseline: dict, current: dict, tolerance: float = 0.1, metric: str = "p95_ms"
+) -> list[Regression]:
+    """Cases whose ``metric`` grew by more than ``tolerance`` (a fraction) or
+    that run more queries than in ``baseline``."""
+    before = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        if result[metric] > old[metric] * (1 + tolerance):
+            regressions.append(
+                Regression(result["name"], metric, old[metric], result[metric])
+            )
+        if result["queries"] > old["queries"]:
+            regressions.append(
+                Regression(result["name"], "queries", old["queries"], result["queries"])
+            )
+    return regressions
+
+
+def load_report(path: str) -> dict:
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from django.db import connections, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .live import publish_dashboard_stale
+from .models import Category, ChangeSequence, Tag, Transaction
+from .sync import record_deletions
+from .usage import tracking_usage
+
+
+class BulkAction(models.TextChoices):
+    SET_CATEGORY = "set_category", "Set category"
+    ADD_TAGS = "add_tags", "Add tags"
+    REMOVE_TAGS = "remove_tags", "Remove tags"
+    SET_TYPE = "set_type", "Change type"
+    DELETE = "delete", "Delete"
+
+
+@dataclass(frozen=True)
+class BulkResult:
+    action: str
+    matched: int
+    affected: int
+
+
+def select_transactions(user, ids: Iterable[int] | None = None, filter_form=None):
+    """Resolve a bulk selection to a plain queryset of the user's transactions.
+
+    The selection is reduced to an ``id IN (subquery)`` filter so the set-based
+    statements below never carry joins or ``DISTINCT`` from the filters.
+    """
+    queryset = Transaction.objects.for_user(user)
+    if filter_form is not None:
+        queryset = filter_form.filter_queryset(queryset)
+    if ids is not None:
+        queryset = queryset.filter(id__in=list(ids))
+    return Transaction.objects.for_user(user).filter(
+        id__in=queryset.order_by().values("id")
+    )
+
+
+def apply_bulk_action(
+    user,
+    queryset,
+    action: str,
+    *,
+    category: Category | None = None,
+    tags: Iterable[Tag] = (),
+    txn_type: str | None = None,
+) -> BulkResult:
+    """Apply ``action`` to every transaction in ``queryset`` with set-based SQL.
+
+    ``queryset`` must already be scoped to ``user`` (see
+    ``select_transactions``). Category and tag arguments are expected to be
+    validated as belonging to the user. Every row changed by one call shares
+    a single change sequence number.
+    """
+    tag_ids = [tag.pk for tag in tags]
+    if action not in BulkAction.values:
+        raise ValueError(f"Unknown bulk action: {action}")
+    with transaction.atomic():
+        selected_ids = list(queryset.values_list("id", flat=True))
+        matched = len(selected_ids)
+        stamp = {
+            "change_seq": ChangeSequence.allocate(user.pk),
+            "updated_at": timezone.now(),
+        }
+        with tracking_usage(selected_ids):
+            if action == BulkAction.SET_CATEGORY:
+                affected = _set_category(queryset, category, stamp)
+            elif action == BulkAction.ADD_TAGS:
+                affected = _add_tags(queryset, tag_ids, stamp)
+            elif action == BulkAction.REMOVE_TAGS:
+                affected = _remove_tags(queryset, tag_ids, stamp)
+            elif action == BulkAction.SET_TYPE:
+                affected = _set_type(queryset, txn_type, stamp)
+            else:
+                affected = _delete(user, queryset, stamp)
+    if affected:
+        bump_data_version(user.pk)
+        if action not in (BulkAction.ADD_TAGS, BulkAction.REMOVE_TAGS):
+            publish_dashboard_stale(user.pk)
+    return BulkResult(action=action, matched=matched, affected=affected)
+
+
+def _set_category(queryset, category: Category | None, stamp: dict) -> int:
+    if category is None:
+        return queryset.exclude(category__isnull=True).update(category=None, **stamp)
+    # Only transactions whose type matches the category kind can take it.
+    return (
+        queryset.filter(type=category.kind)
+        .exclude(category=category)
+        .update(category=category, **stamp)
+    )
+
+
+def _set_type(queryset, txn_type: str, stamp: dict) -> int:
+    changing = queryset.exclude(type=txn_type)
+    # Categories of the old kind no longer fit, so clear them first.
+    changing.filter(category__isnull=False).exclude(category__kind=txn_type).update(
+        category=None
+    )
+    sign = 1 if txn_type == Transaction.Type.INCOME else -1
+    return changing.update(
+        type=txn_type, signed_amount_minor=F("amount_minor") * sign, **stamp
+    )
+
+
+def _add_tags(queryset, tag_ids: list[int], stamp: dict) -> int:
+    if not tag_ids:
+        return 0
+    through = Transaction.tags.through
+    transaction_ids = list(queryset.values_list("id", flat=True))
+    existing = through.objects.filter(
+        transaction_id__in=queryset.values("id"), tag_id__in=tag_ids
+    ).count()
+    through.objects.bulk_create(
+        [
+            through(transaction_id=transaction_id, tag_id=tag_id)
+            for transaction_id in transaction_ids
+            for tag_id in tag_ids
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    added = len(transaction_ids) * len(tag_ids) - existing
+    if added:
+        queryset.update(**stamp)
+    return added
+
+
+def _remove_tags(queryset, tag_ids: list[int], stamp: dict) -> int:
+    if not tag_ids:
+        return 0
+    links = Transaction.tags.through.objects.filter(
+        transaction_id__in=queryset.values("id"), tag_id__in=tag_ids
+    ).order_by()
+    queryset.filter(id__in=links.values("transaction_id")).update(**stamp)
+    deleted, _ = links.delete()
+    return deleted
+
+
+def _delete(user, queryset, stamp: dict) -> int:
+    record_deletions(
+        user.pk,
+        Transaction._meta.model_name,
+        queryset.values_list("id", flat=True),
+        stamp["change_seq"],
+    )
+    Transaction.tags.through.objects.filter(
+        transaction_id__in=queryset.values("id")
+    ).order_by().delete()
+    # One set-based DELETE skips loading every row into the deletion
+    # collector; the tag links, the only dependent rows, are already gone.
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    table = quote(Transaction._meta.db_table)
+    pk = quote(Transaction._meta.pk.column)
+    selected, params = (
+        queryset.order_by().values("id").query.get_compiler(queryset.db).as_sql()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({selected})", params)
+        return cursor.rowcount
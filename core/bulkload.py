@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def supports_copy(connection) -> bool:
+    """Whether ``load_rows`` streams through ``COPY`` on ``connection``."""
+    if connection.vendor != "postgresql":
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    return is_psycopg3
+
+
+def reserve_ids(table: str, count: int, using: str = DEFAULT_DB_ALIAS) -> list[int]:
+    """Claim ``count`` primary keys, in ascending order, for rows inserted
+    with explicit ids, so rows referring to them can be written in the same
+    pass.
+
+    Must run inside the transaction that inserts the rows.
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Each nextval() is atomic: concurrent inserts may take ids
+            # between ours, but never one of ours.
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [table, count],
+            )
+            return sorted(row[0] for row in cursor.fetchall())
+
+        # AUTOINCREMENT tables never reuse the ids of deleted rows (sync
+        # tombstones still refer to them), so count on from sqlite_sequence.
+        # Advancing it takes the write lock, which holds until commit.
+        quoted = connection.ops.quote_name(table)
+        cursor.execute(
+            "SELECT MAX("
+            "COALESCE((SELECT seq FROM sqlite_sequence WHERE name = %s), 0), "
+            f"COALESCE((SELECT MAX(id) FROM {quoted}), 0))",
+            [table],
+        )
+        first = cursor.fetchone()[0] + 1
+        last = first + count - 1
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = %s WHERE name = %s", [last, table]
+        )
+        if not cursor.rowcount:
+            cursor.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                [table, last],
+            )
+    return list(range(first, last + 1))
+
+
+def load_rows(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+    using: str = DEFAULT_DB_ALIAS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Write ``rows`` straight into ``table``, bypassing model instances and
+    signals. Postgres streams them through ``COPY FROM STDIN``; other
+    backends get one prepared INSERT run with ``executemany`` per batch.
+    Returns the number of rows written.
+    """
+    connection = connections[using]
+    quoted = connection.ops.quote_name(table)
+    names = ", ".join(connection.ops.quote_name(column) for column in columns)
+    written = 0
+    with connection.cursor() as cursor:
+        if supports_copy(connection):
+            with cursor.cursor.copy(f"COPY {quoted} ({names}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    written += 1
+            return written
+
+        placeholders = ", ".join(["%s"] * len(columns))
+        sql = f"INSERT INTO {quoted} ({names}) VALUES ({placeholders})"
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            written += len(batch)
+    return written
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from fnmatch import translate
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+from .metrics import cache_lookup
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class Compressed:
+    """A zlib-compressed pickle, as stored in the shared tier."""
+
+    payload: bytes
+
+
+class LocalLRU:
+    """A bounded, thread-safe LRU of pickled values with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, data = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def set(self, key: str, value, seconds: float) -> None:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + seconds, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+# Shared by every TieredCache instance of the same alias in this process;
+# Django creates one backend instance per thread.
+_locals: dict[str, LocalLRU] = {}
+_flights: dict[str, threading.Event] = {}
+_registry_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    """A per-process LRU in front of a shared cache every worker sees.
+
+    ``OPTIONS``:
+
+    - ``SHARED``: alias of the shared tier in ``CACHES`` (file, database or
+      Redis backend).
+    - ``LOCAL_MAX_ENTRIES`` / ``LOCAL_TIMEOUT``: size of the in-process tier
+      and how many seconds an entry may be served from it. Other workers'
+      writes become visible once it expires.
+    - ``LOCAL_SKIP``: glob patterns for keys that always go to the shared
+      tier, such as the data versions other keys are derived from.
+    - ``COMPRESS_MIN_BYTES`` / ``COMPRESS_LEVEL``: values whose pickle is at
+      least this large are zlib-compressed in the shared tier.
+    - ``LOCK_TIMEOUT``: how long ``get_or_set()`` waits for another worker
+      computing the same value before computing it itself.
+
+    What holds across workers depends on the shared tier:
+
+    - Redis: ``incr()`` and the ``get_or_set()`` lock (``add()``) are atomic.
+    - Files: the ``get_or_set()`` lock is an ``flock()`` on a lock file, so
+      it covers every worker on the host (other platforms fall back to
+      ``add()``). ``incr()`` reads and then writes.
+    - Database: ``incr()`` reads and then writes. The lock is an ``add()``,
+      an INSERT guarded by the primary key, except that replacing an
+      expired lock row can race and let two workers compute.
+
+    Integers go to the shared tier as they are, so Redis can ``incr()``
+    them. Anything that must not lose updates should not count with
+    ``incr()`` on the other tiers; ``core.caching`` writes fresh data
+    versions instead.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.name = name
+        self.shared_alias = options.get("SHARED", "shared")
+        self.local_timeout = float(options.get("LOCAL_TIMEOUT", 5))
+        self.local_skip = re.compile(
+            "|".join(translate(pattern) for pattern in options.get("LOCAL_SKIP", ()))
+            or r"(?!)"
+        )
+        self.compress_min_bytes = int(options.get("COMPRESS_MIN_BYTES", 1024))
+        self.compress_level = int(options.get("COMPRESS_LEVEL", 6))
+        self.lock_timeout = float(options.get("LOCK_TIMEOUT", 10))
+        with _registry_lock:
+            self.local = _locals.setdefault(
+                name, LocalLRU(int(options.get("LOCAL_MAX_ENTRIES", 1000)))
+            )
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.shared_alias]
+
+    def _local_key(self, key, version) -> str | None:
+        key = self.make_and_validate_key(key, version=version)
+        if self.local_timeout <= 0 or self.local_skip.match(key):
+            return None
+        return key
+
+    def _remember(self, local_key, value, timeout) -> None:
+        if local_key is None:
+            return
+        if timeout is not None and timeout <= 0:
+            self.local.delete(local_key)
+            return
+        seconds = self.local_timeout
+        if timeout is not None:
+            seconds = min(seconds, timeout)
+        self.local.set(local_key, value, seconds)
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _pack(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) < self.compress_min_bytes:
+            return value
+        return Compressed(zlib.compress(data, self.compress_level))
+
+    def _unpack(self, value):
+        if isinstance(value, Compressed):
+            return pickle.loads(zlib.decompress(value.payload))
+        return value
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            value = self.local.get(local_key)
+            cache_lookup("local_tier", value is not _MISSING)
+            if value is not _MISSING:
+                return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        value = self._unpack(value)
+        self._remember(local_key, value, self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        self.shared.set(key, self._pack(value), timeout, version=version)
+        self._remember(self._local_key(key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        added = self.shared.add(key, self._pack(value), timeout, version=version)
+        if added:
+            self._remember(self._local_key(key, version), value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        local_key = self._local_key(key, version)
+        if local_key is not None and timeout is not None and timeout <= 0:
+            self.local.delete(local_key)
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self.local.delete(local_key)
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        local_key = self._local_key(key, version)
+        if local_key is not None:
+            self.local.delete(local_key)
+        return value
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """Return ``key``, computing a callable ``default`` on a miss.
+
+        Concurrent misses compute the value once: threads of this process
+        wait for the first one, and other processes wait on a lock key in
+        the shared tier for up to ``LOCK_TIMEOUT`` seconds.
+        """
+        value = self.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        if not callable(default):
+            return super().get_or_set(key, default, timeout, version)
+
+        flight_key = self.make_and_validate_key(key, version=version)
+        with _registry_lock:
+            flight = _flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = _flights[flight_key] = threading.Event()
+        if not leader:
+            flight.wait(self.lock_timeout)
+            value = self.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+            return self._compute(key, default, timeout, version)
+        try:
+            return self._compute(key, default, timeout, version)
+        finally:
+            with _registry_lock:
+                _flights.pop(flight_key, None)
+            flight.set()
+
+    def _compute(self, key, default, timeout, version):
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            with self._shared_lock(key, version) as locked:
+                if locked:
+                    # The previous holder may have just stored it.
+                    value = self.get(key, _MISSING, version=version)
+                    if value is not _MISSING:
+                        return value
+                if locked or time.monotonic() >= deadline:
+                    value = default()
+                    self.set(key, value, timeout, version=version)
+                    return value
+            time.sleep(0.05)
+            value = self.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+
+    @contextmanager
+    def _shared_lock(self, key, version):
+        """Try, without blocking, to become the one worker computing
+        ``key``; yields whether it succeeded."""
+        if fcntl is not None and isinstance(self.shared, FileBasedCache):
+            name = self.shared.make_and_validate_key(key, version=version)
+            digest = hashlib.md5(name.encode(), usedforsecurity=False).hexdigest()
+            # FileBasedCache has no public accessor for its directory.
+            os.makedirs(self.shared._dir, 0o700, exist_ok=True)
+            path = os.path.join(self.shared._dir, f"{digest}.lock")
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    # A worker that opened the file before the unlink may
+                    # still lock it; it finds the value stored and uses it.
+                    with suppress(FileNotFoundError):
+                        os.unlink(path)
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+            return
+
+        lock_key = f"{key}:lock"
+        locked = self.shared.add(lock_key, 1, self.lock_timeout, version=version)
+        try:
+            yield locked
+        finally:
+            if locked:
+                self.shared.delete(lock_key, version=version)
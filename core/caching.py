@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+
+from django.core.cache import cache
+
+from .metrics import cache_lookup
+
+
+def user_key(user_id: int, name: str, *parts) -> str:
+    """Cache key for ``name`` in ``user_id``'s namespace."""
+    return ":".join(["finance", "user", str(user_id), name, *map(str, parts)])
+
+
+def get_data_version(user_id: int) -> int:
+    """Return the current data version for a user's transactions.
+
+    The version changes whenever the user's transactions change, so it can be
+    folded into cache keys for anything derived from them.
+    """
+    key = user_key(user_id, "data-version")
+    version = cache.get(key)
+    cache_lookup("data_version", version is not None)
+    if version is None:
+        # Seed from the clock so an evicted key never reuses an old version.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_data_version(user_id: int) -> None:
+    # A fresh value rather than incr(), which file and database cache tiers
+    # run as a read then a write: two concurrent bumps could both write the
+    # same next version, one already used for data missing the other write.
+    cache.set(user_key(user_id, "data-version"), time.time_ns(), None)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def _on_worker_connection(query: Callable[[], Any]) -> Callable[[], Any]:
+    def run():
+        try:
+            return query()
+        finally:
+            # Worker threads never see request_finished, so apply the same
+            # CONN_MAX_AGE and health rules to their connections here.
+            close_old_connections()
+
+    return run
+
+
+async def gather_queries(*queries: Callable[[], Any]) -> list[Any]:
+    """Run independent, read-only ORM calls at the same time.
+
+    Django's async queryset methods all run on the one thread reserved for
+    the current request, so gathering them still sends the queries one after
+    another. Each call here runs in a worker thread, and therefore on a
+    database connection, of its own. The calls must return evaluated results
+    (lists, dicts), and cannot see uncommitted writes made by the caller.
+    """
+    return list(
+        await asyncio.gather(
+            *(
+                sync_to_async(_on_worker_connection(query), thread_sensitive=False)()
+                for query in queries
+            )
+        )
+    )
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+
+STALE = "stale"
+
+
+@dataclass(frozen=True)
+class Event:
+    name: str
+    data: dict
+
+    def encode(self) -> bytes:
+        """The event as a server-sent events frame."""
+        payload = json.dumps(self.data, cls=DjangoJSONEncoder, separators=(",", ":"))
+        return f"event: {self.name}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    def __init__(self, queue: asyncio.Queue):
+        self._queue = queue
+
+    async def get(self) -> Event:
+        return await self._queue.get()
+
+
+def _offer(queue: asyncio.Queue, event: Event) -> None:
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # The subscriber fell behind; drop its backlog and tell it to reload.
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(Event(STALE, {}))
+
+
+class InProcessBroker:
+    """Per-user publish/subscribe within one server process.
+
+    ``publish()`` may be called from any thread; subscribers are async and
+    each gets a bounded queue on its own event loop. Events published by
+    other processes are not seen, see ``PostgresBroker`` for that.
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[tuple]] = {}
+
+    def publish(self, user_id: int, name: str, data: dict) -> None:
+        self._deliver(user_id, Event(name, data))
+
+    def _deliver(self, user_id: int, event: Event) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:  # The subscriber's loop has closed.
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[Subscription]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        key = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(key)
+        try:
+            yield Subscription(queue)
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(user_id, set())
+                subscribers.discard(key)
+                if not subscribers:
+                    self._subscribers.pop(user_id, None)
+
+
+class PostgresBroker(InProcessBroker):
+    """Share events between server processes with Postgres LISTEN/NOTIFY.
+
+    Publishing sends a NOTIFY on the default database. Each process holds
+    one listening connection, opened by its first subscriber, and hands the
+    notifications to its local subscribers.
+    """
+
+    channel = "finance_events"
+    retry_seconds = 1
+
+    def __init__(self):
+        super().__init__()
+        self._listener: asyncio.Task | None = None
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != "postgresql":
+            raise ImproperlyConfigured("PostgresBroker needs a PostgreSQL database.")
+
+    def publish(self, user_id: int, name: str, data: dict) -> None:
+        payload = json.dumps(
+            {"user": user_id, "name": name, "data": data}, cls=DjangoJSONEncoder
+        )
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[Subscription]:
+        loop = asyncio.get_running_loop()
+        if (
+            self._listener is None
+            or self._listener.done()
+            or self._listener.get_loop() is not loop
+        ):
+            self._listener = loop.create_task(self._listen())
+        async with super().subscribe(user_id) as subscription:
+            yield subscription
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        params = connections[DEFAULT_DB_ALIAS].settings_dict
+        conninfo = {
+            "dbname": params["NAME"],
+            "user": params["USER"],
+            "password": params["PASSWORD"],
+            "host": params["HOST"],
+            "port": params["PORT"],
+        }
+        conninfo = {key: value for key, value in conninfo.items() if value}
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    autocommit=True, **conninfo
+                ) as connection:
+                    await connection.execute(f"LISTEN {self.channel}")
+                    async for notify in connection.notifies():
+                        message = json.loads(notify.payload)
+                        self._deliver(
+                            message["user"], Event(message["name"], message["data"])
+                        )
+            except psycopg.OperationalError:
+                # Anything sent while reconnecting is lost; have every local
+                # subscriber reload instead.
+                with self._lock:
+                    user_ids = list(self._subscribers)
+                for user_id in user_ids:
+                    self._deliver(user_id, Event(STALE, {}))
+                await asyncio.sleep(self.retry_seconds)
+
+
+@lru_cache(maxsize=None)
+def _broker(path: str):
+    return import_string(path)()
+
+
+def get_broker():
+    return _broker(getattr(settings, "EVENT_BROKER", "core.events.InProcessBroker"))
+
+
+def publish_on_commit(user_id: int, name: str, data: dict) -> None:
+    """Publish once the current transaction commits (at once outside one)."""
+    transaction.on_commit(lambda: get_broker().publish(user_id, name, data))
@@ -4,9 +4,90 @@ from decimal import Decimal
 from typing import Iterable, Optional
 
 from django import forms
+from django.db import models
 from django.db.models import Q
+from django.forms.models import ModelChoiceIterator
+from django.http import QueryDict
+from django.utils import timezone
 
+from .analytics import add_months, month_index
+from .bulk import BulkAction, BulkResult, apply_bulk_action, select_transactions
+from .merge import MergeError, MergeResult, merge_categories, merge_tags, validate_merge
 from .models import Budget, Category, Tag, Transaction
+from .reference import reference_data_for
+from .search import search_transactions
+
+
+class ReferenceChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        objects = self.field.objects
+        if objects is None:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in objects:
+            yield self.choice(obj)
+
+    def __len__(self):
+        if self.field.objects is None:
+            return super().__len__()
+        return len(self.field.objects) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        if self.field.objects is None:
+            return super().__bool__()
+        return self.field.empty_label is not None or bool(self.field.objects)
+
+
+class ReferenceChoiceMixin:
+    """Serve choices and validation from a preloaded list of objects.
+
+    Until ``set_objects`` is called the field behaves like its queryset-based
+    parent; afterwards rendering and cleaning run no queries.
+    """
+
+    iterator = ReferenceChoiceIterator
+    objects = None
+
+    def set_objects(self, objects: Iterable[models.Model]) -> None:
+        self.objects = list(objects)
+        self._objects_by_key = {str(obj.pk): obj for obj in self.objects}
+        self.widget.choices = self.choices
+
+    def lookup(self, value) -> models.Model:
+        key = value.pk if isinstance(value, models.Model) else value
+        obj = self._objects_by_key.get(str(key))
+        if obj is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return obj
+
+
+class ReferenceModelChoiceField(ReferenceChoiceMixin, forms.ModelChoiceField):
+    def to_python(self, value):
+        if self.objects is None:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        return self.lookup(value)
+
+
+class ReferenceModelMultipleChoiceField(
+    ReferenceChoiceMixin, forms.ModelMultipleChoiceField
+):
+    def _check_values(self, value):
+        if self.objects is None:
+            return super()._check_values(value)
+        selected = []
+        for item in value:
+            obj = self.lookup(item)
+            if obj not in selected:
+                selected.append(obj)
+        return selected
 
 
 class CategoryForm(forms.ModelForm):
@@ -21,8 +102,43 @@ class TagForm(forms.ModelForm):
         fields = ["name", "archived"]
 
 
+class MergeForm(forms.Form):
+    target = ReferenceModelChoiceField(queryset=Category.objects.none())
+
+    def __init__(self, *args, source, candidates, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source = source
+        self.fields["target"].set_objects(
+            obj for obj in candidates if obj.pk != source.pk
+        )
+        self.fields["target"].widget.attrs["class"] = "form-select"
+
+    def clean_target(self):
+        target = self.cleaned_data["target"]
+        try:
+            validate_merge(self.source, target)
+        except MergeError as exc:
+            raise forms.ValidationError(str(exc)) from exc
+        return target
+
+
+class CategoryMergeForm(MergeForm):
+    def merge(self) -> MergeResult:
+        return merge_categories(self.source, self.cleaned_data["target"])
+
+
+class TagMergeForm(MergeForm):
+    target = ReferenceModelChoiceField(queryset=Tag.objects.none())
+
+    def merge(self) -> MergeResult:
+        return merge_tags(self.source, self.cleaned_data["target"])
+
+
 class TransactionForm(forms.ModelForm):
-    tags = forms.ModelMultipleChoiceField(
+    category = ReferenceModelChoiceField(
+        queryset=Category.objects.none(), required=False
+    )
+    tags = ReferenceModelMultipleChoiceField(
         queryset=Tag.objects.none(),
         required=False,
         widget=forms.SelectMultiple(attrs={"class": "form-select"}),
@@ -39,10 +155,9 @@ class TransactionForm(forms.ModelForm):
     def __init__(self, *args, user=None, **kwargs):
         super().__init__(*args, **kwargs)
         if user is not None:
-            self.fields["category"].queryset = Category.objects.filter(
-                user=user, archived=False
-            )
-            self.fields["tags"].queryset = Tag.objects.filter(user=user, archived=False)
+            reference = reference_data_for(user)
+            self.fields["category"].set_objects(reference.active_categories())
+            self.fields["tags"].set_objects(reference.active_tags())
         self.fields["amount"].min_value = Decimal("0.01")
 
     def clean_category(self) -> Optional[Category]:
@@ -60,8 +175,10 @@ class TransactionFilterForm(forms.Form):
     end = forms.DateField(
         required=False, widget=forms.DateInput(attrs={"type": "date"})
     )
-    category = forms.ModelChoiceField(queryset=Category.objects.none(), required=False)
-    tag = forms.ModelChoiceField(queryset=Tag.objects.none(), required=False)
+    category = ReferenceModelChoiceField(
+        queryset=Category.objects.none(), required=False
+    )
+    tag = ReferenceModelChoiceField(queryset=Tag.objects.none(), required=False)
     type = forms.ChoiceField(
         choices=[("", "All"), *Transaction.Type.choices], required=False
     )
@@ -72,10 +189,9 @@ class TransactionFilterForm(forms.Form):
     def __init__(self, *args, user=None, **kwargs):
         super().__init__(*args, **kwargs)
         if user is not None:
-            self.fields["category"].queryset = Category.objects.filter(
-                user=user, archived=False
-            )
-            self.fields["tag"].queryset = Tag.objects.filter(user=user, archived=False)
+            reference = reference_data_for(user)
+            self.fields["category"].set_objects(reference.active_categories())
+            self.fields["tag"].set_objects(reference.active_tags())
         for field in self.fields.values():
             widget = field.widget
             existing = widget.attrs.get("class", "")
@@ -101,12 +217,105 @@ class TransactionFilterForm(forms.Form):
             filters &= Q(amount__gte=data["min_amount"])
         if data.get("max_amount"):
             filters &= Q(amount__lte=data["max_amount"])
-        if data.get("q"):
-            filters &= Q(notes__icontains=data["q"])
         return filters
 
+    def filter_queryset(self, queryset, rank: bool = False):
+        """Apply the field filters and the notes search to ``queryset``."""
+        filters = self.build_filters()
+        if filters:
+            queryset = queryset.filter(filters)
+            if self.cleaned_data.get("tag"):
+                queryset = queryset.distinct()
+        return search_transactions(queryset, self.cleaned_data.get("q"), rank=rank)
+
+
+class IntegerListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value) -> list[int]:
+        if not value:
+            return []
+        try:
+            return [int(item) for item in value]
+        except (TypeError, ValueError) as exc:
+            raise forms.ValidationError("Enter a list of ids.") from exc
+
+
+class TransactionBulkActionForm(forms.Form):
+    action = forms.ChoiceField(choices=BulkAction.choices)
+    ids = IntegerListField(required=False)
+    select_all = forms.BooleanField(required=False)
+    filter_query = forms.CharField(required=False, widget=forms.HiddenInput)
+    category = ReferenceModelChoiceField(
+        queryset=Category.objects.none(), required=False
+    )
+    tags = ReferenceModelMultipleChoiceField(
+        queryset=Tag.objects.none(), required=False
+    )
+    type = forms.ChoiceField(
+        choices=[("", "---------"), *Transaction.Type.choices], required=False
+    )
+    confirmed = forms.BooleanField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        if user is not None:
+            reference = reference_data_for(user)
+            self.fields["category"].set_objects(reference.active_categories())
+            self.fields["tags"].set_objects(reference.active_tags())
+        for name in ("action", "category", "tags", "type"):
+            self.fields[name].widget.attrs["class"] = "form-select form-select-sm"
+
+    def clean(self):
+        cleaned = super().clean()
+        action = cleaned.get("action")
+        if not cleaned.get("ids") and not cleaned.get("select_all"):
+            raise forms.ValidationError("Select at least one transaction.")
+        if action in {BulkAction.ADD_TAGS, BulkAction.REMOVE_TAGS} and not cleaned.get(
+            "tags"
+        ):
+            self.add_error("tags", "Choose at least one tag.")
+        if action == BulkAction.SET_TYPE and not cleaned.get("type"):
+            self.add_error("type", "Choose a transaction type.")
+        if cleaned.get("select_all"):
+            filter_form = TransactionFilterForm(
+                QueryDict(cleaned.get("filter_query") or ""), user=self.user
+            )
+            if not filter_form.is_valid():
+                raise forms.ValidationError("The current filter is not valid.")
+            cleaned["filter_form"] = filter_form
+        return cleaned
+
+    @property
+    def needs_confirmation(self) -> bool:
+        return self.cleaned_data[
+            "action"
+        ] == BulkAction.DELETE and not self.cleaned_data.get("confirmed")
+
+    def selection(self):
+        data = self.cleaned_data
+        return select_transactions(
+            self.user,
+            ids=None if data.get("select_all") else data["ids"],
+            filter_form=data.get("filter_form"),
+        )
+
+    def apply(self) -> BulkResult:
+        data = self.cleaned_data
+        return apply_bulk_action(
+            self.user,
+            self.selection(),
+            data["action"],
+            category=data.get("category"),
+            tags=data.get("tags") or (),
+            txn_type=data.get("type") or None,
+        )
+
 
 class BudgetForm(forms.ModelForm):
+    category = ReferenceModelChoiceField(queryset=Category.objects.none())
+
     class Meta:
         model = Budget
         fields = ["category", "amount", "start_month", "rollover"]
@@ -117,9 +326,42 @@ class BudgetForm(forms.ModelForm):
     def __init__(self, *args, user=None, **kwargs):
         super().__init__(*args, **kwargs)
         if user is not None:
-            self.fields["category"].queryset = Category.objects.filter(
-                user=user, archived=False, kind=Category.Kind.EXPENSE
+            self.fields["category"].set_objects(
+                reference_data_for(user).active_categories(Category.Kind.EXPENSE)
+            )
+
+
+class BudgetMatrixForm(forms.Form):
+    max_months = 60
+
+    start = forms.DateField(
+        required=False,
+        input_formats=["%Y-%m", "%Y-%m-%d"],
+        widget=forms.DateInput(attrs={"type": "month", "class": "form-control"}),
+    )
+    end = forms.DateField(
+        required=False,
+        input_formats=["%Y-%m", "%Y-%m-%d"],
+        widget=forms.DateInput(attrs={"type": "month", "class": "form-control"}),
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        today = timezone.localdate().replace(day=1)
+        end = (cleaned.get("end") or today).replace(day=1)
+        start = cleaned.get("start")
+        if start is None:
+            start = add_months(end, -11)
+        start = start.replace(day=1)
+        if start > end:
+            raise forms.ValidationError("Start month must be before end month.")
+        if month_index(start, end) >= self.max_months:
+            raise forms.ValidationError(
+                f"Choose a range of at most {self.max_months} months."
             )
+        cleaned["start"] = start
+        cleaned["end"] = end
+        return cleaned
 
 
 class CSVImportForm(forms.Form):
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+SLOWEST_KEPT = 3
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryStats:
+    """Queries run while recording, on any thread that inherited the context
+    (including ``sync_to_async`` and ``gather_queries`` workers). Queries seen
+    by a nested recording also count towards the enclosing one."""
+
+    keep: int = SLOWEST_KEPT
+    # The view serving the request, once URL resolution has picked it.
+    view: str = ""
+    parent: QueryStats | None = None
+    count: int = 0
+    duration: float = 0.0
+    # Min-heap of (seconds, sequence, sql) holding the slowest statements.
+    _slowest: list = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, sql: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.duration += seconds
+            entry = (seconds, self.count, sql)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+        if self.parent is not None:
+            self.parent.add(sql, seconds)
+
+    @property
+    def slowest(self) -> list[tuple[float, str]]:
+        return [
+            (seconds, sql) for seconds, _, sql in sorted(self._slowest, reverse=True)
+        ]
+
+
+_stats: ContextVar[QueryStats | None] = ContextVar("finance_query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    return _stats.get()
+
+
+def _record(execute, sql, params, many, context):
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(sql, time.perf_counter() - started)
+
+
+def install(connection) -> None:
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs) -> None:
+    install(connection)
+
+
+@contextmanager
+def recording_queries(keep: int = SLOWEST_KEPT):
+    """Collect ``QueryStats`` for every query run inside the block."""
+    # Connections opened before this module was imported never sent
+    # ``connection_created``.
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+    stats = QueryStats(keep=keep, parent=_stats.get())
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+def query_budget_of(resolver_match) -> int | None:
+    """The ``query_budget`` declared by the view that served a request.
+
+    Class-based views (including DRF views and viewsets) declare it as a
+    class attribute; plain function views as a function attribute.
+    """
+    if resolver_match is None:
+        return None
+    func = resolver_match.func
+    view = getattr(func, "view_class", None) or getattr(func, "cls", None) or func
+    return getattr(view, "query_budget", None)
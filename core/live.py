@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.utils import timezone
+from django.utils.formats import date_format
+
+from .analytics import add_months
+from .events import STALE, publish_on_commit
+from .models import Transaction
+from .money import format_minor, to_minor
+
+DASHBOARD_DELTA = "dashboard.delta"
+DATE_FIELD = Transaction._meta.get_field("date")
+
+
+class DashboardDelta:
+    """Changes to the dashboard's month totals, in minor units."""
+
+    def __init__(self):
+        month_start = timezone.localdate().replace(day=1)
+        self.month = (month_start, add_months(month_start, 1))
+        self.totals = {"income": 0, "expense": 0, "net": 0}
+        self.categories: dict[int, int] = {}
+
+    def add(
+        self,
+        txn_type: str,
+        amount_minor: int,
+        category_id: int | None,
+        on: date,
+        sign: int = 1,
+    ) -> None:
+        # Rows created from raw form or fixture data may still hold strings.
+        on = DATE_FIELD.to_python(on)
+        if not self.month[0] <= on < self.month[1]:
+            return
+        amount_minor *= sign
+        if txn_type == Transaction.Type.INCOME:
+            self.totals["income"] += amount_minor
+            self.totals["net"] += amount_minor
+        else:
+            self.totals["expense"] += amount_minor
+            self.totals["net"] -= amount_minor
+        if category_id:
+            self.categories[category_id] = (
+                self.categories.get(category_id, 0) + amount_minor
+            )
+
+    def as_dict(self, user_id: int) -> dict:
+        categories_by_id = {}
+        if any(self.categories.values()):
+            categories_by_id = _categories_by_id(user_id)
+        categories = []
+        for category_id, change in self.categories.items():
+            category = categories_by_id.get(category_id)
+            if change and category is not None:
+                categories.append(
+                    {
+                        "id": category_id,
+                        "name": category.name,
+                        "kind": category.kind,
+                        "delta": change,
+                    }
+                )
+        return {"totals": self.totals, "categories": categories}
+
+
+def _categories_by_id(user_id: int) -> dict:
+    # Imported here: reference data compiles rules, which use bulk actions,
+    # which publish through this module.
+    from .reference import reference_data_for
+
+    return reference_data_for(user_id).categories_by_id
+
+
+def recent_row(instance: Transaction) -> dict:
+    """A row of the dashboard's recent transactions table."""
+    category = None
+    if instance.category_id:
+        category = _categories_by_id(instance.user_id).get(instance.category_id)
+    on = DATE_FIELD.to_python(instance.date)
+    return {
+        "id": instance.pk,
+        "date": on.isoformat(),
+        "date_display": date_format(on),
+        "type": instance.get_type_display(),
+        "amount": format_minor(to_minor(instance.amount)),
+        "currency": instance.currency,
+        "category": str(category) if category else "",
+    }
+
+
+def publish_transaction_saved(instance: Transaction, before: dict | None) -> None:
+    """Push the dashboard changes made by saving ``instance``.
+
+    ``before`` holds the stored category, type, amount and date when the
+    transaction already existed.
+    """
+    delta = DashboardDelta()
+    if before is not None:
+        delta.add(
+            before["type"],
+            to_minor(before["amount"]),
+            before["category_id"],
+            before["date"],
+            sign=-1,
+        )
+    delta.add(
+        instance.type, to_minor(instance.amount), instance.category_id, instance.date
+    )
+    data = delta.as_dict(instance.user_id)
+    data["recent"] = recent_row(instance)
+    publish_on_commit(instance.user_id, DASHBOARD_DELTA, data)
+
+
+def publish_transaction_deleted(instance: Transaction) -> None:
+    delta = DashboardDelta()
+    delta.add(
+        instance.type,
+        to_minor(instance.amount),
+        instance.category_id,
+        instance.date,
+        sign=-1,
+    )
+    data = delta.as_dict(instance.user_id)
+    data["removed"] = instance.pk
+    publish_on_commit(instance.user_id, DASHBOARD_DELTA, data)
+
+
+def publish_dashboard_stale(user_id: int) -> None:
+    """Tell open dashboards to reload after a set-based change."""
+    publish_on_commit(user_id, STALE, {})
@@ -0,0 +1,11 @@
+"""Simulated concurrent users against a running server; see ``manage.py loadtest``."""
+
+from .client import HttpClient, LoginFailed, Response
+from .runner import (
+    LoadTestError,
+    account_emails,
+    delete_users,
+    prepare_users,
+    run_load_test,
+)
+from .scenarios import ACTIONS, Action, VirtualUser
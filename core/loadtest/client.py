@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+import uuid
+from dataclasses import dataclass
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urlsplit
+from urllib.request import (
+    HTTPCookieProcessor,
+    HTTPRedirectHandler,
+    Request,
+    build_opener,
+)
+
+from django.conf import settings
+
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+class LoginFailed(RuntimeError):
+    pass
+
+
+@dataclass
+class Response:
+    method: str
+    status: int
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        # Form posts redirect on success; a redirected GET means the page
+        # bounced to the login screen.
+        if self.method == "GET":
+            return self.status < 300
+        return self.status < 400
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _NoRedirects(HTTPRedirectHandler):
+    # A redirect is the response being measured (a login or form post
+    # succeeding), not something to follow.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class _LoopbackCookiePolicy(DefaultCookiePolicy):
+    """Send ``Secure`` cookies to loopback hosts over plain HTTP, as browsers
+    do, so a local server running with ``DEBUG=False`` still works."""
+
+    def return_ok_secure(self, cookie, request) -> bool:
+        if urlsplit(request.get_full_url()).hostname in LOOPBACK_HOSTS:
+            return True
+        return super().return_ok_secure(cookie, request)
+
+
+class HttpClient:
+    """A blocking client for one simulated user.
+
+    Keeps cookies like a browser, sends the CSRF token on unsafe requests and,
+    once logged in over JWT, an ``Authorization: Bearer`` header instead.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cookies = CookieJar(policy=_LoopbackCookiePolicy())
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirects)
+        self.access = ""
+        self.refresh = ""
+
+    def cookie(self, name: str) -> str:
+        for cookie in self.cookies:
+            if cookie.name == name:
+                return cookie.value or ""
+        return ""
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict | None = None,
+        data: dict | None = None,
+        json_body=None,
+        files: dict[str, tuple[str, bytes]] | None = None,
+    ) -> Response:
+        url = self.base_url + path
+        if params:
+            url += "?" + urlencode(params)
+        headers = {"Accept": "text/html,application/json"}
+        body = None
+        if files is not None:
+            body, headers["Content-Type"] = _multipart(data or {}, files)
+        elif json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif data is not None:
+            body = urlencode(data).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.access:
+            headers["Authorization"] = f"Bearer {self.access}"
+        elif method not in {"GET", "HEAD", "OPTIONS"}:
+            headers["X-CSRFToken"] = self.cookie(settings.CSRF_COOKIE_NAME)
+            headers["Referer"] = url
+        request = Request(url, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return Response(method, response.status, response.read())
+        except HTTPError as exc:
+            with exc:
+                return Response(method, exc.code, exc.read())
+
+    def api(self, method: str, path: str, **kwargs) -> Response:
+        """``request`` that renews an expired access token once."""
+        response = self.request(method, path, **kwargs)
+        if response.status == 401 and self.refresh:
+            self.refresh_token()
+            response = self.request(method, path, **kwargs)
+        return response
+
+    def login_session(self, email: str, password: str) -> None:
+        """Log in through the allauth form, as the browser would."""
+        self.request("GET", "/accounts/login/")
+        response = self.request(
+            "POST",
+            "/accounts/login/",
+            data={
+                "login": email,
+                "password": password,
+                "csrfmiddlewaretoken": self.cookie(settings.CSRF_COOKIE_NAME),
+            },
+        )
+        if response.status != 302 or not self.cookie(settings.SESSION_COOKIE_NAME):
+            raise LoginFailed(f"session login for {email}: HTTP {response.status}")
+
+    def login_jwt(self, email: str, password: str) -> None:
+        response = self.request(
+            "POST", "/auth/login/", json_body={"email": email, "password": password}
+        )
+        if response.status != 200:
+            raise LoginFailed(f"JWT login for {email}: HTTP {response.status}")
+        tokens = response.json()
+        self.access, self.refresh = tokens["access"], tokens.get("refresh", "")
+        # The login view also starts a session; authenticate by token alone.
+        self.cookies.clear()
+
+    def refresh_token(self) -> None:
+        refresh, self.access = self.refresh, ""
+        response = self.request(
+            "POST", "/auth/token/refresh/", json_body={"refresh": refresh}
+        )
+        if response.status != 200:
+            raise LoginFailed(f"token refresh: HTTP {response.status}")
+        tokens = response.json()
+        self.access = tokens["access"]
+        self.refresh = tokens.get("refresh") or refresh
+
+
+def _multipart(fields: dict, files: dict[str, tuple[str, bytes]]) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"'
+            f"\r\n\r\n{value}\r\n".encode()
+        )
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\nContent-Type: text/csv\r\n\r\n'.encode()
+            + content
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from urllib.error import URLError
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core.benchmarks import DatasetSpec, delete_dataset, generate_dataset
+from core.benchmarks.runner import PERCENTILES, percentile
+from core.models import Transaction
+
+from .client import HttpClient, LoginFailed
+from .scenarios import ACTIONS, JWT, SESSION, Action, VirtualUser
+
+EMAIL_PATTERN = "loadtest-{}@example.invalid"
+
+
+class LoadTestError(RuntimeError):
+    pass
+
+
+@dataclass
+class Sample:
+    action: str
+    elapsed_ms: float
+    ok: bool
+
+
+@dataclass
+class UserRun:
+    """What one simulated user did; filled by its own thread only."""
+
+    email: str
+    auth: str
+    samples: list[Sample] = field(default_factory=list)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def error(self, reason: str) -> None:
+        self.errors[reason] = self.errors.get(reason, 0) + 1
+
+
+def account_emails(count: int) -> list[str]:
+    return [EMAIL_PATTERN.format(index) for index in range(count)]
+
+
+def prepare_users(count: int, password: str, spec: DatasetSpec) -> int:
+    """Create the load-test accounts with ``password`` and seed any without
+    data. Returns how many accounts were seeded."""
+    User = get_user_model()
+    seeded = 0
+    for index, email in enumerate(account_emails(count)):
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            user = User.objects.create_user(username=email, email=email)
+        user.set_password(password)
+        user.save(update_fields=["password"])
+        if not Transaction.objects.for_user(user).exists():
+            delete_dataset(user)
+            generate_dataset(user, replace(spec, seed=spec.seed + index))
+            seeded += 1
+    return seeded
+
+
+def delete_users(count: int) -> None:
+    for user in get_user_model().objects.filter(email__in=account_emails(count)):
+        delete_dataset(user)
+        user.delete()
+
+
+def auth_modes(count: int, auth: str) -> list[str]:
+    """``auth`` is ``session``, ``jwt`` or ``mixed`` (alternating)."""
+    if auth == "mixed":
+        return [(SESSION, JWT)[index % 2] for index in range(count)]
+    return [auth] * count
+
+
+def _simulate(
+    run: UserRun,
+    base_url: str,
+    password: str,
+    rng: random.Random,
+    start_at: float,
+    deadline: float,
+    iterations: int | None,
+    think_time: float,
+    timeout: float,
+    actions: list[Action],
+) -> None:
+    mix = [action for action in actions if run.auth in action.auth]
+    weights = [action.weight for action in mix]
+    user = VirtualUser(run.email, run.auth, HttpClient(base_url, timeout), rng)
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    try:
+        user.login(password)
+    except (LoginFailed, URLError, OSError, ValueError, KeyError) as exc:
+        run.error(f"login: {exc}")
+        return
+    done = 0
+    while time.monotonic() < deadline and (iterations is None or done < iterations):
+        action = rng.choices(mix, weights)[0]
+        started = time.perf_counter()
+        try:
+            responses = action.run(user)
+        except (LoginFailed, URLError, OSError) as exc:
+            elapsed = (time.perf_counter() - started) * 1000
+            run.samples.append(Sample(action.name, elapsed, False))
+            run.error(f"{action.name}: {exc}")
+        else:
+            elapsed = (time.perf_counter() - started) * 1000
+            failed = [r.status for r in responses if not r.ok]
+            run.samples.append(Sample(action.name, elapsed, not failed))
+            for status in failed:
+                run.error(f"{action.name}: HTTP {status}")
+        done += 1
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+
+
+def _summary(name: str, samples: list[Sample], wall: float) -> dict:
+    timings = [sample.elapsed_ms for sample in samples]
+    summary = {
+        "name": name,
+        "requests": len(samples),
+        "errors": sum(not sample.ok for sample in samples),
+        "throughput_rps": round(len(samples) / wall, 2) if wall else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(timings, pct), 3)
+    summary["mean_ms"] = round(sum(timings) / len(timings), 3) if timings else 0.0
+    summary["max_ms"] = round(max(timings, default=0.0), 3)
+    return summary
+
+
+def run_load_test(
+    base_url: str,
+    users: int,
+    password: str,
+    *,
+    auth: str = "mixed",
+    duration: float = 60.0,
+    iterations: int | None = None,
+    ramp_up: float = 0.0,
+    think_time: float = 0.0,
+    timeout: float = 30.0,
+    seed: int = 42,
+    actions: list[Action] = ACTIONS,
+) -> dict:
+    """Run ``users`` simulated users, one thread each, against the server at
+    ``base_url`` and return a JSON-ready report.
+
+    Users log in one after another over ``ramp_up`` seconds, then pick
+    weighted actions until ``duration`` elapses or they have run
+    ``iterations`` each, pausing an exponentially distributed ``think_time``
+    (mean seconds) between actions.
+    """
+    runs = [
+        UserRun(email, mode)
+        for email, mode in zip(account_emails(users), auth_modes(users, auth))
+    ]
+    started_at = timezone.now()
+    started = time.monotonic()
+    deadline = started + ramp_up + duration
+    threads = [
+        threading.Thread(
+            target=_simulate,
+            args=(
+                run,
+                base_url,
+                password,
+                random.Random(seed + index),
+                started + ramp_up * index / users,
+                deadline,
+                iterations,
+                think_time,
+                timeout,
+                actions,
+            ),
+            daemon=True,
+        )
+        for index, run in enumerate(runs)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+
+    active = [run for run in runs if run.samples]
+    if not active:
+        reasons = sorted({reason for run in runs for reason in run.errors})
+        raise LoadTestError("No simulated user got going: " + "; ".join(reasons))
+    samples = [sample for run in runs for sample in run.samples]
+    by_action: dict[str, list[Sample]] = {}
+    for sample in samples:
+        by_action.setdefault(sample.action, []).append(sample)
+    errors: dict[str, int] = {}
+    for run in runs:
+        for reason, count in run.errors.items():
+            errors[reason] = errors.get(reason, 0) + count
+    return {
+        "environment": {
+            "base_url": base_url,
+            "started_at": started_at.isoformat(),
+            "users": users,
+            "active_users": len(active),
+            "auth": auth,
+            "ramp_up_s": ramp_up,
+            "think_time_s": think_time,
+            "wall_s": round(wall, 3),
+        },
+        "total": _summary("total", samples, wall),
+        "results": [
+            _summary(action.name, by_action[action.name], wall)
+            for action in actions
+            if action.name in by_action
+        ],
+        "errors": dict(sorted(errors.items(), key=lambda item: -item[1])),
+    }
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Callable
+
+from core.benchmarks.data import MERCHANTS
+
+from .client import HttpClient, Response
+
+SESSION = "session"
+JWT = "jwt"
+AUTH_MODES = (SESSION, JWT)
+
+
+@dataclass
+class VirtualUser:
+    """One simulated user: a logged-in client, its own random stream and a
+    few ids to aim requests at."""
+
+    email: str
+    auth: str
+    client: HttpClient
+    rng: random.Random
+    category_ids: list[int] = field(default_factory=list)
+    transaction_ids: list[int] = field(default_factory=list)
+    import_rows: int = 50
+
+    def login(self, password: str) -> None:
+        if self.auth == JWT:
+            self.client.login_jwt(self.email, password)
+        else:
+            self.client.login_session(self.email, password)
+        categories = self.client.api("GET", "/api/categories/").json()
+        self.category_ids = [
+            row["id"] for row in categories["results"] if row["kind"] == "EXPENSE"
+        ]
+        transactions = self.client.api("GET", "/api/transactions/").json()
+        self.transaction_ids = [row["id"] for row in transactions["results"]]
+
+    def import_csv(self) -> bytes:
+        lines = ["Date,Description,Amount"]
+        for _ in range(self.import_rows):
+            lines.append(
+                f"2024-03-{self.rng.randint(1, 28):02d},"
+                f"{self.rng.choice(MERCHANTS)} {self.rng.randrange(10_000)},"
+                f"-{self.rng.randint(100, 9999) / 100:.2f}"
+            )
+        return "\n".join(lines).encode()
+
+
+@dataclass(frozen=True)
+class Action:
+    """One step of a user's session. ``weight`` sets how often it is picked
+    relative to the others open to the same kind of user."""
+
+    name: str
+    weight: int
+    run: Callable[[VirtualUser], list[Response]]
+    auth: tuple[str, ...] = AUTH_MODES
+
+
+def _page(path: str, params: Callable[[VirtualUser], dict] = lambda user: {}):
+    def run(user: VirtualUser) -> list[Response]:
+        return [user.client.request("GET", path, params=params(user))]
+
+    return run
+
+
+def _api(path: str, params: Callable[[VirtualUser], dict] = lambda user: {}):
+    def run(user: VirtualUser) -> list[Response]:
+        return [user.client.api("GET", path, params=params(user))]
+
+    return run
+
+
+def _filter(user: VirtualUser) -> dict:
+    params = {"type": "EXPENSE"}
+    if user.category_ids and user.rng.random() < 0.5:
+        params["category"] = user.rng.choice(user.category_ids)
+    else:
+        params["q"] = user.rng.choice(MERCHANTS).split()[0]
+    return params
+
+
+def _api_filter(user: VirtualUser) -> dict:
+    params = _filter(user)
+    if "q" in params:
+        params["search"] = params.pop("q")
+    return params
+
+
+def _import(user: VirtualUser) -> list[Response]:
+    preview = user.client.request(
+        "POST",
+        "/import/",
+        files={"file": ("statement.csv", user.import_csv())},
+    )
+    mapping = {"Date": "date", "Description": "description", "Amount": "amount"}
+    commit = user.client.request(
+        "POST",
+        "/import/",
+        data={"action": "commit", "mapping": json.dumps(mapping)},
+    )
+    return [preview, commit]
+
+
+def _create(user: VirtualUser) -> list[Response]:
+    payload = {
+        "type": "EXPENSE",
+        "amount": f"{user.rng.randint(100, 9999) / 100:.2f}",
+        "currency": "GBP",
+        "date": f"2024-04-{user.rng.randint(1, 28):02d}",
+        "notes": user.rng.choice(MERCHANTS),
+    }
+    if user.category_ids:
+        payload["category"] = user.rng.choice(user.category_ids)
+    response = user.client.api("POST", "/api/transactions/", json_body=payload)
+    if response.status == 201:
+        user.transaction_ids.append(response.json()["id"])
+    return [response]
+
+
+def _update(user: VirtualUser) -> list[Response]:
+    if not user.transaction_ids:
+        return _create(user)
+    pk = user.rng.choice(user.transaction_ids)
+    return [
+        user.client.api(
+            "PATCH",
+            f"/api/transactions/{pk}/",
+            json_body={"notes": user.rng.choice(MERCHANTS)},
+        )
+    ]
+
+
+# Browsing dominates, as it does for real users; writes are a small share.
+ACTIONS = [
+    Action("dashboard", 20, _page("/"), auth=(SESSION,)),
+    Action("transactions", 12, _page("/transactions/"), auth=(SESSION,)),
+    Action("transactions-filter", 8, _page("/transactions/", _filter), auth=(SESSION,)),
+    Action("reports-monthly", 6, _page("/reports/monthly/"), auth=(SESSION,)),
+    Action("reports-categories", 4, _page("/reports/categories/"), auth=(SESSION,)),
+    Action("reports-budgets", 3, _page("/reports/budgets/"), auth=(SESSION,)),
+    Action("budgets", 4, _page("/budgets/"), auth=(SESSION,)),
+    Action("import-csv", 1, _import, auth=(SESSION,)),
+    Action("api-transactions", 10, _api("/api/transactions/")),
+    Action("api-transactions-filter", 6, _api("/api/transactions/", _api_filter)),
+    Action("api-budget-matrix", 3, _api("/api/reports/budget-matrix/")),
+    Action("api-sync", 2, _api("/api/sync/", lambda user: {"limit": 100})),
+    Action("api-transactions-create", 3, _create),
+    Action("api-transactions-update", 2, _update),
+]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import CategorizationRule
+from core.reference import UserReferenceData
+from core.rules import apply_rules
+
+
+class Command(BaseCommand):
+    help = "Apply categorization rules to existing transactions in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only apply this username's rules.")
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Also re-categorize transactions that already have a category.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.filter(
+            pk__in=CategorizationRule.objects.filter(active=True).values("user_id")
+        )
+        if options["user"]:
+            try:
+                users = [User.objects.get(username=options["user"])]
+            except User.DoesNotExist as exc:
+                raise CommandError(f"Unknown user {options['user']!r}") from exc
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        for user in users:
+            result = apply_rules(
+                user,
+                UserReferenceData(user.pk).rule_matcher,
+                overwrite=options["overwrite"],
+                batch_size=options["batch_size"],
+            )
+            self.stdout.write(
+                f"{user}: scanned {result.scanned}, categorized "
+                f"{result.categorized}, tagged {result.tagged}"
+            )
+        self.stdout.write(self.style.SUCCESS("Rules applied."))
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.benchmarks import (
+    CASES,
+    BenchmarkError,
+    DatasetSpec,
+    Session,
+    compare_reports,
+    delete_dataset,
+    generate_dataset,
+    load_report,
+    run_benchmarks,
+)
+from core.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot views against a synthetic user and write latency "
+        "percentiles and query counts as JSON. Pass --compare with an "
+        "earlier report to fail on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--transactions", type=int, default=10_000)
+        parser.add_argument("--categories", type=int, default=12)
+        parser.add_argument("--tags", type=int, default=12)
+        parser.add_argument("--months", type=int, default=24)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--import-rows", type=int, default=500)
+        parser.add_argument(
+            "--case",
+            action="append",
+            choices=[case.name for case in CASES],
+            help="Only run these cases (repeatable).",
+        )
+        parser.add_argument("--output", help="Write the JSON report here.")
+        parser.add_argument("--compare", help="Baseline JSON report to compare.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.1,
+            help="Allowed p95 slowdown against --compare, as a fraction.",
+        )
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated rows."
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        if options["warmup"] < 0:
+            raise CommandError("--warmup cannot be negative.")
+        spec = DatasetSpec(
+            transactions=options["transactions"],
+            categories=options["categories"],
+            tags=options["tags"],
+            months=options["months"],
+            seed=options["seed"],
+        )
+        User = get_user_model()
+        email = "benchmark@example.invalid"
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            user = User.objects.create_user(username=email, email=email)
+        if Transaction.objects.for_user(user).count() != spec.transactions:
+            delete_dataset(user)
+            self.stdout.write(f"Generating {spec.transactions:,} transactions...")
+            generate_dataset(user, spec)
+
+        cases = [
+            case
+            for case in CASES
+            if not options["case"] or case.name in options["case"]
+        ]
+        session = Session.start(
+            user, spec, options["host"], import_rows=options["import_rows"]
+        )
+        try:
+            report = run_benchmarks(
+                session, cases, options["iterations"], options["warmup"]
+            )
+        except BenchmarkError as exc:
+            # Django answers a disallowed Host header with a 400.
+            hint = "; is --host in ALLOWED_HOSTS?" if exc.status_code == 400 else ""
+            raise CommandError(f"{exc}{hint}") from exc
+        finally:
+            session.client.logout()
+            if not options["keep"]:
+                delete_dataset(user)
+                user.delete()
+
+        self.stdout.write(
+            f"{spec.transactions:,} rows on {connection.vendor}, "
+            f"{options['iterations']} iterations per case"
+        )
+        self.stdout.write(
+            f"{'case':<28}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}  (ms)"
+        )
+        for result in report["results"]:
+            self.stdout.write(
+                f"{result['name']:<28}{result['p50_ms']:>9.1f}"
+                f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                f"{result['queries']:>9}"
+            )
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["compare"]:
+            regressions = compare_reports(
+                load_report(options["compare"]), report, options["tolerance"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Regressions against the baseline:\n"
+                    + "\n".join(f"  {regression}" for regression in regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import DatasetSpec, delete_dataset, generate_dataset
+from core.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare dashboard, report and API latency through the WSGI and ASGI "
+        "entry points. Run once with ASYNC_VIEWS off and once with it on to "
+        "compare the sync and async views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50_000)
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated rows."
+        )
+
+    def handle(self, *args, **options):
+        from finance.asgi import application as asgi_application
+        from finance.wsgi import application as wsgi_application
+
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1.")
+
+        User = get_user_model()
+        email = "benchmark-asgi@example.invalid"
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            user = User.objects.create_user(username=email, email=email)
+        spec = DatasetSpec(
+            transactions=options["rows"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        if Transaction.objects.for_user(user).count() != spec.transactions:
+            delete_dataset(user)
+            self.stdout.write(f"Generating {spec.transactions:,} transactions...")
+            generate_dataset(user, spec)
+
+        client = Client()
+        client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.session.session_key}"
+        paths = [
+            reverse("core:dashboard"),
+            reverse("core:reports-monthly"),
+            reverse("core:reports-budgets"),
+            reverse("report-budget-matrix"),
+        ]
+        self.stdout.write(
+            f"{options['rows']:,} rows on {connection.vendor}; "
+            f"ASYNC_VIEWS={getattr(settings, 'ASYNC_VIEWS', False)}; "
+            f"{options['requests']} requests, {options['concurrency']} at a time"
+        )
+        self.stdout.write(
+            f"{'path':<28}{'wsgi p50':>10}{'wsgi p95':>10}"
+            f"{'asgi p50':>10}{'asgi p95':>10}  (ms)"
+        )
+        try:
+            for path in paths:
+                wsgi = self._run_wsgi(wsgi_application, path, cookie, options)
+                asgi = asyncio.run(
+                    self._run_asgi(asgi_application, path, cookie, options)
+                )
+                self.stdout.write(
+                    f"{path:<28}{_median(wsgi):>10.1f}{_p95(wsgi):>10.1f}"
+                    f"{_median(asgi):>10.1f}{_p95(asgi):>10.1f}"
+                )
+        finally:
+            client.logout()
+            if not options["keep"]:
+                delete_dataset(user)
+                user.delete()
+
+    def _run_wsgi(self, application, path, cookie, options) -> list[float]:
+        def request() -> float:
+            environ = {
+                "PATH_INFO": path,
+                "REQUEST_METHOD": "GET",
+                "HTTP_HOST": options["host"],
+                "HTTP_COOKIE": cookie,
+            }
+            setup_testing_defaults(environ)
+            status = []
+            started = time.perf_counter()
+            body = application(environ, lambda code, headers: status.append(code))
+            try:
+                for _ in body:
+                    pass
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+            elapsed = (time.perf_counter() - started) * 1000
+            _check_status(path, status[0].split()[0])
+            return elapsed
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            futures = [pool.submit(request) for _ in range(options["requests"])]
+            return [future.result() for future in futures]
+
+    async def _run_asgi(self, application, path, cookie, options) -> list[float]:
+        limit = asyncio.Semaphore(options["concurrency"])
+
+        async def request() -> float:
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "query_string": b"",
+                "root_path": "",
+                "headers": [
+                    (b"host", options["host"].encode()),
+                    (b"cookie", cookie.encode()),
+                ],
+                "client": ("127.0.0.1", 0),
+                "server": (options["host"], 80),
+            }
+            done = asyncio.Event()
+            status = []
+            sent_body = False
+
+            async def receive():
+                nonlocal sent_body
+                if not sent_body:
+                    sent_body = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await done.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+                elif not message.get("more_body", False):
+                    done.set()
+
+            async with limit:
+                started = time.perf_counter()
+                await application(scope, receive, send)
+                elapsed = (time.perf_counter() - started) * 1000
+            _check_status(path, status[0])
+            return elapsed
+
+        return list(
+            await asyncio.gather(*(request() for _ in range(options["requests"])))
+        )
+
+
+def _check_status(path: str, status) -> None:
+    if int(status) != 200:
+        # Django answers a disallowed Host header with a 400.
+        hint = "; is --host in ALLOWED_HOSTS?" if int(status) == 400 else ""
+        raise CommandError(f"GET {path} returned {status}{hint}")
+
+
+def _median(timings: list[float]) -> float:
+    return statistics.median(timings)
+
+
+def _p95(timings: list[float]) -> float:
+    return statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.models import Transaction
+from core.search import SubstringSearchBackend, get_search_backend
+
+MERCHANTS = [
+    "Tesco",
+    "Sainsbury's",
+    "Pret A Manger",
+    "Costa Coffee",
+    "Shell fuel",
+    "Amazon Marketplace",
+    "Netflix subscription",
+    "Council tax",
+    "Rent payment",
+    "Uber trip",
+    "Deliveroo order",
+    "Boots pharmacy",
+    "Gym membership",
+    "Train ticket",
+    "Salary",
+]
+WORDS = ["weekly", "monthly", "refund", "online", "card", "london", "shared", "gift"]
+
+
+class Command(BaseCommand):
+    help = "Compare substring search against the configured search backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--terms", nargs="+", default=["coffee", "rent payment", "refund", "zzz"]
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated rows."
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        email = "benchmark-search@example.invalid"
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            user = User.objects.create_user(username=email, email=email)
+        queryset = Transaction.objects.for_user(user)
+        if queryset.count() != options["rows"]:
+            self._delete_rows(user)
+            self._generate(user, options)
+
+        backend = get_search_backend()
+        baseline = SubstringSearchBackend()
+        self.stdout.write(
+            f"{options['rows']:,} rows on {connection.vendor}; "
+            f"median of {options['repeat']} runs (ms)"
+        )
+        self.stdout.write(
+            f"{'term':<16}{'matches':>10}{'icontains':>12}{'backend':>12}"
+        )
+        for term in options["terms"]:
+            matches, slow = self._time(baseline, queryset, term, options["repeat"])
+            _, fast = self._time(backend, queryset, term, options["repeat"])
+            self.stdout.write(f"{term:<16}{matches:>10,}{slow:>12.1f}{fast:>12.1f}")
+
+        if not options["keep"]:
+            self._delete_rows(user)
+            user.delete()
+
+    def _time(self, backend, queryset, term, repeat):
+        timings = []
+        matches = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = backend.search(queryset, term)
+            matches = results.count()
+            list(results.order_by("-date", "-created_at")[:25])
+            timings.append((time.perf_counter() - started) * 1000)
+        return matches, statistics.median(timings)
+
+    def _generate(self, user, options):
+        rng = random.Random(options["seed"])
+        start = date.today() - timedelta(days=5 * 365)
+        batch: list[Transaction] = []
+        with transaction.atomic():
+            for _ in range(options["rows"]):
+                notes = f"{rng.choice(MERCHANTS)} {rng.choice(WORDS)}"
+                batch.append(
+                    Transaction(
+                        user=user,
+                        type=Transaction.Type.EXPENSE,
+                        amount=f"{rng.randint(1, 20000) / 100:.2f}",
+                        date=start + timedelta(days=rng.randrange(5 * 365)),
+                        notes=notes,
+                    )
+                )
+                if len(batch) >= options["batch_size"]:
+                    Transaction.objects.bulk_create(batch)
+                    batch = []
+            Transaction.objects.bulk_create(batch)
+
+    def _delete_rows(self, user):
+        # A raw DELETE avoids loading every row through the deletion collector.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Transaction._meta.db_table} WHERE user_id = %s",
+                [user.pk],
+            )
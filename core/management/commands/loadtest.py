@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import DatasetSpec
+from core.loadtest import LoadTestError, delete_users, prepare_users, run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent users against a running server (runserver, "
+        "gunicorn, uvicorn...) sharing this project's database. Users log in "
+        "over session or JWT auth and replay a mix of page and API requests; "
+        "throughput and latency percentiles are printed and optionally "
+        "written as JSON. Run with --prepare first to create the accounts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument(
+            "--auth", choices=["session", "jwt", "mixed"], default="mixed"
+        )
+        parser.add_argument(
+            "--duration", type=float, default=60.0, help="Seconds after ramp-up."
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            help="Stop each user after this many actions, even before --duration.",
+        )
+        parser.add_argument("--ramp-up", type=float, default=10.0)
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=1.0,
+            help="Mean pause between a user's actions in seconds; 0 for none.",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--password", default="loadtest-password")
+        parser.add_argument(
+            "--prepare",
+            action="store_true",
+            help="Create the load-test accounts and seed their data first.",
+        )
+        parser.add_argument(
+            "--prepare-only",
+            action="store_true",
+            help="Prepare the accounts and exit without running.",
+        )
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=2_000,
+            help="Transactions per account seeded by --prepare.",
+        )
+        parser.add_argument(
+            "--cleanup",
+            action="store_true",
+            help="Delete the load-test accounts afterwards.",
+        )
+        parser.add_argument(
+            "--max-error-rate",
+            type=float,
+            default=0.01,
+            help="Fail when more than this fraction of actions fail.",
+        )
+        parser.add_argument("--output", help="Write the JSON report here.")
+
+    def handle(self, *args, **options):
+        if options["prepare"] or options["prepare_only"]:
+            spec = DatasetSpec(
+                transactions=options["transactions"], seed=options["seed"]
+            )
+            seeded = prepare_users(options["users"], options["password"], spec)
+            self.stdout.write(
+                f"Prepared {options['users']} accounts ({seeded} newly seeded)."
+            )
+            if options["prepare_only"]:
+                return
+
+        self.stdout.write(
+            f"{options['users']} users ({options['auth']}) against "
+            f"{options['base_url']} for {options['duration']:g}s "
+            f"after {options['ramp_up']:g}s ramp-up"
+        )
+        try:
+            report = run_load_test(
+                options["base_url"],
+                options["users"],
+                options["password"],
+                auth=options["auth"],
+                duration=options["duration"],
+                iterations=options["iterations"],
+                ramp_up=options["ramp_up"],
+                think_time=options["think_time"],
+                timeout=options["timeout"],
+                seed=options["seed"],
+            )
+        except LoadTestError as exc:
+            raise CommandError(
+                f"{exc}. Is the server running, are the accounts prepared "
+                "(--prepare) and is its host in ALLOWED_HOSTS?"
+            ) from exc
+        finally:
+            if options["cleanup"]:
+                delete_users(options["users"])
+
+        self.stdout.write(
+            f"{'action':<28}{'reqs':>7}{'errs':>6}{'rps':>8}"
+            f"{'p50':>9}{'p95':>9}{'p99':>9}  (ms)"
+        )
+        for result in [*report["results"], report["total"]]:
+            self.stdout.write(
+                f"{result['name']:<28}{result['requests']:>7}{result['errors']:>6}"
+                f"{result['throughput_rps']:>8.1f}{result['p50_ms']:>9.1f}"
+                f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+            )
+        for reason, count in list(report["errors"].items())[:10]:
+            self.stdout.write(self.style.WARNING(f"  {count} x {reason}"))
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n")
+            self.stdout.write(f"Wrote {options['output']}")
+
+        total = report["total"]
+        if total["errors"] > total["requests"] * options["max_error_rate"]:
+            raise CommandError(
+                f"{total['errors']} of {total['requests']} actions failed."
+            )
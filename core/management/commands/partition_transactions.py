@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from core.analytics import add_months
+from core.partitioning import (
+    PartitioningUnavailable,
+    convert_to_partitioned,
+    ensure_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition the transaction table by month on PostgreSQL and create "
+        "upcoming partitions ahead of time. Run regularly, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Rebuild the existing table as a partitioned table first.",
+        )
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=getattr(settings, "TRANSACTION_PARTITION_MONTHS_AHEAD", 3),
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options["months_ahead"] < 0:
+            raise CommandError("--months-ahead must not be negative.")
+        connection = connections[options["database"]]
+        through = add_months(timezone.localdate(), options["months_ahead"])
+        try:
+            if options["convert"]:
+                conversion = convert_to_partitioned(connection, through)
+                self.stdout.write(
+                    f"Copied {conversion.copied} transactions into partitions."
+                )
+                for name in conversion.dropped:
+                    self.stdout.write(f"Dropped {name}")
+                for name in conversion.recreated:
+                    self.stdout.write(f"Recreated {name}")
+            created = ensure_partitions(connection, through)
+        except PartitioningUnavailable as exc:
+            raise CommandError(str(exc)) from exc
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Partitions exist through {through:%Y-%m}.")
+        )
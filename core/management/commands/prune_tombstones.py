@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones older than the retention period."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "SYNC_TOMBSTONE_DAYS", 90),
+            help="Keep tombstones newer than this many days.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(timedelta(days=options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones."))
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.usage import rebuild_usage_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute category and tag usage statistics from transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this username.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist as exc:
+                raise CommandError(f"Unknown user {options['user']!r}") from exc
+        with transaction.atomic():
+            written = rebuild_usage_stats(user)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt stats for {written} categories and tags.")
+        )
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.db import connections, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .models import (
+    Budget,
+    CategorizationRule,
+    Category,
+    ChangeSequence,
+    Tag,
+    Transaction,
+)
+from .usage import Usage, apply_usage, usage_by_tag
+
+
+class MergeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class MergeResult:
+    transactions: int
+    budgets_moved: int = 0
+    budgets_combined: int = 0
+
+
+def validate_merge(source, target) -> None:
+    if source.pk == target.pk:
+        raise MergeError("Choose a different item to merge into.")
+    if source.user_id != target.user_id:
+        raise MergeError("Both items must belong to the same user.")
+    if isinstance(source, Category) and source.kind != target.kind:
+        raise MergeError("Only categories of the same kind can be merged.")
+
+
+def _stamp(user_id: int) -> dict:
+    return {
+        "change_seq": ChangeSequence.allocate(user_id),
+        "updated_at": timezone.now(),
+    }
+
+
+def _usage_of(obj) -> Usage:
+    return Usage(
+        obj.transaction_count, obj.income_total, obj.expense_total, obj.last_used
+    )
+
+
+def merge_categories(source: Category, target: Category) -> MergeResult:
+    """Move everything from ``source`` onto ``target`` and delete ``source``.
+
+    Transactions are repointed with a single ``UPDATE``. A budget of the
+    source for a month the target already budgets is folded into the
+    target's budget by adding the amounts; the rest are repointed.
+    """
+    validate_merge(source, target)
+    with transaction.atomic():
+        source = Category.objects.select_for_update().get(pk=source.pk)
+        stamp = _stamp(source.user_id)
+        moved_transactions = Transaction.objects.filter(category=source).update(
+            category=target, **stamp
+        )
+
+        source_budgets = Budget.objects.filter(category=source)
+        target_months = Budget.objects.filter(category=target).values("start_month")
+        conflicting = source_budgets.filter(start_month__in=target_months)
+        combined = Budget.objects.filter(
+            category=target,
+            start_month__in=conflicting.values("start_month"),
+        ).update(
+            amount=F("amount")
+            + Subquery(
+                conflicting.filter(start_month=OuterRef("start_month")).values(
+                    "amount"
+                )[:1]
+            ),
+            **stamp,
+        )
+        conflicting.delete()
+        moved_budgets = source_budgets.update(category=target, **stamp)
+        CategorizationRule.objects.filter(category=source).update(category=target)
+
+        apply_usage(Category, {target.pk: _usage_of(source)})
+        source.delete()
+    bump_data_version(source.user_id)
+    return MergeResult(moved_transactions, moved_budgets, combined)
+
+
+def merge_tags(source: Tag, target: Tag) -> MergeResult:
+    """Relink every transaction tagged ``source`` to ``target``, then delete
+    ``source``. Transactions already carrying both tags keep a single link."""
+    validate_merge(source, target)
+    through = Transaction.tags.through
+    with transaction.atomic():
+        source = Tag.objects.select_for_update().get(pk=source.pk)
+        stamp = _stamp(source.user_id)
+        source_links = through.objects.filter(tag_id=source.pk)
+        new_links = source_links.exclude(
+            transaction_id__in=through.objects.filter(tag_id=target.pk).values(
+                "transaction_id"
+            )
+        )
+        added = usage_by_tag(new_links).get(source.pk, Usage())
+        touched = Transaction.objects.filter(
+            pk__in=source_links.values("transaction_id")
+        ).update(**stamp)
+        _copy_links(through, source.pk, target.pk)
+        source_links.delete()
+        target.rules.add(*source.rules.all())
+
+        apply_usage(Tag, {target.pk: added})
+        source.delete()
+    bump_data_version(source.user_id)
+    return MergeResult(touched)
+
+
+def _copy_links(through, source_id: int, target_id: int) -> None:
+    # The ORM has no INSERT ... SELECT, and copying the links through Python
+    # would cost a round trip per batch.
+    connection = connections[through.objects.db]
+    quote = connection.ops.quote_name
+    table = quote(through._meta.db_table)
+    txn = quote(through._meta.get_field("transaction").column)
+    tag = quote(through._meta.get_field("tag").column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({txn}, {tag}) "
+            f"SELECT s.{txn}, %s FROM {table} s WHERE s.{tag} = %s "
+            f"AND NOT EXISTS (SELECT 1 FROM {table} t "
+            f"WHERE t.{txn} = s.{txn} AND t.{tag} = %s)",
+            [target_id, source_id, target_id],
+        )
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class _Shards:
+    """Per-thread storage for metric values.
+
+    Each thread only ever writes to its own dict, so recording takes no lock;
+    the lock is held once per thread to register its shard, and by scrapes to
+    list the shards. Shards of threads that have exited are folded into a
+    retired total with ``merge`` and dropped, so totals never go down and
+    per-request threads (ASGI, runserver) do not pile up.
+    """
+
+    def __init__(self, merge: Callable[[dict, dict], None]):
+        self._merge = merge
+        self._local = threading.local()
+        self._shards: list[tuple[int, dict]] = []
+        self._retired: dict = {}
+        self._lock = threading.Lock()
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._prune()
+                self._shards.append((threading.get_ident(), shard))
+        return shard
+
+    def _prune(self) -> None:
+        # Called with the lock held. A dead thread's shard is no longer
+        # written to; one whose ident was reused is kept until that thread
+        # exits too.
+        alive = {thread.ident for thread in threading.enumerate()}
+        kept = []
+        for ident, shard in self._shards:
+            if ident in alive:
+                kept.append((ident, shard))
+            else:
+                self._merge(self._retired, shard)
+        self._shards = kept
+
+    def all(self) -> list[dict]:
+        with self._lock:
+            self._prune()
+            retired: dict = {}
+            self._merge(retired, self._retired)
+            shards = [shard for _, shard in self._shards]
+        # dict.copy() is atomic with respect to the owning thread's writes.
+        return [retired, *(shard.copy() for shard in shards)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._retired.clear()
+            for _, shard in self._shards:
+                shard.clear()
+
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards(self._merge)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: tuple, **extra) -> dict:
+        return {**dict(zip(self.labelnames, key)), **extra}
+
+    @staticmethod
+    def _merge(into: dict, shard: dict) -> None:
+        for key, value in shard.items():
+            into[key] = into.get(key, 0) + value
+
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, dict, float]]: ...
+
+    def clear(self) -> None:
+        self._shards.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        shard = self._shards.mine()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def totals(self) -> dict[tuple, float]:
+        totals: dict[tuple, float] = {}
+        for shard in self._shards.all():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def samples(self):
+        totals = self.totals()
+        if not totals and not self.labelnames:
+            totals = {(): 0}
+        for key, value in sorted(totals.items()):
+            yield self.name, self._labels(key), value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        shard = self._shards.mine()
+        key = self._key(labels)
+        # Non-cumulative bucket counts, then +Inf, sum and count.
+        slots = shard.get(key)
+        if slots is None:
+            slots = shard[key] = [0] * (len(self.buckets) + 3)
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        slots[index] += 1
+        slots[-2] += value
+        slots[-1] += 1
+
+    @staticmethod
+    def _merge(into: dict, shard: dict) -> None:
+        for key, slots in shard.items():
+            total = into.setdefault(key, [0] * len(slots))
+            for i, value in enumerate(list(slots)):
+                total[i] += value
+
+    def samples(self):
+        merged: dict[tuple, list] = {}
+        for shard in self._shards.all():
+            self._merge(merged, shard)
+        for key, slots in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), slots):
+                cumulative += count
+                yield self.name + "_bucket", self._labels(
+                    key, le=_format(bound)
+                ), cumulative
+            yield self.name + "_sum", self._labels(key), slots[-2]
+            yield self.name + "_count", self._labels(key), slots[-1]
+
+
+class DerivedGauge(Metric):
+    """A gauge computed from other metrics when scraped."""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames, compute: Callable[[], dict]):
+        super().__init__(name, documentation, labelnames)
+        self.compute = compute
+
+    def samples(self):
+        for key, value in sorted(self.compute().items()):
+            yield self.name, self._labels(key), value
+
+
+REGISTRY: list[Metric] = []
+
+
+def register(metric: Metric) -> Metric:
+    REGISTRY.append(metric)
+    return metric
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            label_text = ",".join(
+                f'{label}="{_escape(str(label_value))}"'
+                for label, label_value in labels.items()
+            )
+            if label_text:
+                name = f"{name}{{{label_text}}}"
+            lines.append(f"{name} {_format(value)}")
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_LATENCY = register(
+    Histogram(
+        "finance_request_duration_seconds",
+        "Time to build a response, by URL name, method and viewset action.",
+        ("view", "method", "action"),
+    )
+)
+DB_QUERIES = register(
+    Histogram(
+        "finance_db_queries_per_request",
+        "Database queries run per request, by URL name.",
+        ("view",),
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+)
+DB_TIME = register(
+    Counter(
+        "finance_db_time_seconds_total",
+        "Time spent in database queries, by URL name.",
+        ("view",),
+    )
+)
+CACHE_REQUESTS = register(
+    Counter(
+        "finance_cache_requests_total",
+        "Cache lookups by cache use and result (hit or miss).",
+        ("cache", "result"),
+    )
+)
+
+
+def _hit_ratios() -> dict[tuple, float]:
+    lookups: dict[str, list[float]] = {}
+    for (name, result), count in CACHE_REQUESTS.totals().items():
+        counts = lookups.setdefault(name, [0, 0])
+        counts[result == "hit"] += count
+    return {(name,): hits / (misses + hits) for name, (misses, hits) in lookups.items()}
+
+
+CACHE_HIT_RATIO = register(
+    DerivedGauge(
+        "finance_cache_hit_ratio",
+        "Share of cache lookups that were hits since the process started.",
+        ("cache",),
+        _hit_ratios,
+    )
+)
+IMPORTED_ROWS = register(
+    Counter("finance_import_rows_total", "Transactions created by CSV imports.")
+)
+IMPORT_TIME = register(
+    Counter("finance_import_seconds_total", "Time spent committing CSV imports.")
+)
+EXPORTED_ROWS = register(
+    Counter("finance_export_rows_total", "Transactions written by CSV exports.")
+)
+EXPORT_TIME = register(
+    Counter("finance_export_seconds_total", "Time spent writing CSV exports.")
+)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
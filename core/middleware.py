@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+from django.conf import settings
+
+from . import metrics
+from .instrumentation import (
+    QueryBudgetExceeded,
+    current_stats,
+    query_budget_of,
+    recording_queries,
+)
+from .reference import reference_scope
+from .routers import pin_to_primary, replica_reads
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Long IN lists would otherwise make single log lines tens of KB long.
+LOGGED_SQL_LENGTH = 1000
+
+query_logger = logging.getLogger("core.queries")
+
+
+class ReferenceDataMiddleware:
+    """Share each user's categories and tags across a single request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with reference_scope():
+            return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """Let safe-method requests read from the replica and pin writers to the
+    primary for ``REPLICA_PIN_SECONDS`` so they see their own changes."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            # DRF sets the authenticated user on the request once the view ran.
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+            return response
+        # Load the session user from the primary before routing applies, so a
+        # fresh login is never looked up on a lagging replica.
+        user = getattr(request, "user", None)
+        if user is not None:
+            user.is_authenticated
+        with replica_reads(request):
+            return self.get_response(request)
+
+
+class QueryInstrumentationMiddleware:
+    """Record each request's query count, database time and slowest
+    statements.
+
+    The totals go out in a ``Server-Timing`` header and every request is
+    logged to ``core.queries`` as a JSON line. Views may declare a
+    ``query_budget`` for their reads (writes scale with the submitted
+    payload); going over it is logged as a warning, or raises
+    ``QueryBudgetExceeded`` when ``QUERY_BUDGETS_ENFORCED`` is set (as the
+    test suite does).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "QUERY_INSTRUMENTATION", True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        started = time.perf_counter()
+        with recording_queries(getattr(settings, "QUERY_SLOWEST_KEPT", 3)) as stats:
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        response["Server-Timing"] = (
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", '
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+        budget = None
+        if request.method in SAFE_METHODS:
+            budget = query_budget_of(getattr(request, "resolver_match", None))
+        over_budget = budget is not None and stats.count > budget
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.duration * 1000, 1),
+            "total_ms": round(elapsed * 1000, 1),
+            "budget": budget,
+            "slowest": [
+                {"ms": round(seconds * 1000, 1), "sql": sql[:LOGGED_SQL_LENGTH]}
+                for seconds, sql in stats.slowest
+            ],
+        }
+        query_logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            json.dumps(record),
+            extra={"queries": record},
+        )
+        if over_budget and getattr(settings, "QUERY_BUDGETS_ENFORCED", False):
+            raise QueryBudgetExceeded(
+                f"{request.method} {request.path} ran {stats.count} queries; "
+                f"its view allows {budget}."
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Labels the request's slow queries (core.slow_queries) by view.
+        stats = current_stats()
+        if stats is not None:
+            stats.view = request.resolver_match.view_name
+        return None
+
+
+class MetricsMiddleware:
+    """Feed request latency and query counts into ``core.metrics``.
+
+    Sits just inside ``QueryInstrumentationMiddleware`` so the request's
+    ``QueryStats`` are still being recorded when the response comes back.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "unmatched"
+        # DRF viewsets map each method to an action ("list", "create", ...).
+        actions = getattr(match.func, "actions", None) if match is not None else None
+        action = (actions or {}).get(request.method.lower(), "")
+        metrics.REQUEST_LATENCY.observe(
+            elapsed, view=view, method=request.method, action=action
+        )
+        stats = current_stats()
+        if stats is not None:
+            metrics.DB_QUERIES.observe(stats.count, view=view)
+            metrics.DB_TIME.inc(stats.duration, view=view)
+        return response
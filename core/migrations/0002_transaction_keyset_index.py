@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "-date", "-created_at", "id"],
+                name="transaction_user_keyset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from django.db import migrations
+
+from core.search import install_sqlite_fts, uninstall_sqlite_fts
+
+
+def install(apps, schema_editor):
+    install_sqlite_fts(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_sqlite_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_transaction_keyset_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+SYNCED_MODELS = ("category", "tag", "transaction", "budget")
+
+
+def _sync_fields():
+    for model_name in SYNCED_MODELS:
+        yield migrations.AddField(
+            model_name=model_name,
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        )
+        yield migrations.AddField(
+            model_name=model_name,
+            name="change_seq",
+            field=models.BigIntegerField(default=0, editable=False),
+        )
+        yield migrations.AddIndex(
+            model_name=model_name,
+            index=models.Index(
+                fields=["user", "change_seq"], name=f"{model_name}_user_change_idx"
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0003_transaction_notes_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeSequence",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+                ("pruned_through", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=40)),
+                ("object_id", models.BigIntegerField()),
+                ("change_seq", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(app_label)s_%(class)s",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "change_seq"],
+                        name="tombstone_user_change_idx",
+                    )
+                ],
+            },
+        ),
+        *_sync_fields(),
+    ]
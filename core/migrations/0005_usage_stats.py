@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def rebuild(apps, schema_editor):
+    from core.usage import rebuild_usage_stats
+
+    rebuild_usage_stats(
+        category_model=apps.get_model("core", "Category"),
+        tag_model=apps.get_model("core", "Tag"),
+        transaction_model=apps.get_model("core", "Transaction"),
+    )
+
+
+def _usage_fields(model_name):
+    return [
+        migrations.AddField(
+            model_name=model_name,
+            name="transaction_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name="income_total",
+            field=models.DecimalField(
+                decimal_places=2, default=Decimal("0"), editable=False, max_digits=14
+            ),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name="expense_total",
+            field=models.DecimalField(
+                decimal_places=2, default=Decimal("0"), editable=False, max_digits=14
+            ),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name="last_used",
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_sync_change_tracking"),
+    ]
+
+    operations = [
+        *_usage_fields("category"),
+        *_usage_fields("tag"),
+        migrations.RunPython(rebuild, migrations.RunPython.noop),
+    ]
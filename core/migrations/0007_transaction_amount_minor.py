@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+from django.db.models import Case, F, Max, Min, Value, When
+from django.db.models.functions import Cast, Round
+
+BATCH_SIZE = 10_000
+
+
+def backfill(apps, schema_editor):
+    from core.money import MINOR_PER_UNIT
+
+    Transaction = apps.get_model("core", "Transaction")
+    bounds = Transaction.objects.aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is None:
+        return
+    minor = Cast(Round(F("amount") * Value(MINOR_PER_UNIT)), models.BigIntegerField())
+    # One UPDATE per primary key range keeps each statement, and the locks it
+    # takes, bounded on large tables.
+    for start in range(bounds["low"], bounds["high"] + 1, BATCH_SIZE):
+        Transaction.objects.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(
+            amount_minor=minor,
+            signed_amount_minor=Case(
+                When(type="INCOME", then=minor),
+                default=minor * Value(-1),
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("core", "0006_categorization_rules"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="amount_minor",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="signed_amount_minor",
+            field=models.BigIntegerField(
+                default=0, editable=False, help_text="Negative for expenses."
+            ),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    from core.sync import backfill_change_sequences
+
+    backfill_change_sequences(
+        change_sequence_model=apps.get_model("core", "ChangeSequence"),
+        synced_models=[
+            apps.get_model("core", name)
+            for name in ("Category", "Tag", "Budget", "Transaction")
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_transaction_amount_minor"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
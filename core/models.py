@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import re
 from decimal import Decimal
 from typing import Iterable
 
@@ -8,9 +9,12 @@ from django.conf import settings
 from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 
+from .money import to_minor
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -25,7 +29,87 @@ class BaseUserModel(models.Model):
         abstract = True
 
 
-class Category(BaseUserModel):
+class ChangeSequence(models.Model):
+    """Per-user counter that orders every change to the user's synced rows."""
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    value = models.BigIntegerField(default=0)
+    pruned_through = models.BigIntegerField(default=0)
+
+    @classmethod
+    def allocate(cls, user_id: int, count: int = 1) -> int:
+        """Reserve ``count`` sequence numbers and return the highest one.
+
+        Must run inside a transaction: the counter row stays locked until
+        commit, so a user's changes commit in sequence order.
+        """
+        rows = cls.objects.filter(user_id=user_id)
+        if not rows.update(value=F("value") + count):
+            cls.objects.get_or_create(user_id=user_id)
+            rows.update(value=F("value") + count)
+        return rows.values_list("value", flat=True).get()
+
+    @classmethod
+    def current(cls, user_id: int) -> int:
+        return (
+            cls.objects.filter(user_id=user_id).values_list("value", flat=True).first()
+            or 0
+        )
+
+
+class SyncedUserModel(BaseUserModel):
+    """Per-user model whose saves are stamped with the next change sequence."""
+
+    updated_at = models.DateTimeField(auto_now=True)
+    change_seq = models.BigIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "updated_at", "change_seq"}
+        with transaction.atomic(using=kwargs.get("using")):
+            self.change_seq = ChangeSequence.allocate(self.user_id)
+            super().save(*args, **kwargs)
+
+
+class UsageStatsModel(models.Model):
+    """Denormalized usage figures, maintained by ``core.usage``."""
+
+    transaction_count = models.PositiveIntegerField(default=0, editable=False)
+    income_total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0"), editable=False
+    )
+    expense_total = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0"), editable=False
+    )
+    last_used = models.DateField(null=True, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
+class Tombstone(BaseUserModel):
+    """Records a deleted synced row so clients can drop their copy."""
+
+    model = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    change_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "change_seq"], name="tombstone_user_change_idx"
+            )
+        ]
+
+
+class Category(UsageStatsModel, SyncedUserModel):
     class Kind(models.TextChoices):
         INCOME = "INCOME", "Income"
         EXPENSE = "EXPENSE", "Expense"
@@ -39,12 +123,15 @@ class Category(BaseUserModel):
     class Meta:
         ordering = ("name",)
         unique_together = ("user", "name", "kind")
+        indexes = [
+            models.Index(fields=["user", "change_seq"], name="category_user_change_idx")
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.name} ({self.get_kind_display()})"
 
 
-class Tag(BaseUserModel):
+class Tag(UsageStatsModel, SyncedUserModel):
     name = models.CharField(max_length=120)
     archived = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -52,6 +139,9 @@ class Tag(BaseUserModel):
     class Meta:
         ordering = ("name",)
         unique_together = ("user", "name")
+        indexes = [
+            models.Index(fields=["user", "change_seq"], name="tag_user_change_idx")
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return self.name
@@ -64,6 +154,12 @@ class TransactionQuerySet(models.QuerySet):
     def with_related(self) -> "TransactionQuerySet":
         return self.select_related("category").prefetch_related("tags")
 
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.set_minor_amounts()
+        return super().bulk_create(objs, *args, **kwargs)
+
 
 class TransactionManager(models.Manager):
     def get_queryset(self) -> TransactionQuerySet:  # type: ignore[override]
@@ -73,7 +169,7 @@ class TransactionManager(models.Manager):
         return self.get_queryset().for_user(user)
 
 
-class Transaction(BaseUserModel):
+class Transaction(SyncedUserModel):
     class Type(models.TextChoices):
         INCOME = "INCOME", "Income"
         EXPENSE = "EXPENSE", "Expense"
@@ -84,6 +180,10 @@ class Transaction(BaseUserModel):
         decimal_places=2,
         validators=[MinValueValidator(Decimal("0.01"))],
     )
+    amount_minor = models.BigIntegerField(default=0, editable=False)
+    signed_amount_minor = models.BigIntegerField(
+        default=0, editable=False, help_text="Negative for expenses."
+    )
     currency = models.CharField(max_length=3, default="GBP")
     date = models.DateField()
     category = models.ForeignKey(
@@ -104,6 +204,13 @@ class Transaction(BaseUserModel):
         indexes = [
             models.Index(fields=["user", "date"]),
             models.Index(fields=["user", "category", "date"]),
+            models.Index(
+                fields=["user", "-date", "-created_at", "id"],
+                name="transaction_user_keyset_idx",
+            ),
+            models.Index(
+                fields=["user", "change_seq"], name="transaction_user_change_idx"
+            ),
             GinIndex(
                 name="transaction_notes_trgm",
                 fields=["notes"],
@@ -114,6 +221,31 @@ class Transaction(BaseUserModel):
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.get_type_display()} {self.amount} {self.currency} on {self.date}"
 
+    def save(self, *args, **kwargs):
+        self.set_minor_amounts()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"amount", "type"} & set(update_fields):
+            kwargs["update_fields"] = {
+                *update_fields,
+                "amount_minor",
+                "signed_amount_minor",
+            }
+        super().save(*args, **kwargs)
+
+    def set_minor_amounts(self) -> None:
+        """Derive the integer columns from ``amount`` and ``type``.
+
+        Queryset ``update()`` calls that change either must set the columns
+        themselves.
+        """
+        amount = self._meta.get_field("amount").to_python(self.amount)
+        if amount is None:
+            return
+        self.amount_minor = to_minor(amount)
+        self.signed_amount_minor = (
+            self.amount_minor if self.type == self.Type.INCOME else -self.amount_minor
+        )
+
     @property
     def signed_amount(self) -> Decimal:
         multiplier = Decimal("1") if self.type == self.Type.INCOME else Decimal("-1")
@@ -137,7 +269,7 @@ class Transaction(BaseUserModel):
         self.tags.set(tags)
 
 
-class Budget(BaseUserModel):
+class Budget(SyncedUserModel):
     class Period(models.TextChoices):
         MONTH = "MONTH", "Month"
 
@@ -161,6 +293,9 @@ class Budget(BaseUserModel):
     class Meta:
         ordering = ("-start_month", "category__name")
         unique_together = ("user", "category", "start_month")
+        indexes = [
+            models.Index(fields=["user", "change_seq"], name="budget_user_change_idx")
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.category} budget for {self.start_month:%B %Y}"
@@ -181,6 +316,82 @@ class Budget(BaseUserModel):
             )
 
 
+class CategorizationRule(BaseUserModel):
+    """Assigns a category and tags to transactions whose notes match."""
+
+    class MatchType(models.TextChoices):
+        KEYWORD = "KEYWORD", "Keyword"
+        REGEX = "REGEX", "Regular expression"
+
+    name = models.CharField(max_length=120, blank=True)
+    match_type = models.CharField(
+        max_length=10, choices=MatchType.choices, default=MatchType.KEYWORD
+    )
+    pattern = models.CharField(
+        max_length=255, help_text="Matched against the notes, ignoring case."
+    )
+    min_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    max_amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="rules",
+    )
+    tags = models.ManyToManyField(Tag, blank=True, related_name="rules")
+    priority = models.PositiveIntegerField(
+        default=100, help_text="Rules with lower numbers win."
+    )
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("priority", "id")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.name or self.pattern
+
+    def clean(self) -> None:
+        super().clean()
+        if not self.pattern.strip():
+            raise ValidationError({"pattern": "Enter a keyword or pattern."})
+        if self.match_type == self.MatchType.REGEX:
+            validate_rule_pattern(self.pattern)
+        if self.category and self.category.user_id != self.user_id:
+            raise ValidationError(
+                {"category": "Category must belong to the rule user."}
+            )
+        if (
+            self.min_amount is not None
+            and self.max_amount is not None
+            and self.min_amount > self.max_amount
+        ):
+            raise ValidationError(
+                {"max_amount": "Maximum amount must not be below the minimum."}
+            )
+
+
+def validate_rule_pattern(pattern: str) -> None:
+    # Rules are compiled into one combined expression, so a pattern must not
+    # depend on its own group numbering or names.
+    try:
+        compiled = re.compile(pattern)
+    except re.error as exc:
+        raise ValidationError({"pattern": f"Invalid regular expression: {exc}"})
+    if compiled.groupindex or re.search(r"\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)", pattern):
+        raise ValidationError(
+            {
+                "pattern": "Named groups, back-references and inline flags "
+                "are not supported."
+            }
+        )
+
+
 @dataclass(frozen=True)
 class ReportRow:
     month: int
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+
+# Transaction amounts are stored with two decimal places, so a minor unit is
+# a hundredth of the amount whatever the currency.
+MINOR_EXPONENT = 2
+MINOR_PER_UNIT = 10**MINOR_EXPONENT
+
+
+def to_minor(amount: Decimal | str | int) -> int:
+    return int(
+        (Decimal(amount) * MINOR_PER_UNIT).to_integral_value(rounding=ROUND_HALF_UP)
+    )
+
+
+def from_minor(value: int | None) -> Decimal:
+    return Decimal(value or 0).scaleb(-MINOR_EXPONENT)
+
+
+def minor_to_float(value: int | None) -> float:
+    return (value or 0) / MINOR_PER_UNIT
+
+
+def format_minor(value: int) -> str:
+    units, minor = divmod(abs(value), MINOR_PER_UNIT)
+    sign = "-" if value < 0 else ""
+    return f"{sign}{units}.{minor:0{MINOR_EXPONENT}d}"
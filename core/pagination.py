@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.caching import get_data_version, user_key
+from core.metrics import cache_lookup
+
+KEYSET_ORDERING = ("-date", "-created_at", "id")
+REVERSE_KEYSET_ORDERING = ("date", "created_at", "-id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position of a row in ``KEYSET_ORDERING`` plus the paging direction."""
+
+    date: date
+    created_at: datetime
+    id: int
+    reverse: bool = False
+
+    def encode(self) -> str:
+        payload = {
+            "d": self.date.isoformat(),
+            "c": self.created_at.isoformat(),
+            "i": self.id,
+        }
+        if self.reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            cursor = cls(
+                date=parse_date(payload["d"]),
+                created_at=parse_datetime(payload["c"]),
+                id=int(payload["i"]),
+                reverse=bool(payload.get("r")),
+            )
+        except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+            raise InvalidCursor("Invalid cursor") from exc
+        if cursor.date is None or cursor.created_at is None:
+            raise InvalidCursor("Invalid cursor")
+        return cursor
+
+    @classmethod
+    def from_row(cls, row: Any, reverse: bool = False) -> "Cursor":
+        if isinstance(row, dict):
+            return cls(row["date"], row["created_at"], row["id"], reverse)
+        return cls(row.date, row.created_at, row.id, reverse)
+
+    def rows_after(self) -> Q:
+        """Filter for rows that come after this position in paging direction."""
+        if self.reverse:
+            return Q(date__gte=self.date) & (
+                Q(date__gt=self.date)
+                | Q(date=self.date, created_at__gt=self.created_at)
+                | Q(date=self.date, created_at=self.created_at, id__lt=self.id)
+            )
+        return Q(date__lte=self.date) & (
+            Q(date__lt=self.date)
+            | Q(date=self.date, created_at__lt=self.created_at)
+            | Q(date=self.date, created_at=self.created_at, id__gt=self.id)
+        )
+
+
+@dataclass
+class KeysetPage:
+    object_list: Sequence[Any]
+    next_cursor: str | None
+    previous_cursor: str | None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+def paginate_keyset(queryset, cursor_value: str | None, page_size: int) -> KeysetPage:
+    """Return one page of ``queryset`` in ``KEYSET_ORDERING`` without OFFSET.
+
+    Each page is a single indexed range scan of ``page_size + 1`` rows, so
+    the cost does not depend on how deep the page is and no ``COUNT(*)`` is
+    needed. ``cursor_value`` may be empty to request the first page.
+    """
+    cursor = Cursor.decode(cursor_value) if cursor_value else None
+    reverse = cursor is not None and cursor.reverse
+    ordering = REVERSE_KEYSET_ORDERING if reverse else KEYSET_ORDERING
+    queryset = queryset.order_by(*ordering)
+    if cursor is not None:
+        queryset = queryset.filter(cursor.rows_after())
+    rows = list(queryset[: page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if reverse:
+        rows.reverse()
+    if not rows:
+        return KeysetPage(rows, None, None)
+
+    if reverse:
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, cursor is not None
+    next_cursor = Cursor.from_row(rows[-1]).encode() if has_next else None
+    previous_cursor = (
+        Cursor.from_row(rows[0], reverse=True).encode() if has_previous else None
+    )
+    return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+def estimate_count(queryset) -> int | None:
+    """Return the planner's row estimate for ``queryset`` on Postgres."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CountedPage(Page):
+    more: bool | None = None
+
+    def has_next(self) -> bool:
+        if self.more is not None:
+            return self.more
+        return super().has_next()
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that avoids repeated and unbounded ``COUNT(*)`` queries.
+
+    Counts are cached per user, query and data version, so they stay exact
+    until the user's transactions change. Counting stops at
+    ``PAGINATION_COUNT_THRESHOLD`` rows; beyond that the count is the
+    planner estimate on Postgres, or the threshold itself elsewhere, and
+    ``count_is_estimate`` is set.
+    """
+
+    def __init__(self, object_list, per_page, *args, user_id=None, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.user_id = user_id
+        self.count_threshold = getattr(settings, "PAGINATION_COUNT_THRESHOLD", 10000)
+        self.cache_timeout = getattr(settings, "PAGINATION_COUNT_CACHE_SECONDS", 300)
+        self.count_is_estimate = False
+
+    def _cache_key(self) -> str | None:
+        if self.user_id is None or not hasattr(self.object_list, "query"):
+            return None
+        sql, params = self.object_list.order_by().query.sql_with_params()
+        digest = hashlib.sha1(repr((sql, params)).encode()).hexdigest()
+        version = get_data_version(self.user_id)
+        return user_key(self.user_id, "count", version, digest)
+
+    @cached_property
+    def count(self) -> int:
+        if not hasattr(self.object_list, "query"):
+            return super().count
+        key = self._cache_key()
+        if key is None:
+            count, self.count_is_estimate = self._count()
+            return count
+        cached = cache.get(key)
+        cache_lookup("row_count", cached is not None)
+        if cached is None:
+            # Concurrent requests for the same page count it only once.
+            cached = cache.get_or_set(key, self._count, self.cache_timeout)
+        count, self.count_is_estimate = cached
+        return count
+
+    def _count(self) -> tuple[int, bool]:
+        queryset = self.object_list.order_by()
+        count = queryset[: self.count_threshold + 1].count()
+        if count <= self.count_threshold:
+            return count, False
+        estimate = estimate_count(queryset)
+        return (max(estimate, count) if estimate is not None else count - 1), True
+
+    @property
+    def count_display(self) -> str:
+        count = self.count
+        if not self.count_is_estimate:
+            return f"{count:,}"
+        if connections[self.object_list.db].vendor == "postgresql":
+            return f"~{count:,}"
+        return f"{count:,}+"
+
+    def validate_number(self, number):
+        self.count  # Resolves whether the count is an estimate.
+        if not self.count_is_estimate:
+            return super().validate_number(number)
+        # The real page count is unknown, so only reject malformed numbers.
+        try:
+            number = int(number)
+        except (TypeError, ValueError) as exc:
+            raise PageNotAnInteger("That page number is not an integer") from exc
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        # Past the counted range: fetch one extra row to learn if more exist.
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        page = self._get_page(rows[: self.per_page], number, self)
+        page.more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return CountedPage(*args, **kwargs)
+
+
+class TransactionPagination(PageNumberPagination):
+    """Page-number pagination with an opt-in keyset mode.
+
+    Passing ``?cursor=`` (empty for the first page) switches to keyset
+    pagination over ``KEYSET_ORDERING``: responses carry ``next`` and
+    ``previous`` cursor links and no ``count``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_page = None
+        if self.cursor_query_param not in request.query_params:
+            self.django_paginator_class = partial(
+                CachedCountPaginator, user_id=request.user.pk
+            )
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.keyset_page = paginate_keyset(
+                queryset, request.query_params[self.cursor_query_param], page_size
+            )
+        except InvalidCursor as exc:
+            raise NotFound(str(exc)) from exc
+        return list(self.keyset_page.object_list)
+
+    def get_paginated_response(self, data):
+        if self.keyset_page is None:
+            response = super().get_paginated_response(data)
+            response.data["count_is_estimate"] = self.page.paginator.count_is_estimate
+            return response
+        return Response(
+            {
+                "next": self._cursor_link(self.keyset_page.next_cursor),
+                "previous": self._cursor_link(self.keyset_page.previous_cursor),
+                "results": data,
+            }
+        )
+
+    def _cursor_link(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics import add_months
+from .models import Transaction
+
+TABLE = Transaction._meta.db_table
+TAGS_TABLE = Transaction.tags.through._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+BRIN_INDEX = "transaction_date_brin"
+
+
+class PartitioningUnavailable(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class MonthPartition:
+    start: date
+
+    @property
+    def end(self) -> date:
+        return add_months(self.start, 1)
+
+    @property
+    def name(self) -> str:
+        return f"{TABLE}_p{self.start:%Y_%m}"
+
+
+@dataclass
+class Conversion:
+    """What ``convert_to_partitioned`` did, for the command to report."""
+
+    copied: int
+    dropped: list[str]
+    recreated: list[str]
+
+
+def month_partitions(first: date, last: date) -> list[MonthPartition]:
+    """Monthly partitions covering ``first`` through ``last`` inclusive."""
+    start = first.replace(day=1)
+    partitions = []
+    while start <= last:
+        partitions.append(MonthPartition(start))
+        start = add_months(start, 1)
+    return partitions
+
+
+def _require_postgres(connection) -> None:
+    if connection.vendor != "postgresql":
+        raise PartitioningUnavailable(
+            "Transaction partitioning is only available on PostgreSQL."
+        )
+
+
+def is_partitioned(connection) -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(%s)",
+            [TABLE],
+        )
+        row = cursor.fetchone()
+    return bool(row and row[0])
+
+
+def existing_partitions(connection) -> set[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def ensure_partitions(connection, through: date) -> list[str]:
+    """Create any missing monthly partitions up to the month of ``through``.
+
+    Starts from the current month. Rows already sitting in the default
+    partition for a new month are moved into it before it is attached.
+    Returns the names of the partitions created.
+    """
+    _require_postgres(connection)
+    if not is_partitioned(connection):
+        raise PartitioningUnavailable(
+            f"{TABLE} is not partitioned yet; run with --convert first."
+        )
+    quote = connection.ops.quote_name
+    present = existing_partitions(connection)
+    created = []
+    first = timezone.localdate().replace(day=1)
+    for partition in month_partitions(first, through):
+        if partition.name in present:
+            continue
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {quote(partition.name)} "
+                f"(LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} "
+                f"WHERE date >= %s AND date < %s RETURNING *) "
+                f"INSERT INTO {quote(partition.name)} SELECT * FROM moved",
+                [partition.start, partition.end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION "
+                f"{quote(partition.name)} FOR VALUES FROM (%s) TO (%s)",
+                [partition.start, partition.end],
+            )
+        created.append(partition.name)
+    return created
+
+
+def _dependents(cursor) -> list[tuple[str, str | None]]:
+    """Objects that ``DROP TABLE ... CASCADE`` would drop along with the
+    transaction table, each with its constraint name when it is the tag link
+    table's foreign key."""
+    cursor.execute(
+        # One row per referenced column, hence DISTINCT.
+        "SELECT DISTINCT pg_describe_object(dep.classid, dep.objid, 0), "
+        "con.conname FROM pg_depend dep "
+        "LEFT JOIN pg_constraint con ON dep.classid = 'pg_constraint'::regclass "
+        "AND con.oid = dep.objid AND con.contype = 'f' "
+        "AND con.conrelid = to_regclass(%s) "
+        "WHERE dep.refclassid = 'pg_class'::regclass "
+        "AND dep.refobjid = to_regclass(%s) AND dep.deptype = 'n' "
+        "ORDER BY 1",
+        [TAGS_TABLE, TABLE],
+    )
+    return cursor.fetchall()
+
+
+def convert_to_partitioned(connection, through: date) -> Conversion:
+    """Rebuild the transaction table as a table partitioned by month on date.
+
+    The table is locked and copied in one transaction, so writes wait until
+    it finishes. The primary key becomes ``(id, date)`` because Postgres
+    requires the partition key in every unique constraint; as a result the
+    foreign key from the tag link table to transactions is dropped and not
+    recreated (Django still deletes links when a transaction is deleted).
+    Every other index, the outgoing foreign keys and the id sequence are
+    recreated, plus a BRIN index on date. Refuses to run when anything else,
+    such as a view, depends on the table.
+    """
+    _require_postgres(connection)
+    if is_partitioned(connection):
+        raise PartitioningUnavailable(f"{TABLE} is already partitioned.")
+    quote = connection.ops.quote_name
+    table, staging = quote(TABLE), quote(f"{TABLE}_partitioned")
+    sequence, staging_sequence = f"{TABLE}_id_seq", f"{TABLE}_partitioned_id_seq"
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        dependents = _dependents(cursor)
+        unexpected = [name for name, tags_fk in dependents if tags_fk is None]
+        if unexpected:
+            raise PartitioningUnavailable(
+                f"{TABLE} cannot be rebuilt while other objects depend on it: "
+                + "; ".join(unexpected)
+            )
+        tags_fks = [tags_fk for _, tags_fk in dependents]
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = %s AND indexname NOT IN ("
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s))",
+            [TABLE, TABLE],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT min(date), max(id) FROM {table}")
+        first_date, max_id = cursor.fetchone()
+
+        cursor.execute(
+            f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS "
+            "INCLUDING CONSTRAINTS INCLUDING STORAGE) PARTITION BY RANGE (date)"
+        )
+        cursor.execute(f"ALTER TABLE {staging} ADD PRIMARY KEY (id, date)")
+        cursor.execute(f"CREATE SEQUENCE {quote(staging_sequence)}")
+        cursor.execute(
+            f"ALTER TABLE {staging} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{staging_sequence}')"
+        )
+        cursor.execute(
+            "SELECT setval(%s, %s, %s)",
+            [staging_sequence, max_id or 1, max_id is not None],
+        )
+        cursor.execute(
+            f"CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {staging} DEFAULT"
+        )
+        for partition in month_partitions(first_date or timezone.localdate(), through):
+            cursor.execute(
+                f"CREATE TABLE {quote(partition.name)} PARTITION OF {staging} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [partition.start, partition.end],
+            )
+        cursor.execute(f"INSERT INTO {staging} SELECT * FROM {table}")
+        copied = cursor.rowcount
+
+        for name in tags_fks:
+            cursor.execute(
+                f"ALTER TABLE {quote(TAGS_TABLE)} DROP CONSTRAINT {quote(name)}"
+            )
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        cursor.execute(
+            f"ALTER TABLE {table} RENAME CONSTRAINT "
+            f"{quote(f'{TABLE}_partitioned_pkey')} TO {quote(f'{TABLE}_pkey')}"
+        )
+        cursor.execute(
+            f"ALTER SEQUENCE {quote(staging_sequence)} RENAME TO {quote(sequence)}"
+        )
+        cursor.execute(f"ALTER SEQUENCE {quote(sequence)} OWNED BY {table}.id")
+        for _, definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}"
+            )
+        cursor.execute(f"CREATE INDEX {quote(BRIN_INDEX)} ON {table} USING brin (date)")
+    return Conversion(
+        copied=copied,
+        dropped=[f"foreign key {name} on {TAGS_TABLE}" for name in tags_fks],
+        recreated=[
+            *(f"index {name}" for name, _ in indexes),
+            *(f"foreign key {name}" for name, _ in foreign_keys),
+            f"sequence {sequence}",
+        ],
+    )
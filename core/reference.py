@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.utils.functional import cached_property
+
+from .models import Category, Tag
+from .rules import RuleMatcher, compile_rules
+
+_scope: ContextVar[dict[int, "UserReferenceData"] | None] = ContextVar(
+    "finance_reference_scope", default=None
+)
+
+
+class UserReferenceData:
+    """A user's categories, tags and rules, loaded once and shared by lookups.
+
+    Forms, serializers, imports and reports use these lists and maps instead
+    of running their own ``Category``/``Tag`` queries.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+
+    @cached_property
+    def categories(self) -> list[Category]:
+        return list(Category.objects.filter(user_id=self.user_id).order_by("name"))
+
+    @cached_property
+    def tags(self) -> list[Tag]:
+        return list(Tag.objects.filter(user_id=self.user_id).order_by("name"))
+
+    @cached_property
+    def categories_by_id(self) -> dict[int, Category]:
+        return {category.pk: category for category in self.categories}
+
+    @cached_property
+    def tags_by_id(self) -> dict[int, Tag]:
+        return {tag.pk: tag for tag in self.tags}
+
+    @cached_property
+    def categories_by_name(self) -> dict[tuple[str, str], Category]:
+        return {
+            (category.name, category.kind): category for category in self.categories
+        }
+
+    @cached_property
+    def rule_matcher(self) -> RuleMatcher:
+        return compile_rules(self.user_id, self.categories_by_id, self.tags_by_id)
+
+    def active_categories(self, kind: str | None = None) -> list[Category]:
+        return [
+            category
+            for category in self.categories
+            if not category.archived and (kind is None or category.kind == kind)
+        ]
+
+    def active_tags(self) -> list[Tag]:
+        return [tag for tag in self.tags if not tag.archived]
+
+    def get_or_create_category(
+        self, name: str, kind: str, defaults: dict | None = None
+    ) -> Category:
+        category = self.categories_by_name.get((name, kind))
+        if category is None:
+            category, _ = Category.objects.get_or_create(
+                user_id=self.user_id, name=name, kind=kind, defaults=defaults or {}
+            )
+            self.add(category)
+        return category
+
+    def add(self, category: Category) -> None:
+        self.categories.append(category)
+        self.categories.sort(key=lambda item: item.name)
+        self.categories_by_id[category.pk] = category
+        self.categories_by_name[(category.name, category.kind)] = category
+        # Saving the category invalidated this instance; it is current again.
+        scope = _scope.get()
+        if scope is not None:
+            scope[self.user_id] = self
+
+
+def reference_data_for(user) -> UserReferenceData:
+    """Return the reference data for ``user`` in the current scope.
+
+    Inside ``reference_scope()`` (every request, via
+    ``ReferenceDataMiddleware``) one instance per user is shared; elsewhere
+    a fresh instance is returned.
+    """
+    user_id = getattr(user, "pk", user)
+    scope = _scope.get()
+    if scope is None:
+        return UserReferenceData(user_id)
+    data = scope.get(user_id)
+    if data is None:
+        data = scope[user_id] = UserReferenceData(user_id)
+    return data
+
+
+def invalidate_reference_data(user_id: int) -> None:
+    scope = _scope.get()
+    if scope is not None:
+        scope.pop(user_id, None)
+
+
+@contextmanager
+def reference_scope():
+    token = _scope.set({})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
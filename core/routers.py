@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .caching import user_key
+
+REPLICA_ALIAS = "replica"
+
+
+@dataclass
+class _ReadRouting:
+    request: object
+    pinned: dict[int, bool] = field(default_factory=dict)
+
+    def allows_replica(self) -> bool:
+        user = getattr(self.request, "user", None)
+        user_id = getattr(user, "pk", None)
+        if user_id is None:
+            return True
+        if user_id not in self.pinned:
+            self.pinned[user_id] = is_pinned(user_id)
+        return not self.pinned[user_id]
+
+
+_routing: ContextVar[_ReadRouting | None] = ContextVar(
+    "finance_read_routing", default=None
+)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def pin_to_primary(user_id: int) -> None:
+    """Send the user's reads to the primary until the replica has caught up."""
+    seconds = getattr(settings, "REPLICA_PIN_SECONDS", 10)
+    if seconds > 0:
+        cache.set(user_key(user_id, "replica-pin"), True, seconds)
+
+
+def is_pinned(user_id: int) -> bool:
+    return bool(cache.get(user_key(user_id, "replica-pin")))
+
+
+@contextmanager
+def replica_reads(request):
+    """Allow reads made while handling ``request`` to use the replica."""
+    token = _routing.set(_ReadRouting(request))
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+class ReplicaRouter:
+    """Route reads to the ``replica`` database where it is safe to.
+
+    Only reads inside ``replica_reads()`` (safe-method requests, via
+    ``ReplicaRoutingMiddleware``) are candidates. They stay on the primary
+    when no replica is configured, inside a transaction on the primary, or
+    while the requesting user is pinned after a write.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or not replica_configured():
+            return None
+        if model._meta.app_label == "django_cache":
+            # DatabaseCache entries (replica pins, data versions) must be
+            # read where they were just written.
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if not routing.allows_replica():
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema through replication.
+        return db != REPLICA_ALIAS
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, Sequence
+
+from django.db import transaction
+
+from .bulk import BulkAction, apply_bulk_action, select_transactions
+from .models import CategorizationRule, Category, Tag, Transaction
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every keyword contained in a text.
+
+    Lookups walk the text once, however many keywords there are.
+    """
+
+    def __init__(self, keywords: Iterable[tuple[str, int]]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._output: list[list[int]] = [[]]
+        for word, value in keywords:
+            node = 0
+            for char in word:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = self._goto[node][char] = len(self._goto)
+                    self._goto.append({})
+                    self._output.append([])
+                node = child
+            self._output[node].append(value)
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+                queue.append(child)
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def find(self, text: str) -> set[int]:
+        goto, fail, output = self._goto, self._fail, self._output
+        found: set[int] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    rule_id: int
+    match_type: str
+    pattern: str
+    min_amount: Decimal | None
+    max_amount: Decimal | None
+    category: Category | None
+    tags: tuple[Tag, ...]
+
+    def accepts(self, amount: Decimal, txn_type: str) -> bool:
+        if self.min_amount is not None and amount < self.min_amount:
+            return False
+        if self.max_amount is not None and amount > self.max_amount:
+            return False
+        return self.category is None or self.category.kind == txn_type
+
+
+class RuleMatcher:
+    """A user's active rules compiled for matching against notes.
+
+    Keyword rules share one ``KeywordAutomaton`` and regular expression rules
+    are joined into a single pattern, so a lookup scans the notes once per
+    rule type instead of once per rule. The rule with the lowest priority
+    whose amount range and category kind fit the transaction wins.
+    """
+
+    def __init__(self, rules: Sequence[CompiledRule]):
+        self.rules = list(rules)
+        self._keywords = KeywordAutomaton(
+            (rule.pattern.lower(), index)
+            for index, rule in enumerate(self.rules)
+            if rule.match_type == CategorizationRule.MatchType.KEYWORD
+        )
+        self._regex_indexes = [
+            index
+            for index, rule in enumerate(self.rules)
+            if rule.match_type == CategorizationRule.MatchType.REGEX
+        ]
+        self._regex = None
+        if self._regex_indexes:
+            # Each alternative sits in a lookahead, so finditer() tries every
+            # position and reports the first rule, in rule order, matching
+            # there.
+            self._regex = re.compile(
+                "(?=%s)"
+                % "|".join(
+                    f"(?P<r{index}>{self.rules[index].pattern})"
+                    for index in self._regex_indexes
+                ),
+                re.IGNORECASE,
+            )
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def match(self, notes: str, amount: Decimal, txn_type: str) -> CompiledRule | None:
+        if not self.rules or not notes:
+            return None
+        best: int | None = None
+        for index in self._keywords.find(notes.lower()):
+            if (best is None or index < best) and self.rules[index].accepts(
+                amount, txn_type
+            ):
+                best = index
+        if self._regex is not None:
+            shadowed = False
+            for found in self._regex.finditer(notes):
+                index = int(found.lastgroup[1:])
+                if best is not None and index >= best:
+                    continue
+                if self.rules[index].accepts(amount, txn_type):
+                    best = index
+                else:
+                    shadowed = True
+            if shadowed:
+                # A rejected rule may have hidden a later rule matching at
+                # the same position; check the remaining candidates one by one.
+                for index in self._regex_indexes:
+                    if best is not None and index >= best:
+                        break
+                    rule = self.rules[index]
+                    if rule.accepts(amount, txn_type) and re.search(
+                        rule.pattern, notes, re.IGNORECASE
+                    ):
+                        best = index
+        return None if best is None else self.rules[best]
+
+
+def compile_rules(
+    user_id: int,
+    categories_by_id: dict[int, Category],
+    tags_by_id: dict[int, Tag],
+) -> RuleMatcher:
+    rules = list(
+        CategorizationRule.objects.filter(user_id=user_id, active=True).order_by(
+            "priority", "pk"
+        )
+    )
+    rule_tags: dict[int, list[Tag]] = {}
+    for rule_id, tag_id in CategorizationRule.tags.through.objects.filter(
+        categorizationrule__user_id=user_id
+    ).values_list("categorizationrule_id", "tag_id"):
+        if tag_id in tags_by_id:
+            rule_tags.setdefault(rule_id, []).append(tags_by_id[tag_id])
+    return RuleMatcher(
+        [
+            CompiledRule(
+                rule_id=rule.pk,
+                match_type=rule.match_type,
+                pattern=rule.pattern,
+                min_amount=rule.min_amount,
+                max_amount=rule.max_amount,
+                category=categories_by_id.get(rule.category_id),
+                tags=tuple(sorted(rule_tags.get(rule.pk, ()), key=lambda t: t.pk)),
+            )
+            for rule in rules
+        ]
+    )
+
+
+@dataclass(frozen=True)
+class RuleApplication:
+    scanned: int
+    categorized: int
+    tagged: int
+
+
+def apply_rules(
+    user,
+    matcher: RuleMatcher,
+    *,
+    overwrite: bool = False,
+    batch_size: int = 1000,
+) -> RuleApplication:
+    """Run ``matcher`` over the user's existing transactions.
+
+    Only uncategorized transactions are considered unless ``overwrite`` is
+    set. Rows are read in primary key batches and each batch is written with
+    one bulk action per matched category and per matched tag set.
+    """
+    scanned = categorized = tagged = 0
+    if not matcher:
+        return RuleApplication(scanned, categorized, tagged)
+    queryset = Transaction.objects.for_user(user)
+    if not overwrite:
+        queryset = queryset.filter(category__isnull=True)
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "notes", "amount", "type", "category_id")[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+        scanned += len(batch)
+        by_category: dict[Category, list[int]] = {}
+        by_tags: dict[tuple[Tag, ...], list[int]] = {}
+        for pk, notes, amount, txn_type, category_id in batch:
+            rule = matcher.match(notes, amount, txn_type)
+            if rule is None:
+                continue
+            if rule.category is not None and rule.category.pk != category_id:
+                by_category.setdefault(rule.category, []).append(pk)
+            if rule.tags:
+                by_tags.setdefault(rule.tags, []).append(pk)
+        with transaction.atomic():
+            for category, ids in by_category.items():
+                categorized += apply_bulk_action(
+                    user,
+                    select_transactions(user, ids=ids),
+                    BulkAction.SET_CATEGORY,
+                    category=category,
+                ).affected
+            for tags, ids in by_tags.items():
+                tagged += apply_bulk_action(
+                    user,
+                    select_transactions(user, ids=ids),
+                    BulkAction.ADD_TAGS,
+                    tags=tags,
+                ).affected
+    return RuleApplication(scanned, categorized, tagged)
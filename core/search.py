@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections, transaction
+from django.db.models import F, FloatField, Lookup, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+FTS_TABLE = "core_transaction_fts"
+TRANSACTION_TABLE = "core_transaction"
+
+SQLITE_FTS_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        notes,
+        content='{TRANSACTION_TABLE}',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TRANSACTION_TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, notes) VALUES (new.id, new.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TRANSACTION_TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, notes)
+        VALUES ('delete', old.id, old.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF notes ON {TRANSACTION_TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, notes)
+        VALUES ('delete', old.id, old.notes);
+        INSERT INTO {FTS_TABLE}(rowid, notes) VALUES (new.id, new.notes);
+    END
+    """,
+]
+
+
+_fts_ready: set[str] = set()
+
+
+def sqlite_has_fts5(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def sqlite_fts_ready(connection) -> bool:
+    """Whether the FTS5 shadow table exists; positive answers are memoised."""
+    name = str(connection.settings_dict["NAME"])
+    if name in _fts_ready:
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        ready = cursor.fetchone()[0] == 1
+    if ready:
+        _fts_ready.add(name)
+    return ready
+
+
+def install_sqlite_fts(connection) -> None:
+    """Create the FTS5 shadow table and its sync triggers if missing.
+
+    Rebuilding SQLite tables during migrations drops their triggers, so this
+    runs after every migrate and re-indexes when the triggers were missing.
+    """
+    if connection.vendor != "sqlite" or not sqlite_has_fts5(connection):
+        return
+    # Migrating other apps alone can run this before core's tables exist.
+    if TRANSACTION_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name = %s",
+            [f"{FTS_TABLE}_ai"],
+        )
+        had_triggers = cursor.fetchone()[0] == 1
+        for statement in SQLITE_FTS_STATEMENTS:
+            cursor.execute(statement)
+        if not had_triggers:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_sqlite_fts(connection) -> None:
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _fts_ready.discard(str(connection.settings_dict["NAME"]))
+
+
+@contextmanager
+def deferred_sqlite_fts(connection):
+    """Index transactions inserted inside the block with one set-based insert
+    instead of the per-row trigger, which dominates SQLite bulk loads.
+
+    SQLite DDL is transactional, so a failure restores the trigger with the
+    rolled back rows.
+    """
+    if connection.vendor != "sqlite" or not sqlite_fts_ready(connection):
+        yield
+        return
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {TRANSACTION_TABLE}")
+        last = cursor.fetchone()[0]
+        cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai")
+        yield
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, notes) "
+            f"SELECT id, notes FROM {TRANSACTION_TABLE} WHERE id > %s",
+            [last],
+        )
+        cursor.execute(SQLITE_FTS_STATEMENTS[1])
+
+
+class ILikeContains(Lookup):
+    """``ILIKE '%term%'`` without the ``UPPER()`` wrapping Django's ``icontains``
+    uses on Postgres, so the ``gin_trgm_ops`` index on notes can serve it."""
+
+    lookup_name = "ilike_contains"
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        return "%s", [f"%{connection.ops.prep_for_like_query(value)}%"]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", [*lhs_params, *rhs_params]
+
+
+class SearchBackend(ABC):
+    """Filters a transaction queryset by a free-text term on ``notes``.
+
+    With ``rank=True`` the queryset is annotated with ``search_rank``, where a
+    higher value means a more relevant match.
+    """
+
+    @abstractmethod
+    def search(self, queryset, term: str, rank: bool = False): ...
+
+
+class SubstringSearchBackend(SearchBackend):
+    def search(self, queryset, term: str, rank: bool = False):
+        queryset = queryset.filter(notes__icontains=term)
+        if rank:
+            queryset = queryset.annotate(
+                search_rank=Value(1.0, output_field=FloatField())
+            )
+        return queryset
+
+
+class PostgresTrigramSearchBackend(SearchBackend):
+    def search(self, queryset, term: str, rank: bool = False):
+        queryset = queryset.filter(ILikeContains(F("notes"), term))
+        if rank:
+            queryset = queryset.annotate(
+                search_rank=TrigramWordSimilarity(term, "notes")
+            )
+        return queryset
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    token_pattern = re.compile(r"\w+", re.UNICODE)
+
+    def build_query(self, term: str) -> str:
+        tokens = self.token_pattern.findall(term)
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, term: str, rank: bool = False):
+        match = self.build_query(term)
+        if not match:
+            return SubstringSearchBackend().search(queryset, term, rank)
+        queryset = queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]
+            )
+        )
+        if rank:
+            queryset = queryset.annotate(
+                search_rank=RawSQL(
+                    f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+                    f"WHERE {FTS_TABLE} MATCH %s "
+                    f"AND {FTS_TABLE}.rowid = {TRANSACTION_TABLE}.id",
+                    [match],
+                    output_field=FloatField(),
+                )
+            )
+        return queryset
+
+
+class AutoSearchBackend(SearchBackend):
+    """Picks the best available backend for the queryset's database."""
+
+    def search(self, queryset, term: str, rank: bool = False):
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            backend = PostgresTrigramSearchBackend()
+        elif connection.vendor == "sqlite" and sqlite_fts_ready(connection):
+            backend = SQLiteFTSSearchBackend()
+        else:
+            backend = SubstringSearchBackend()
+        return backend.search(queryset, term, rank)
+
+
+def get_search_backend() -> SearchBackend:
+    path = getattr(
+        settings, "TRANSACTION_SEARCH_BACKEND", "core.search.AutoSearchBackend"
+    )
+    return import_string(path)()
+
+
+def search_transactions(queryset, term: str, rank: bool = False):
+    term = (term or "").strip()
+    if not term:
+        return queryset
+    return get_search_backend().search(queryset, term, rank)
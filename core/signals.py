@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .caching import bump_data_version
+from .live import (
+    publish_dashboard_stale,
+    publish_transaction_deleted,
+    publish_transaction_saved,
+)
+from .models import (
+    Budget,
+    CategorizationRule,
+    Category,
+    ChangeSequence,
+    Tag,
+    Transaction,
+)
+from .reference import invalidate_reference_data
+from .search import install_sqlite_fts
+from .sync import record_deletions, touch
+from .usage import (
+    Usage,
+    apply_usage,
+    linked_tag_ids,
+    refresh_usage,
+    selection_usage,
+    tag_ids_of,
+    transaction_usage,
+)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def transaction_changed(sender, instance: Transaction, **kwargs) -> None:
+    bump_data_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Transaction.tags.through)
+def transaction_tags_changed(
+    sender, instance, action: str, pk_set=None, **kwargs
+) -> None:
+    # ``instance`` is a Transaction or, for reverse changes, a Tag; both are
+    # owned by the same user.
+    if action in {"post_add", "post_remove", "post_clear"}:
+        bump_data_version(instance.user_id)
+    # Tag links are part of a transaction's synced state.
+    if isinstance(instance, Transaction):
+        if action in {"post_add", "post_remove", "post_clear"}:
+            touch(Transaction.objects.filter(pk=instance.pk), instance.user_id)
+    elif action in {"post_add", "post_remove"} and pk_set:
+        touch(Transaction.objects.filter(pk__in=pk_set), instance.user_id)
+    elif action == "pre_clear":
+        touch(instance.transactions.all(), instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=CategorizationRule)
+@receiver(post_delete, sender=CategorizationRule)
+@receiver(m2m_changed, sender=CategorizationRule.tags.through)
+def reference_data_changed(sender, instance, **kwargs) -> None:
+    invalidate_reference_data(instance.user_id)
+
+
+def _deleting_user(origin) -> bool:
+    model = getattr(origin, "model", type(origin))
+    return model is get_user_model()
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Budget)
+def record_tombstone(sender, instance, origin=None, **kwargs) -> None:
+    # Nothing is left to sync once the user's account itself is deleted.
+    if _deleting_user(origin):
+        return
+    change_seq = ChangeSequence.allocate(instance.user_id)
+    record_deletions(
+        instance.user_id, sender._meta.model_name, [instance.pk], change_seq
+    )
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Tag)
+def touch_linked_transactions(sender, instance, origin=None, **kwargs) -> None:
+    # Deleting a category nulls its transactions' category and deleting a tag
+    # drops its links; neither goes through ``save()``.
+    if not _deleting_user(origin):
+        touch(instance.transactions.all(), instance.user_id)
+
+
+@receiver(post_migrate)
+def ensure_search_index(sender, using: str, **kwargs) -> None:
+    if sender.label == "core":
+        install_sqlite_fts(connections[using])
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_usage(sender, instance: Transaction, raw=False, **kwargs) -> None:
+    instance._usage_before = None
+    if not raw and not instance._state.adding:
+        instance._usage_before = (
+            Transaction.objects.filter(pk=instance.pk)
+            .values("category_id", "type", "amount", "date")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Transaction)
+def update_usage_on_save(sender, instance: Transaction, raw=False, **kwargs) -> None:
+    if raw:
+        return
+    # Left in place for ``publish_dashboard_delta``, which runs after this.
+    before = instance.__dict__.get("_usage_before")
+    after = transaction_usage(instance)
+    if before is None:
+        if instance.category_id:
+            apply_usage(Category, {instance.category_id: after})
+        return
+    old = Usage.of(before["type"], before["amount"], before["date"])
+    usage_changed = (old.income, old.expense, old.last_used) != (
+        after.income,
+        after.expense,
+        after.last_used,
+    )
+    if usage_changed or before["category_id"] != instance.category_id:
+        apply_usage(
+            Category,
+            {instance.category_id: after} if instance.category_id else {},
+            {before["category_id"]: old} if before["category_id"] else {},
+        )
+    if usage_changed:
+        tag_ids = tag_ids_of(instance.pk)
+        apply_usage(
+            Tag,
+            {tag_id: after for tag_id in tag_ids},
+            {tag_id: old for tag_id in tag_ids},
+        )
+
+
+@receiver(post_save, sender=Transaction)
+def publish_dashboard_delta(sender, instance: Transaction, raw=False, **kwargs) -> None:
+    before = instance.__dict__.pop("_usage_before", None)
+    if not raw:
+        publish_transaction_saved(instance, before)
+
+
+@receiver(pre_delete, sender=Transaction)
+def remember_usage_on_delete(sender, instance, origin=None, **kwargs) -> None:
+    if not _deleting_user(origin):
+        instance._usage_removed = selection_usage([instance.pk])
+
+
+@receiver(post_delete, sender=Transaction)
+def update_usage_on_delete(sender, instance, **kwargs) -> None:
+    removed = instance.__dict__.pop("_usage_removed", None)
+    if removed is not None:
+        categories, tags = removed
+        apply_usage(Category, {}, categories)
+        apply_usage(Tag, {}, tags)
+        publish_transaction_deleted(instance)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, origin=None, **kwargs) -> None:
+    # Its transactions lose their category (or, in a merge, move to another)
+    # without any per-row signal.
+    if not _deleting_user(origin):
+        publish_dashboard_stale(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Transaction.tags.through)
+def update_tag_usage(sender, instance, action: str, pk_set=None, **kwargs) -> None:
+    if not isinstance(instance, Transaction):
+        if action in {"post_add", "post_remove", "post_clear"}:
+            refresh_usage(Tag, [instance.pk])
+        return
+    if action == "pre_remove":
+        instance._usage_tags = linked_tag_ids(instance.pk, pk_set or ())
+    elif action == "pre_clear":
+        instance._usage_tags = tag_ids_of(instance.pk)
+    elif action == "post_add" and pk_set:
+        usage = transaction_usage(instance)
+        apply_usage(Tag, {tag_id: usage for tag_id in pk_set})
+    elif action in {"post_remove", "post_clear"}:
+        usage = transaction_usage(instance)
+        tag_ids = instance.__dict__.pop("_usage_tags", [])
+        apply_usage(Tag, {}, {tag_id: usage for tag_id in tag_ids})
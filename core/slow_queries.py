@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .instrumentation import current_stats
+
+MAX_PARAM_LENGTH = 200
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+REDACTED = "<redacted>"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+_SPACE = re.compile(r"\s+")
+# SELECTs that write, lock or notify; EXPLAIN ANALYZE would do it again.
+_SIDE_EFFECTS = re.compile(
+    r"\b(?:nextval|setval|pg_notify|pg_advisory\w*|lo_\w+)\s*\("
+    r"|\bFOR\s+(?:NO\s+KEY\s+|KEY\s+)?(?:UPDATE|SHARE)\b"
+    r"|\bINTO\b",
+    re.IGNORECASE,
+)
+# Tables holding sessions, credentials and tokens. Their parameters and
+# plans, which show literal values on Postgres, are never recorded.
+_SENSITIVE_TABLES = re.compile(
+    r"\b(?:django_session|auth_user|authtoken_token|account_emailconfirmation"
+    r"|socialaccount_socialtoken|axes_\w+)\b",
+    re.IGNORECASE,
+)
+
+
+def fingerprint(sql: str) -> str:
+    """``sql`` with its literals and placeholder lists normalised, so the same
+    query with different values groups together."""
+    normalised = _STRING.sub("?", sql)
+    normalised = _NUMBER.sub("?", normalised)
+    normalised = normalised.replace("%s", "?")
+    normalised = _PLACEHOLDER_LIST.sub("(...)", normalised)
+    return _SPACE.sub(" ", normalised).strip()
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    view: str
+    sql: str
+    params: tuple[str, ...] | None
+    duration: float
+    plan: str
+    alias: str
+    recorded_at: datetime = field(default_factory=timezone.now)
+
+    @property
+    def fingerprint(self) -> str:
+        return fingerprint(self.sql)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha1(self.fingerprint.encode()).hexdigest()[:12]
+
+
+@dataclass
+class SlowQueryGroup:
+    view: str
+    fingerprint: str
+    key: str
+    count: int = 0
+    total: float = 0.0
+    slowest: SlowQuery | None = None
+
+    @property
+    def total_ms(self) -> float:
+        return self.total * 1000
+
+    @property
+    def average_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class SlowQueryLog:
+    """Ring buffer of the most recent slow queries in this process."""
+
+    def __init__(self, size: int):
+        self._entries: deque[SlowQuery] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, entry: SlowQuery) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> list[SlowQuery]:
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def groups(self) -> list[SlowQueryGroup]:
+        """Entries grouped by view and fingerprint, most total time first."""
+        groups: dict[tuple[str, str], SlowQueryGroup] = {}
+        for entry in self.entries():
+            group = groups.get((entry.view, entry.key))
+            if group is None:
+                group = groups[(entry.view, entry.key)] = SlowQueryGroup(
+                    view=entry.view, fingerprint=entry.fingerprint, key=entry.key
+                )
+            group.count += 1
+            group.total += entry.duration
+            if group.slowest is None or entry.duration > group.slowest.duration:
+                group.slowest = entry
+        return sorted(groups.values(), key=lambda group: group.total, reverse=True)
+
+
+@lru_cache(maxsize=1)
+def slow_query_log() -> SlowQueryLog:
+    return SlowQueryLog(getattr(settings, "SLOW_QUERY_LOG_SIZE", 200))
+
+
+def threshold() -> float | None:
+    """The configured threshold in seconds, or None when recording is off."""
+    value = getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None)
+    return None if value is None else value / 1000
+
+
+def analyzable(sql: str) -> bool:
+    """Whether ``sql`` only reads, so running it again is harmless."""
+    return sql.lstrip().upper().startswith("SELECT") and not _SIDE_EFFECTS.search(sql)
+
+
+def sensitive(sql: str) -> bool:
+    """Whether ``sql`` touches sessions, credentials or tokens."""
+    return bool(_SENSITIVE_TABLES.search(sql))
+
+
+def explain(connection, sql: str, params) -> str:
+    """The plan for a SELECT, run on a cursor of its own so the caller's
+    result set is left alone. ``SLOW_QUERY_EXPLAIN_ANALYZE`` runs read-only
+    queries again under ``EXPLAIN ANALYZE`` where the backend supports it."""
+    if not (
+        sql.lstrip().upper().startswith("SELECT")
+        and connection.features.supports_explaining_query_execution
+    ):
+        return ""
+    options = {}
+    if getattr(settings, "SLOW_QUERY_EXPLAIN_ANALYZE", False):
+        if connection.vendor == "postgresql" and analyzable(sql):
+            options["analyze"] = True
+    prefix = connection.ops.explain_query_prefix(**options)
+    # A bare backend cursor bypasses execute_wrappers, so the EXPLAIN is
+    # neither recorded here nor counted against the request's query budget.
+    cursor = connection.create_cursor()
+    # Inside a transaction a failed EXPLAIN would abort it on Postgres and
+    # fail every later statement of the request, so it gets a savepoint.
+    savepoint = connection.in_atomic_block and connection.features.uses_savepoints
+    try:
+        if savepoint:
+            cursor.execute(connection.ops.savepoint_create_sql(EXPLAIN_SAVEPOINT))
+        try:
+            cursor.execute(f"{prefix} {sql}", params)
+            plan = "\n".join(str(row[-1]) for row in cursor.fetchall())
+        except (DatabaseError, connection.Database.DatabaseError) as exc:
+            if savepoint:
+                cursor.execute(connection.ops.savepoint_rollback_sql(EXPLAIN_SAVEPOINT))
+            return f"EXPLAIN failed: {exc}"
+        if savepoint:
+            cursor.execute(connection.ops.savepoint_commit_sql(EXPLAIN_SAVEPOINT))
+        return plan
+    finally:
+        cursor.close()
+
+
+def _params(sql: str, params) -> tuple[str, ...] | None:
+    if params is None or not getattr(settings, "SLOW_QUERY_CAPTURE_PARAMS", False):
+        return None
+    if sensitive(sql):
+        return tuple(REDACTED for _ in params)
+    if isinstance(params, dict):
+        params = [f"{key}={value!r}" for key, value in params.items()]
+    else:
+        params = [repr(value) for value in params]
+    return tuple(value[:MAX_PARAM_LENGTH] for value in params)
+
+
+def capture_slow(execute, sql, params, many, context):
+    limit = threshold()
+    if limit is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = time.perf_counter() - started
+    sample_rate = getattr(settings, "SLOW_QUERY_SAMPLE_RATE", 1.0)
+    if elapsed < limit or random.random() >= sample_rate:
+        return result
+    connection = context["connection"]
+    stats = current_stats()
+    slow_query_log().add(
+        SlowQuery(
+            view=stats.view if stats else "",
+            sql=sql,
+            # executemany batches are recorded without parameters or a plan.
+            params=None if many else _params(sql, params),
+            duration=elapsed,
+            plan="" if many or sensitive(sql) else explain(connection, sql, params),
+            alias=connection.alias,
+        )
+    )
+    return result
+
+
+def install(connection) -> None:
+    if capture_slow not in connection.execute_wrappers:
+        connection.execute_wrappers.append(capture_slow)
+
+
+@receiver(connection_created)
+def record_slow_queries(sender, connection, **kwargs) -> None:
+    if threshold() is not None:
+        install(connection)
+
+
+def install_all() -> None:
+    """Install on connections opened before recording was switched on."""
+    for connection in connections.all(initialized_only=True):
+        install(connection)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Budget, Category, ChangeSequence, Tag, Tombstone, Transaction
+
+# Feed section name for each synced model, in the order clients should apply
+# them (categories and tags before the transactions that reference them).
+SYNCED_MODELS = {
+    "categories": Category,
+    "tags": Tag,
+    "budgets": Budget,
+    "transactions": Transaction,
+}
+SECTION_BY_MODEL = {
+    model._meta.model_name: name for name, model in SYNCED_MODELS.items()
+}
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+class SyncTokenExpired(InvalidSyncToken):
+    """The token predates pruned tombstones; the client must resync fully."""
+
+
+def parse_token(value: str | None) -> int | None:
+    if value in (None, ""):
+        return None
+    try:
+        since = int(value)
+    except (TypeError, ValueError) as exc:
+        raise InvalidSyncToken("Invalid sync token") from exc
+    if since < 0:
+        raise InvalidSyncToken("Invalid sync token")
+    return since
+
+
+@dataclass
+class ChangeSet:
+    """Rows changed and deleted in ``(since, token]`` for one user.
+
+    ``since`` is ``None`` for a full sync, which returns every live row and
+    no deletions. ``more`` is set when ``token`` stopped short of the user's
+    latest change because of the limit.
+    """
+
+    since: int | None
+    token: int
+    more: bool
+    changed: dict[str, object] = field(default_factory=dict)
+    deleted: dict[str, list[int]] = field(default_factory=dict)
+
+
+def collect_changes(user, since: int | None, limit: int) -> ChangeSet:
+    """Return the user's changes after ``since`` in sequence order.
+
+    Only rows carrying a change sequence in the window are read, through the
+    ``(user, change_seq)`` indexes, so the cost follows the number of changes
+    rather than the size of the account. All rows stamped by one bulk write
+    share a sequence number and are always returned together, so a page may
+    exceed ``limit``.
+    """
+    head = ChangeSequence.current(user.pk)
+    if since is not None:
+        horizon = (
+            ChangeSequence.objects.filter(user=user)
+            .values_list("pruned_through", flat=True)
+            .first()
+            or 0
+        )
+        if since < horizon:
+            raise SyncTokenExpired("Sync token has expired; perform a full sync")
+        if since > head:
+            raise InvalidSyncToken("Invalid sync token")
+
+    sources = [model.objects.filter(user=user) for model in SYNCED_MODELS.values()]
+    if since is not None:
+        sources.append(Tombstone.objects.filter(user=user))
+    lower = -1 if since is None else since
+
+    upper, more = head, False
+    sequences: list[int] = []
+    for queryset in sources:
+        sequences.extend(
+            queryset.filter(change_seq__gt=lower, change_seq__lte=head)
+            .order_by("change_seq")
+            .values_list("change_seq", flat=True)[: limit + 1]
+        )
+    sequences.sort()
+    if len(sequences) > limit:
+        upper = sequences[limit - 1]
+        more = sequences[-1] > upper
+
+    changes = ChangeSet(since=since, token=upper, more=more)
+    for name, model in SYNCED_MODELS.items():
+        changes.changed[name] = model.objects.filter(
+            user=user, change_seq__gt=lower, change_seq__lte=upper
+        ).order_by("change_seq", "id")
+        changes.deleted[name] = []
+    if since is not None:
+        tombstones = (
+            Tombstone.objects.filter(
+                user=user, change_seq__gt=since, change_seq__lte=upper
+            )
+            .order_by("change_seq")
+            .values_list("model", "object_id")
+        )
+        for model_name, object_id in tombstones:
+            changes.deleted[SECTION_BY_MODEL[model_name]].append(object_id)
+    return changes
+
+
+def touch(queryset, user_id: int, change_seq: int | None = None) -> int:
+    """Stamp every row of a synced ``queryset`` as changed.
+
+    Set-based writes bypass ``save()``, so they use this to share a single
+    sequence number across the batch. Must run inside a transaction.
+    """
+    if change_seq is None:
+        change_seq = ChangeSequence.allocate(user_id)
+    return queryset.update(change_seq=change_seq, updated_at=timezone.now())
+
+
+def record_deletions(
+    user_id: int, model_name: str, object_ids: Iterable[int], change_seq: int
+) -> None:
+    Tombstone.objects.bulk_create(
+        [
+            Tombstone(
+                user_id=user_id,
+                model=model_name,
+                object_id=object_id,
+                change_seq=change_seq,
+            )
+            for object_id in object_ids
+        ],
+        batch_size=1000,
+    )
+
+
+def backfill_change_sequences(
+    change_sequence_model=ChangeSequence,
+    synced_models=tuple(SYNCED_MODELS.values()),
+    batch_size: int = 1000,
+) -> int:
+    """Give every row still at change sequence 0 a sequence of its own.
+
+    Rows written before change tracking all carry 0, so a full sync could
+    not page through them. They are numbered after each user's latest
+    sequence, in feed order and then by id. Returns the number of rows
+    stamped.
+    """
+    heads = dict(change_sequence_model.objects.values_list("user_id", "value"))
+    touched: set[int] = set()
+    stamped = 0
+    with transaction.atomic():
+        for model in synced_models:
+            pending = (
+                model.objects.filter(change_seq=0)
+                .order_by("user_id", "id")
+                .values_list("user_id", "id")
+            )
+            # Stamped rows drop out of ``pending``, so each slice is the next
+            # batch.
+            while batch := list(pending[:batch_size]):
+                rows = []
+                for user_id, pk in batch:
+                    heads[user_id] = heads.get(user_id, 0) + 1
+                    touched.add(user_id)
+                    rows.append(model(pk=pk, change_seq=heads[user_id]))
+                model.objects.bulk_update(rows, ["change_seq"])
+                stamped += len(rows)
+        for user_id in touched:
+            change_sequence_model.objects.update_or_create(
+                user_id=user_id, defaults={"value": heads[user_id]}
+            )
+    return stamped
+
+
+def prune_tombstones(older_than: timedelta | None = None) -> int:
+    """Delete old tombstones and raise each user's token horizon to match.
+
+    Clients holding a token below the horizon get ``SyncTokenExpired`` and
+    must start over with a full sync.
+    """
+    if older_than is None:
+        older_than = timedelta(days=getattr(settings, "SYNC_TOMBSTONE_DAYS", 90))
+    cutoff = timezone.now() - older_than
+    expired = Tombstone.objects.filter(deleted_at__lt=cutoff)
+    with transaction.atomic():
+        horizons = expired.values("user_id").annotate(through=Max("change_seq"))
+        for row in horizons:
+            ChangeSequence.objects.filter(
+                user_id=row["user_id"], pruned_through__lt=row["through"]
+            ).update(pruned_through=row["through"])
+        deleted, _ = expired.delete()
+    return deleted
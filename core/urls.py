@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from django.conf import settings
 from django.urls import path
 
 from core.views import (
+    AsyncBudgetMatrixReportView,
+    AsyncDashboardView,
+    AsyncMonthlyReportView,
+    BudgetMatrixReportView,
     CategoryCreateView,
     CategoryDeleteView,
     CategoryListView,
+    CategoryMergeView,
     CategoryReportView,
     CategoryUpdateView,
     BudgetCreateView,
@@ -14,8 +20,10 @@ from core.views import (
     BudgetUpdateView,
     CSVExportView,
     CSVImportView,
+    DashboardEventsView,
     DashboardView,
     MonthlyReportView,
+    TransactionBulkActionView,
     TransactionCreateView,
     TransactionDeleteView,
     TransactionListView,
@@ -23,13 +31,22 @@ from core.views import (
     TagCreateView,
     TagDeleteView,
     TagListView,
+    TagMergeView,
     TagUpdateView,
 )
 
 app_name = "core"
 
+
+def _variant(sync_view, async_view):
+    # The async variants run their independent queries concurrently; they
+    # suit ASGI deployments (see the ``benchmark_asgi`` command).
+    return async_view if getattr(settings, "ASYNC_VIEWS", False) else sync_view
+
+
 urlpatterns = [
-    path("", DashboardView.as_view(), name="dashboard"),
+    path("", _variant(DashboardView, AsyncDashboardView).as_view(), name="dashboard"),
+    path("dashboard/events/", DashboardEventsView.as_view(), name="dashboard-events"),
     path("categories/", CategoryListView.as_view(), name="categories"),
     path("categories/new/", CategoryCreateView.as_view(), name="category-create"),
     path(
@@ -42,6 +59,11 @@ urlpatterns = [
         CategoryDeleteView.as_view(),
         name="category-delete",
     ),
+    path(
+        "categories/<int:pk>/merge/",
+        CategoryMergeView.as_view(),
+        name="category-merge",
+    ),
     path("budgets/", BudgetListView.as_view(), name="budgets"),
     path("budgets/new/", BudgetCreateView.as_view(), name="budget-create"),
     path("budgets/<int:pk>/edit/", BudgetUpdateView.as_view(), name="budget-update"),
@@ -50,10 +72,16 @@ urlpatterns = [
     path("tags/new/", TagCreateView.as_view(), name="tag-create"),
     path("tags/<int:pk>/edit/", TagUpdateView.as_view(), name="tag-update"),
     path("tags/<int:pk>/delete/", TagDeleteView.as_view(), name="tag-delete"),
+    path("tags/<int:pk>/merge/", TagMergeView.as_view(), name="tag-merge"),
     path("transactions/", TransactionListView.as_view(), name="transactions"),
     path(
         "transactions/new/", TransactionCreateView.as_view(), name="transaction-create"
     ),
+    path(
+        "transactions/bulk/",
+        TransactionBulkActionView.as_view(),
+        name="transaction-bulk",
+    ),
     path(
         "transactions/<int:pk>/edit/",
         TransactionUpdateView.as_view(),
@@ -66,10 +94,19 @@ urlpatterns = [
     ),
     path("import/", CSVImportView.as_view(), name="import"),
     path("export/", CSVExportView.as_view(), name="export"),
-    path("reports/monthly/", MonthlyReportView.as_view(), name="reports-monthly"),
+    path(
+        "reports/monthly/",
+        _variant(MonthlyReportView, AsyncMonthlyReportView).as_view(),
+        name="reports-monthly",
+    ),
     path(
         "reports/categories/",
         CategoryReportView.as_view(),
         name="reports-categories",
     ),
+    path(
+        "reports/budgets/",
+        _variant(BudgetMatrixReportView, AsyncBudgetMatrixReportView).as_view(),
+        name="reports-budgets",
+    ),
 ]
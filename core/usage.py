@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Sequence
+
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Category, Tag, Transaction
+
+ZERO = Decimal("0")
+CHUNK_SIZE = 500
+
+
+@dataclass
+class Usage:
+    count: int = 0
+    income: Decimal = ZERO
+    expense: Decimal = ZERO
+    last_used: date | None = None
+
+    def merge(self, other: "Usage") -> None:
+        self.count += other.count
+        self.income += other.income
+        self.expense += other.expense
+        if other.last_used and (not self.last_used or other.last_used > self.last_used):
+            self.last_used = other.last_used
+
+    @classmethod
+    def of(cls, txn_type: str, amount: Decimal, on: date) -> "Usage":
+        if txn_type == Transaction.Type.INCOME:
+            return cls(1, amount, ZERO, on)
+        return cls(1, ZERO, amount, on)
+
+
+def _aggregates(prefix: str = "") -> dict:
+    amount, txn_type = f"{prefix}amount", f"{prefix}type"
+    return {
+        "count": Count("pk"),
+        "income": Sum(amount, filter=Q(**{txn_type: Transaction.Type.INCOME})),
+        "expense": Sum(amount, filter=Q(**{txn_type: Transaction.Type.EXPENSE})),
+        "last_used": Max(f"{prefix}date"),
+    }
+
+
+def _collect(rows, key: str, into: dict[int, Usage]) -> None:
+    for row in rows:
+        into.setdefault(row[key], Usage()).merge(
+            Usage(
+                row["count"],
+                row["income"] or ZERO,
+                row["expense"] or ZERO,
+                row["last_used"],
+            )
+        )
+
+
+def selection_usage(
+    transaction_ids: Sequence[int],
+) -> tuple[dict[int, Usage], dict[int, Usage]]:
+    """Usage of the given transactions, grouped by category and by tag."""
+    categories: dict[int, Usage] = {}
+    tags: dict[int, Usage] = {}
+    through = Transaction.tags.through
+    for start in range(0, len(transaction_ids), CHUNK_SIZE):
+        chunk = transaction_ids[start : start + CHUNK_SIZE]
+        _collect(
+            Transaction.objects.filter(pk__in=chunk, category__isnull=False)
+            .values("category_id")
+            .annotate(**_aggregates())
+            .order_by(),
+            "category_id",
+            categories,
+        )
+        _collect(
+            through.objects.filter(transaction_id__in=chunk)
+            .values("tag_id")
+            .annotate(**_aggregates("transaction__"))
+            .order_by(),
+            "tag_id",
+            tags,
+        )
+    return categories, tags
+
+
+def apply_usage(
+    model, added: dict[int, Usage], removed: dict[int, Usage] | None = None
+) -> None:
+    """Add ``added`` and subtract ``removed`` from the stats of ``model`` rows.
+
+    Counts and totals are adjusted with one ``UPDATE`` per row. A removal
+    may take away the latest date, so ``last_used`` is recomputed for those
+    rows; call this after the write that removed the usage.
+    """
+    removed = removed or {}
+    for pk in added.keys() | removed.keys():
+        plus = added.get(pk, Usage())
+        minus = removed.get(pk, Usage())
+        changes = {
+            "transaction_count": F("transaction_count") + (plus.count - minus.count),
+            "income_total": F("income_total") + (plus.income - minus.income),
+            "expense_total": F("expense_total") + (plus.expense - minus.expense),
+        }
+        if pk not in removed and plus.last_used is not None:
+            changes["last_used"] = Greatest(
+                Coalesce(F("last_used"), Value(plus.last_used)),
+                Value(plus.last_used),
+            )
+        model.objects.filter(pk=pk).update(**changes)
+    if removed:
+        model.objects.filter(pk__in=list(removed)).update(
+            last_used=_last_used_subquery(model)
+        )
+
+
+def _last_used_subquery(model):
+    if model is Category:
+        rows = Transaction.objects.filter(category_id=OuterRef("pk"))
+        return Subquery(
+            rows.order_by().values("category_id").annotate(m=Max("date")).values("m")
+        )
+    through = Transaction.tags.through
+    rows = through.objects.filter(tag_id=OuterRef("pk"))
+    return Subquery(
+        rows.order_by()
+        .values("tag_id")
+        .annotate(m=Max("transaction__date"))
+        .values("m")
+    )
+
+
+@contextmanager
+def tracking_usage(transaction_ids: Sequence[int]):
+    """Keep stats in step with a set-based write to ``transaction_ids``.
+
+    Usage of the selection is read before and after the write and the
+    difference applied, so the cost follows the size of the selection.
+    """
+    transaction_ids = list(transaction_ids)
+    categories_before, tags_before = selection_usage(transaction_ids)
+    yield
+    categories_after, tags_after = selection_usage(transaction_ids)
+    apply_usage(Category, categories_after, categories_before)
+    apply_usage(Tag, tags_after, tags_before)
+
+
+def record_usage(transaction_ids: Sequence[int]) -> None:
+    """Add the usage of newly created transactions."""
+    categories, tags = selection_usage(list(transaction_ids))
+    apply_usage(Category, categories)
+    apply_usage(Tag, tags)
+
+
+def rebuild_usage_stats(
+    user=None,
+    *,
+    category_model=Category,
+    tag_model=Tag,
+    transaction_model=Transaction,
+) -> int:
+    """Recompute every stats column from the transactions table.
+
+    Returns the number of categories and tags written. The model arguments
+    let data migrations pass historical models.
+    """
+    transactions = transaction_model.objects.all()
+    categories = category_model.objects.all()
+    tags = tag_model.objects.all()
+    links = transaction_model.tags.through.objects.all()
+    if user is not None:
+        transactions = transactions.filter(user=user)
+        categories = categories.filter(user=user)
+        tags = tags.filter(user=user)
+        links = links.filter(transaction__user=user)
+
+    category_usage: dict[int, Usage] = {}
+    _collect(
+        transactions.filter(category__isnull=False)
+        .values("category_id")
+        .annotate(**_aggregates())
+        .order_by(),
+        "category_id",
+        category_usage,
+    )
+    tag_usage: dict[int, Usage] = {}
+    _collect(
+        links.values("tag_id").annotate(**_aggregates("transaction__")).order_by(),
+        "tag_id",
+        tag_usage,
+    )
+    return _write_usage(category_model, categories, category_usage) + _write_usage(
+        tag_model, tags, tag_usage
+    )
+
+
+def _write_usage(model, queryset, usage: dict[int, Usage]) -> int:
+    fields = ["transaction_count", "income_total", "expense_total", "last_used"]
+    written = 0
+    batch: list = []
+    for obj in queryset.only("pk").order_by("pk").iterator(chunk_size=CHUNK_SIZE):
+        stats = usage.get(obj.pk, Usage())
+        obj.transaction_count = stats.count
+        obj.income_total = stats.income
+        obj.expense_total = stats.expense
+        obj.last_used = stats.last_used
+        batch.append(obj)
+        if len(batch) >= CHUNK_SIZE:
+            written += model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        written += model.objects.bulk_update(batch, fields)
+    return written
+
+
+def usage_by_tag(links) -> dict[int, Usage]:
+    """Usage grouped by tag for a queryset of tag link rows, in one query."""
+    usage: dict[int, Usage] = {}
+    _collect(
+        links.values("tag_id").annotate(**_aggregates("transaction__")).order_by(),
+        "tag_id",
+        usage,
+    )
+    return usage
+
+
+def refresh_usage(model, pks: Iterable[int]) -> None:
+    """Recompute the stats of the given categories or tags from scratch."""
+    pks = list(pks)
+    usage: dict[int, Usage] = {}
+    if model is Category:
+        rows = Transaction.objects.filter(category_id__in=pks).values("category_id")
+        _collect(rows.annotate(**_aggregates()).order_by(), "category_id", usage)
+    else:
+        rows = Transaction.tags.through.objects.filter(tag_id__in=pks).values("tag_id")
+        _collect(
+            rows.annotate(**_aggregates("transaction__")).order_by(), "tag_id", usage
+        )
+    _write_usage(model, model.objects.filter(pk__in=pks), usage)
+
+
+def transaction_usage(instance: Transaction) -> Usage:
+    """Usage contributed by ``instance``; amount and date may still be strings
+    if they were assigned that way before saving."""
+    meta = Transaction._meta
+    amount = meta.get_field("amount").to_python(instance.amount)
+    on = meta.get_field("date").to_python(instance.date)
+    return Usage.of(instance.type, amount, on)
+
+
+def tag_ids_of(transaction_id: int) -> list[int]:
+    return list(
+        Transaction.tags.through.objects.filter(
+            transaction_id=transaction_id
+        ).values_list("tag_id", flat=True)
+    )
+
+
+def linked_tag_ids(transaction_id: int, tag_ids: Iterable[int]) -> list[int]:
+    return list(
+        Transaction.tags.through.objects.filter(
+            transaction_id=transaction_id, tag_id__in=list(tag_ids)
+        ).values_list("tag_id", flat=True)
+    )
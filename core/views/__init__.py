@@ -1,5 +1,6 @@
-from .dashboards import DashboardView
+from .dashboards import AsyncDashboardView, DashboardEventsView, DashboardView
 from .transactions import (
+    TransactionBulkActionView,
     TransactionCreateView,
     TransactionDeleteView,
     TransactionListView,
@@ -9,9 +10,16 @@ from .categories import (
     CategoryCreateView,
     CategoryDeleteView,
     CategoryListView,
+    CategoryMergeView,
     CategoryUpdateView,
 )
-from .tags import TagCreateView, TagDeleteView, TagListView, TagUpdateView
+from .tags import (
+    TagCreateView,
+    TagDeleteView,
+    TagListView,
+    TagMergeView,
+    TagUpdateView,
+)
 from .budgets import (
     BudgetCreateView,
     BudgetDeleteView,
@@ -20,4 +28,11 @@ from .budgets import (
 )
 from .imports import CSVImportView
 from .exports import CSVExportView
-from .reports import CategoryReportView, MonthlyReportView
+from .reports import (
+    AsyncBudgetMatrixReportView,
+    AsyncMonthlyReportView,
+    BudgetMatrixReportView,
+    CategoryReportView,
+    MonthlyReportView,
+)
+from .diagnostics import MetricsView, SlowQueryListView
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
-import calendar
 from dataclasses import dataclass
 from decimal import Decimal
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Sum
+from django.db.models.functions import TruncMonth
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, TemplateView, UpdateView
 
+from core.analytics import add_months
 from core.forms import BudgetForm
 from core.models import Budget, Transaction
+from core.money import from_minor
 
 
 @dataclass(frozen=True)
@@ -23,24 +25,19 @@ class BudgetProgress:
 
 
 class BudgetListView(LoginRequiredMixin, TemplateView):
+    query_budget = 5
     template_name = "budgets/list.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
-        budgets = Budget.objects.filter(user=user).select_related("category")
+        budgets = list(Budget.objects.filter(user=user).select_related("category"))
+        spent_by_month = self._spent_by_month(user, budgets)
         progress_rows: list[BudgetProgress] = []
         for budget in budgets:
-            start = budget.start_month
-            last_day = calendar.monthrange(start.year, start.month)[1]
-            end = start.replace(day=last_day)
-            spent = Transaction.objects.filter(
-                user=user,
-                category=budget.category,
-                type=Transaction.Type.EXPENSE,
-                date__gte=start,
-                date__lte=end,
-            ).aggregate(total=Sum("amount")).get("total") or Decimal("0")
+            spent = spent_by_month.get(
+                (budget.category_id, budget.start_month), Decimal("0")
+            )
             remaining = max(Decimal("0"), budget.amount - spent)
             percentage = float(
                 (spent / budget.amount * Decimal("100")) if budget.amount else 0
@@ -61,6 +58,29 @@ class BudgetListView(LoginRequiredMixin, TemplateView):
         )
         return context
 
+    def _spent_by_month(self, user, budgets: list[Budget]) -> dict:
+        """Expense totals keyed by (category id, month) for every budget, from
+        one grouped query."""
+        if not budgets:
+            return {}
+        months = [budget.start_month for budget in budgets]
+        rows = (
+            Transaction.objects.for_user(user)
+            .filter(
+                type=Transaction.Type.EXPENSE,
+                category_id__in={budget.category_id for budget in budgets},
+                date__gte=min(months),
+                date__lt=add_months(max(months), 1),
+            )
+            .annotate(month=TruncMonth("date"))
+            .values("category_id", "month")
+            .annotate(total=Sum("amount_minor"))
+            .order_by()
+        )
+        return {
+            (row["category_id"], row["month"]): from_minor(row["total"]) for row in rows
+        }
+
 
 class BudgetCreateView(LoginRequiredMixin, CreateView):
     template_name = "budgets/form.html"
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
+from django.views.generic import CreateView, DeleteView, FormView, ListView, UpdateView
 
-from core.forms import CategoryForm
+from core.forms import CategoryForm, CategoryMergeForm
 from core.models import Category
+from core.reference import reference_data_for
 
 
 class CategoryListView(LoginRequiredMixin, ListView):
+    query_budget = 3
     template_name = "categories/list.html"
     context_object_name = "categories"
 
@@ -58,3 +61,38 @@ class CategoryDeleteView(LoginRequiredMixin, DeleteView):
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, "Category deleted")
         return super().delete(request, *args, **kwargs)
+
+
+class CategoryMergeView(LoginRequiredMixin, FormView):
+    template_name = "categories/merge.html"
+    form_class = CategoryMergeForm
+    success_url = reverse_lazy("core:categories")
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.object = get_object_or_404(
+                Category.objects.filter(user=request.user), pk=kwargs["pk"]
+            )
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["source"] = self.object
+        kwargs["candidates"] = reference_data_for(self.request.user).active_categories(
+            self.object.kind
+        )
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["object"] = self.object
+        return context
+
+    def form_valid(self, form):
+        result = form.merge()
+        messages.success(
+            self.request,
+            f"Category merged into {form.cleaned_data['target'].name} "
+            f"({result.transactions} transactions moved)",
+        )
+        return super().form_valid(form)
@@ -1,16 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 from collections import Counter
 from dataclasses import dataclass
 from decimal import Decimal
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models
+from django.core.handlers.asgi import ASGIRequest
 from django.db.models import Sum
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views import View
 from django.views.generic import TemplateView
 
+from core.analytics import add_months
+from core.concurrency import gather_queries
+from core.events import get_broker
 from core.models import Transaction
+from core.money import MINOR_PER_UNIT, from_minor
+
+from .mixins import AsyncLoginRequiredMixin
+
+TOP_CATEGORIES = 5
 
 
 @dataclass(frozen=True)
@@ -18,67 +30,158 @@ class CategorySummary:
     name: str
     total: Decimal
     type: str
+    id: int | None = None
+    total_minor: int = 0
 
 
-class DashboardView(LoginRequiredMixin, TemplateView):
-    template_name = "dashboard.html"
+class DashboardQueries:
+    """The dashboard's queries for ``user``; none depends on another."""
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
-        today = timezone.localdate()
-        month_txns = (
-            Transaction.objects.for_user(user)
-            .filter(date__year=today.year, date__month=today.month)
-            .with_related()
+    def __init__(self, user):
+        self.user = user
+        month_start = timezone.localdate().replace(day=1)
+        # A plain date range, unlike year/month lookups, lets Postgres prune
+        # monthly partitions of the transaction table.
+        self.month_txns = Transaction.objects.for_user(user).filter(
+            date__gte=month_start, date__lt=add_months(month_start, 1)
         )
 
-        totals = month_txns.aggregate(
+    def all(self) -> list:
+        return [
+            self.totals,
+            self.month_categories,
+            self.recent_transactions,
+            self.currencies,
+        ]
+
+    def totals(self) -> dict[str, int]:
+        return self.month_txns.aggregate(
             income=Sum(
-                "amount",
+                "amount_minor",
                 filter=models.Q(type=Transaction.Type.INCOME),
-                default=Decimal("0"),
+                default=0,
             ),
             expense=Sum(
-                "amount",
+                "amount_minor",
                 filter=models.Q(type=Transaction.Type.EXPENSE),
-                default=Decimal("0"),
+                default=0,
             ),
+            net=Sum("signed_amount_minor", default=0),
         )
-        income_total = totals.get("income") or Decimal("0")
-        expense_total = totals.get("expense") or Decimal("0")
-        net_total = income_total - expense_total
 
+    def month_categories(self) -> list[CategorySummary]:
+        # Every category, not just the top ones, so live updates can re-rank.
         category_rows = (
-            month_txns.exclude(category__isnull=True)
-            .values("category__name", "category__kind")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")[:5]
+            self.month_txns.exclude(category__isnull=True)
+            .values("category_id", "category__name", "category__kind")
+            .annotate(total=Sum("amount_minor"))
+            .order_by("-total")
         )
-        top_categories = [
-            CategorySummary(row["category__name"], row["total"], row["category__kind"])
+        return [
+            CategorySummary(
+                row["category__name"],
+                from_minor(row["total"]),
+                row["category__kind"],
+                row["category_id"],
+                row["total"],
+            )
             for row in category_rows
         ]
 
-        recent_transactions = (
-            Transaction.objects.for_user(user)
+    def recent_transactions(self) -> list[Transaction]:
+        return list(
+            Transaction.objects.for_user(self.user)
             .with_related()
             .order_by("-date", "-created_at")[:10]
         )
 
-        currencies = Counter(month_txns.values_list("currency", flat=True))
-        currency_warning = None
-        if len(currencies) > 1:
-            currency_warning = "Multiple currencies detected this month. Totals are displayed without FX conversion."
-
-        context.update(
-            {
-                "income_total": income_total,
-                "expense_total": expense_total,
-                "net_total": net_total,
-                "top_categories": top_categories,
-                "recent_transactions": recent_transactions,
-                "currency_warning": currency_warning,
-            }
-        )
+    def currencies(self) -> Counter:
+        return Counter(self.month_txns.values_list("currency", flat=True))
+
+
+def dashboard_context(totals, month_categories, recent_transactions, currencies):
+    currency_warning = None
+    if len(currencies) > 1:
+        currency_warning = "Multiple currencies detected this month. Totals are displayed without FX conversion."
+    return {
+        "income_total": from_minor(totals["income"]),
+        "expense_total": from_minor(totals["expense"]),
+        "net_total": from_minor(totals["net"]),
+        "top_categories": month_categories[:TOP_CATEGORIES],
+        "recent_transactions": recent_transactions,
+        "currency_warning": currency_warning,
+        # Starting point for the live updates from DashboardEventsView.
+        "dashboard_state": {
+            "minor_per_unit": MINOR_PER_UNIT,
+            "top": TOP_CATEGORIES,
+            "totals": totals,
+            "categories": [
+                {
+                    "id": summary.id,
+                    "name": summary.name,
+                    "kind": summary.type,
+                    "total": summary.total_minor,
+                }
+                for summary in month_categories
+            ],
+        },
+    }
+
+
+class DashboardView(LoginRequiredMixin, TemplateView):
+    query_budget = 7
+    template_name = "dashboard.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        queries = DashboardQueries(self.request.user)
+        context.update(dashboard_context(*(query() for query in queries.all())))
         return context
+
+
+class DashboardEventsView(AsyncLoginRequiredMixin, View):
+    """Server-sent events with changes to the user's dashboard.
+
+    The response stays open, so it is only streamed under ``finance.asgi``.
+    Under WSGI it would hold a worker per open dashboard; there it answers
+    204, which tells ``EventSource`` not to reconnect.
+    """
+
+    keepalive_seconds = 15
+    retry_milliseconds = 5000
+
+    async def get(self, request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return HttpResponse(status=204)
+        response = StreamingHttpResponse(
+            self.stream(request.user.pk), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, user_id: int):
+        async with get_broker().subscribe(user_id) as subscription:
+            yield f"retry: {self.retry_milliseconds}\n\n".encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.get(), self.keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield event.encode()
+
+
+class AsyncDashboardView(AsyncLoginRequiredMixin, TemplateView):
+    """``DashboardView`` with its queries run concurrently."""
+
+    query_budget = 7
+    template_name = "dashboard.html"
+
+    async def get(self, request, *args, **kwargs):
+        context = self.get_context_data(**kwargs)
+        queries = DashboardQueries(request.user)
+        context.update(dashboard_context(*await gather_queries(*queries.all())))
+        return self.render_to_response(context)
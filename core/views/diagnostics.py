@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hmac
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.views import View
+from django.views.generic import TemplateView
+
+from core import metrics
+from core.slow_queries import slow_query_log
+
+
+class SlowQueryListView(TemplateView):
+    """Slow queries recorded by this process, grouped by view and query
+    fingerprint. Served through ``admin.site.admin_view``, so staff only."""
+
+    template_name = "admin/slow_queries.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            admin.site.each_context(self.request),
+            title="Slow queries",
+            groups=slow_query_log().groups(),
+            threshold_ms=getattr(settings, "SLOW_QUERY_THRESHOLD_MS", None),
+            explain_analyze=getattr(settings, "SLOW_QUERY_EXPLAIN_ANALYZE", False),
+        )
+        return context
+
+    def post(self, request):
+        slow_query_log().clear()
+        messages.success(request, "Slow query log cleared.")
+        return redirect("slow-queries")
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint for this process's ``core.metrics``.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>`` when that is set.
+    """
+
+    query_budget = 0
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def get(self, request):
+        token = getattr(settings, "METRICS_TOKEN", "")
+        if token:
+            supplied = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+                return HttpResponse(status=401)
+        return HttpResponse(metrics.render(), content_type=self.content_type)
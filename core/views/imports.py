@@ -3,6 +3,7 @@ from __future__ import annotations
 import csv
 import json
 import io
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
@@ -10,17 +11,32 @@ from typing import Any
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db import transaction
+from django.db import connection, transaction
 from django.shortcuts import redirect, render
 from django.urls import reverse
+from django.utils import timezone
 from django.views import View
 
+from core import metrics
+from core.bulkload import load_rows, reserve_ids, supports_copy
+from core.caching import bump_data_version
 from core.forms import CSVCommitForm, CSVImportForm
-from core.models import Category, Transaction
+from core.live import publish_dashboard_stale
+from core.models import Category, ChangeSequence, Tag, Transaction
+from core.reference import reference_data_for
+from core.search import deferred_sqlite_fts
+from core.usage import Usage, apply_usage
 
 SUPPORTED_COLUMNS = ["date", "description", "amount", "type", "category", "ignore"]
 
 
+# A row matching an existing transaction on all of these is a re-import.
+DEDUPE_FIELDS = ("date", "type", "amount_minor", "notes")
+IMPORT_BATCH_SIZE = 1000
+STAGING_TABLE = "import_staging"
+STAGING_TAGS_TABLE = "import_staging_tags"
+
+
 @dataclass
 class CSVPreview:
     headers: list[str]
@@ -28,7 +44,38 @@ class CSVPreview:
     delimiter: str
 
 
+@dataclass
+class PendingRow:
+    transaction: Transaction
+    tag_ids: list[int]
+
+    @property
+    def key(self) -> tuple:
+        return tuple(getattr(self.transaction, field) for field in DEDUPE_FIELDS)
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    created: int
+    duplicates: int
+
+
+def _usage_of(rows: list[PendingRow]) -> tuple[dict[int, Usage], dict[int, Usage]]:
+    """Usage added by ``rows``, grouped by category and by tag."""
+    categories: dict[int, Usage] = {}
+    tags: dict[int, Usage] = {}
+    for item in rows:
+        row = item.transaction
+        usage = Usage.of(row.type, row.amount, row.date)
+        if row.category_id:
+            categories.setdefault(row.category_id, Usage()).merge(usage)
+        for tag_id in item.tag_ids:
+            tags.setdefault(tag_id, Usage()).merge(usage)
+    return categories, tags
+
+
 class CSVImportView(LoginRequiredMixin, View):
+    query_budget = 2
     template_name = "import/index.html"
     preview_template_name = "import/preview.html"
 
@@ -85,8 +132,14 @@ class CSVImportView(LoginRequiredMixin, View):
         rows = preview_data["rows"]
         headers = preview_data["headers"]
 
-        created = self._commit_rows(request, headers, mapping, rows)
-        messages.success(request, f"Imported {created} transactions")
+        started = time.perf_counter()
+        result = self._commit_rows(request, headers, mapping, rows)
+        metrics.IMPORT_TIME.inc(time.perf_counter() - started)
+        metrics.IMPORTED_ROWS.inc(result.created)
+        message = f"Imported {result.created} transactions"
+        if result.duplicates:
+            message += f" (skipped {result.duplicates} already imported)"
+        messages.success(request, message)
         request.session.pop("import_preview", None)
         return redirect("core:transactions")
 
@@ -124,10 +177,12 @@ class CSVImportView(LoginRequiredMixin, View):
         headers: list[str],
         mapping: dict[str, str],
         rows: list[list[str]],
-    ) -> int:
+    ) -> ImportResult:
         user = request.user
-        created = 0
         with transaction.atomic():
+            # Categories created for earlier rows roll back with the rest if a
+            # later row fails validation.
+            pending: list[PendingRow] = []
             for row in rows:
                 row_data = {
                     header: row[idx] if idx < len(row) else ""
@@ -136,11 +191,120 @@ class CSVImportView(LoginRequiredMixin, View):
                 txn_kwargs = self._build_transaction_kwargs(user, row_data, mapping)
                 if not txn_kwargs:
                     continue
+                tags = txn_kwargs.pop("tags", ())
                 transaction_obj = Transaction(**txn_kwargs)
-                transaction_obj.full_clean()
-                transaction_obj.save()
-                created += 1
-        return created
+                # The user is the requester and categories come from their
+                # reference data, so skip the per-row foreign key lookups;
+                # ``clean()`` still checks category ownership and kind.
+                transaction_obj.full_clean(exclude=["user", "category"])
+                transaction_obj.set_minor_amounts()
+                pending.append(
+                    PendingRow(transaction_obj, sorted(tag.pk for tag in tags))
+                )
+
+            change_seq = ChangeSequence.allocate(user.pk)
+            now = timezone.now()
+            for item in pending:
+                item.transaction.change_seq = change_seq
+                item.transaction.created_at = item.transaction.updated_at = now
+            if supports_copy(connection):
+                created = self._copy_rows(pending)
+            else:
+                created = self._insert_rows(user, pending)
+            categories, tags = _usage_of(created)
+            apply_usage(Category, categories)
+            apply_usage(Tag, tags)
+        if created:
+            bump_data_version(user.pk)
+            publish_dashboard_stale(user.pk)
+        return ImportResult(
+            created=len(created), duplicates=len(pending) - len(created)
+        )
+
+    def _insert_rows(self, user, pending: list[PendingRow]) -> list[PendingRow]:
+        """Batched ORM inserts, skipping rows already in the account."""
+        if not pending:
+            return []
+        dates = [item.transaction.date for item in pending]
+        existing = set(
+            Transaction.objects.for_user(user)
+            .filter(date__range=(min(dates), max(dates)))
+            .values_list(*DEDUPE_FIELDS)
+        )
+        fresh = [item for item in pending if item.key not in existing]
+        with deferred_sqlite_fts(connection):
+            Transaction.objects.bulk_create(
+                [item.transaction for item in fresh], batch_size=IMPORT_BATCH_SIZE
+            )
+        through = Transaction.tags.through
+        through.objects.bulk_create(
+            [
+                through(transaction_id=item.transaction.pk, tag_id=tag_id)
+                for item in fresh
+                for tag_id in item.tag_ids
+            ],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+        return fresh
+
+    def _copy_rows(self, pending: list[PendingRow]) -> list[PendingRow]:
+        """Postgres: ``COPY`` the rows into temporary staging tables, then
+        dedupe against the account and insert with set-based SQL."""
+        if not pending:
+            return []
+        table = Transaction._meta.db_table
+        through = Transaction.tags.through._meta.db_table
+        fields = Transaction._meta.concrete_fields
+        columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+        for pk, item in zip(reserve_ids(table, len(pending)), pending):
+            item.transaction.pk = pk
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {STAGING_TABLE} (LIKE {table}) "
+                "ON COMMIT DROP"
+            )
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {STAGING_TAGS_TABLE} "
+                "(transaction_id bigint, tag_id bigint) ON COMMIT DROP"
+            )
+            load_rows(
+                STAGING_TABLE,
+                [f.column for f in fields],
+                (
+                    [getattr(item.transaction, f.attname) for f in fields]
+                    for item in pending
+                ),
+            )
+            load_rows(
+                STAGING_TAGS_TABLE,
+                ("transaction_id", "tag_id"),
+                (
+                    (item.transaction.pk, tag_id)
+                    for item in pending
+                    for tag_id in item.tag_ids
+                ),
+            )
+            matches = " AND ".join(
+                f"e.{column} = s.{column}"
+                for column in (
+                    Transaction._meta.get_field(field).column for field in DEDUPE_FIELDS
+                )
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} "
+                f"FROM {STAGING_TABLE} s WHERE NOT EXISTS ("
+                f"SELECT 1 FROM {table} e WHERE e.user_id = s.user_id AND {matches}"
+                ") RETURNING id"
+            )
+            inserted = {row[0] for row in cursor.fetchall()}
+            # Reserved ids are ours alone, so the join keeps exactly the links
+            # of rows that survived the dedupe.
+            cursor.execute(
+                f"INSERT INTO {through} (transaction_id, tag_id) "
+                f"SELECT l.transaction_id, l.tag_id FROM {STAGING_TAGS_TABLE} l "
+                f"JOIN {table} t ON t.id = l.transaction_id"
+            )
+        return [item for item in pending if item.transaction.pk in inserted]
 
     def _build_transaction_kwargs(
         self, user, row_data: dict[str, str], mapping: dict[str, str]
@@ -193,18 +357,22 @@ class CSVImportView(LoginRequiredMixin, View):
 
         category_name = data.get("category")
         category_instance = None
+        tags = ()
         if category_name:
             category_kind = (
                 Transaction.Type.INCOME
                 if txn_type == Transaction.Type.INCOME
                 else Transaction.Type.EXPENSE
             )
-            category_instance, _ = Category.objects.get_or_create(
-                user=user,
-                name=category_name.strip(),
-                kind=category_kind,
-                defaults={"color": "#999999"},
+            category_instance = reference_data_for(user).get_or_create_category(
+                category_name.strip(), category_kind, defaults={"color": "#999999"}
+            )
+        else:
+            rule = reference_data_for(user).rule_matcher.match(
+                description, amount, txn_type
             )
+            if rule is not None:
+                category_instance, tags = rule.category, rule.tags
 
         return {
             "user": user,
@@ -214,6 +382,7 @@ class CSVImportView(LoginRequiredMixin, View):
             "date": parsed_date,
             "category": category_instance,
             "notes": description,
+            "tags": tags,
         }
 
     def _suggest_mapping(self, headers: list[str]) -> dict[str, str]:
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """``LoginRequiredMixin`` for views whose handlers are coroutines."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        # The lazy ``request.user`` would query the session and user tables
+        # from the event loop, which Django refuses to do.
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
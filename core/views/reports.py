@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 from calendar import month_name
 from datetime import date
-from decimal import Decimal
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models
@@ -11,61 +10,75 @@ from django.db.models import Sum
 from django.utils import timezone
 from django.views.generic import TemplateView
 
-from core.forms import TransactionFilterForm
+from core.analytics import abuild_budget_matrix, build_budget_matrix
+from core.forms import BudgetMatrixForm, TransactionFilterForm
 from core.models import Transaction
+from core.money import from_minor, minor_to_float
+from core.reference import reference_data_for
+
+from .mixins import AsyncLoginRequiredMixin
 
 
 class MonthlyReportView(LoginRequiredMixin, TemplateView):
+    query_budget = 3
     template_name = "reports/monthly.html"
     months_to_show = 12
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
+        start = self.first_month()
+        context.update(
+            self.report_context(start, self.monthly_totals(self.request.user, start))
+        )
+        return context
+
+    def first_month(self) -> date:
         today = timezone.localdate().replace(day=1)
-        start = self._subtract_months(today, self.months_to_show - 1)
-        rows = (
+        return self._subtract_months(today, self.months_to_show - 1)
+
+    def monthly_totals(self, user, start: date):
+        return (
             Transaction.objects.for_user(user)
             .filter(date__gte=start)
             .values("date__year", "date__month")
             .annotate(
                 income=Sum(
-                    "amount",
+                    "amount_minor",
                     filter=models.Q(type=Transaction.Type.INCOME),
-                    default=Decimal("0"),
+                    default=0,
                 ),
                 expense=Sum(
-                    "amount",
+                    "amount_minor",
                     filter=models.Q(type=Transaction.Type.EXPENSE),
-                    default=Decimal("0"),
+                    default=0,
                 ),
+                net=Sum("signed_amount_minor", default=0),
             )
         )
+
+    def report_context(self, start: date, rows) -> dict:
         row_map = {(row["date__year"], row["date__month"]): row for row in rows}
 
         labels: list[str] = []
-        income_series: list[Decimal] = []
-        expense_series: list[Decimal] = []
-        net_series: list[Decimal] = []
+        income_series: list[int] = []
+        expense_series: list[int] = []
+        net_series: list[int] = []
 
         current = start
         for _ in range(self.months_to_show):
-            key = (current.year, current.month)
-            row = row_map.get(key, {"income": Decimal("0"), "expense": Decimal("0")})
-            income = row.get("income") or Decimal("0")
-            expense = row.get("expense") or Decimal("0")
+            row = row_map.get((current.year, current.month), {})
             labels.append(f"{month_name[current.month][:3]} {current.year}")
-            income_series.append(income)
-            expense_series.append(expense)
-            net_series.append(income - expense)
+            income_series.append(row.get("income", 0))
+            expense_series.append(row.get("expense", 0))
+            net_series.append(row.get("net", 0))
             current = self._add_month(current)
 
         rows_for_table = [
             {
                 "label": labels[idx],
-                "income": income_series[idx],
-                "expense": expense_series[idx],
-                "net": net_series[idx],
+                "income": from_minor(income_series[idx]),
+                "expense": from_minor(expense_series[idx]),
+                "net": from_minor(net_series[idx]),
             }
             for idx in range(len(labels))
         ]
@@ -73,19 +86,16 @@ class MonthlyReportView(LoginRequiredMixin, TemplateView):
         chart_payload = json.dumps(
             {
                 "labels": labels,
-                "income": [float(value) for value in income_series],
-                "expense": [float(value) for value in expense_series],
-                "net": [float(value) for value in net_series],
+                "income": [minor_to_float(value) for value in income_series],
+                "expense": [minor_to_float(value) for value in expense_series],
+                "net": [minor_to_float(value) for value in net_series],
             }
         )
 
-        context.update(
-            {
-                "monthly_rows": rows_for_table,
-                "chart_data_json": chart_payload,
-            }
-        )
-        return context
+        return {
+            "monthly_rows": rows_for_table,
+            "chart_data_json": chart_payload,
+        }
 
     def _subtract_months(self, date_value: date, months: int) -> date:
         year = date_value.year
@@ -101,7 +111,18 @@ class MonthlyReportView(LoginRequiredMixin, TemplateView):
         return date(date_value.year, date_value.month + 1, 1)
 
 
+class AsyncMonthlyReportView(AsyncLoginRequiredMixin, MonthlyReportView):
+    async def get(self, request, *args, **kwargs):
+        # Bypass MonthlyReportView.get_context_data, which queries in sync.
+        context = super(MonthlyReportView, self).get_context_data(**kwargs)
+        start = self.first_month()
+        rows = [row async for row in self.monthly_totals(request.user, start)]
+        context.update(self.report_context(start, rows))
+        return self.render_to_response(context)
+
+
 class CategoryReportView(LoginRequiredMixin, TemplateView):
+    query_budget = 5
     template_name = "reports/categories.html"
 
     def get_context_data(self, **kwargs):
@@ -110,38 +131,41 @@ class CategoryReportView(LoginRequiredMixin, TemplateView):
         form = TransactionFilterForm(self.request.GET or None, user=user)
         queryset = Transaction.objects.for_user(user).with_related()
         if form.is_valid():
-            filters = form.build_filters()
-            if filters:
-                queryset = queryset.filter(filters).distinct()
+            queryset = form.filter_queryset(queryset)
         raw_categories = list(
             queryset.exclude(category__isnull=True)
-            .values("category__name", "category__kind")
-            .annotate(total=Sum("amount"))
+            .values("category_id")
+            .annotate(total=Sum("amount_minor"))
             .order_by("-total")
         )
 
-        categories = [
-            {
-                "name": row["category__name"],
-                "kind": row["category__kind"],
-                "total": row["total"] or Decimal("0"),
-            }
-            for row in raw_categories
-        ]
+        # Names come from the reference data the filter form already loaded,
+        # so the aggregate needs no join to categories.
+        categories_by_id = reference_data_for(user).categories_by_id
+        categories = []
+        totals = {Transaction.Type.INCOME: 0, Transaction.Type.EXPENSE: 0}
+        for row in raw_categories:
+            category = categories_by_id.get(row["category_id"])
+            if category is None:  # Created after the reference data loaded.
+                continue
+            total = row["total"] or 0
+            totals[category.kind] += total
+            categories.append(
+                {
+                    "name": category.name,
+                    "kind": category.kind,
+                    "total": from_minor(total),
+                    "total_minor": total,
+                }
+            )
 
-        income_total = sum(
-            row["total"] for row in categories if row["kind"] == Transaction.Type.INCOME
-        )
-        expense_total = sum(
-            row["total"]
-            for row in categories
-            if row["kind"] == Transaction.Type.EXPENSE
-        )
+        income_total = from_minor(totals[Transaction.Type.INCOME])
+        expense_total = from_minor(totals[Transaction.Type.EXPENSE])
 
         chart_payload = json.dumps(
             {
                 "labels": [row["name"] for row in categories],
-                "totals": [float(row["total"]) for row in categories],
+                "totals": [minor_to_float(row["total_minor"]) for row in categories],
             }
         )
 
@@ -156,3 +180,40 @@ class CategoryReportView(LoginRequiredMixin, TemplateView):
             }
         )
         return context
+
+
+class BudgetMatrixReportView(LoginRequiredMixin, TemplateView):
+    query_budget = 4
+    template_name = "reports/budget_matrix.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = BudgetMatrixForm(self.request.GET)
+        matrix = None
+        if form.is_valid():
+            matrix = build_budget_matrix(
+                self.request.user, form.cleaned_data["start"], form.cleaned_data["end"]
+            )
+        context.update(self.matrix_context(form, matrix))
+        return context
+
+    def matrix_context(self, form, matrix) -> dict:
+        return {
+            "form": form,
+            "matrix": matrix,
+            "matrix_rows": matrix.rows() if matrix else [],
+            "matrix_totals": matrix.totals() if matrix else None,
+        }
+
+
+class AsyncBudgetMatrixReportView(AsyncLoginRequiredMixin, BudgetMatrixReportView):
+    async def get(self, request, *args, **kwargs):
+        context = super(BudgetMatrixReportView, self).get_context_data(**kwargs)
+        form = BudgetMatrixForm(request.GET)
+        matrix = None
+        if form.is_valid():
+            matrix = await abuild_budget_matrix(
+                request.user, form.cleaned_data["start"], form.cleaned_data["end"]
+            )
+        context.update(self.matrix_context(form, matrix))
+        return self.render_to_response(context)
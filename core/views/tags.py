@@ -2,14 +2,17 @@ from __future__ import annotations
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, DeleteView, ListView, UpdateView
+from django.views.generic import CreateView, DeleteView, FormView, ListView, UpdateView
 
-from core.forms import TagForm
+from core.forms import TagForm, TagMergeForm
 from core.models import Tag
+from core.reference import reference_data_for
 
 
 class TagListView(LoginRequiredMixin, ListView):
+    query_budget = 3
     template_name = "tags/list.html"
     context_object_name = "tags"
 
@@ -53,3 +56,36 @@ class TagDeleteView(LoginRequiredMixin, DeleteView):
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, "Tag deleted")
         return super().delete(request, *args, **kwargs)
+
+
+class TagMergeView(LoginRequiredMixin, FormView):
+    template_name = "tags/merge.html"
+    form_class = TagMergeForm
+    success_url = reverse_lazy("core:tags")
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            self.object = get_object_or_404(
+                Tag.objects.filter(user=request.user), pk=kwargs["pk"]
+            )
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["source"] = self.object
+        kwargs["candidates"] = reference_data_for(self.request.user).active_tags()
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["object"] = self.object
+        return context
+
+    def form_valid(self, form):
+        result = form.merge()
+        messages.success(
+            self.request,
+            f"Tag merged into {form.cleaned_data['target'].name} "
+            f"({result.transactions} transactions retagged)",
+        )
+        return super().form_valid(form)
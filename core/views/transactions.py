@@ -2,14 +2,24 @@ from __future__ import annotations
 
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.http import Http404
+from django.shortcuts import redirect, render
+from django.urls import reverse, reverse_lazy
+from django.views import View
 from django.views.generic import CreateView, DeleteView, ListView, UpdateView
 
-from core.forms import TransactionFilterForm, TransactionForm
+from core.bulk import BulkAction
+from core.forms import (
+    TransactionBulkActionForm,
+    TransactionFilterForm,
+    TransactionForm,
+)
 from core.models import Transaction
+from core.pagination import CachedCountPaginator, InvalidCursor, paginate_keyset
 
 
 class TransactionListView(LoginRequiredMixin, ListView):
+    query_budget = 7
     template_name = "transactions/list.html"
     context_object_name = "transactions"
     paginate_by = 25
@@ -20,17 +30,62 @@ class TransactionListView(LoginRequiredMixin, ListView):
             self.request.GET or None, user=self.request.user
         )
         if self.filter_form.is_valid():
-            qs = qs.filter(self.filter_form.build_filters()).distinct()
+            qs = self.filter_form.filter_queryset(qs)
         return qs.order_by("-date", "-created_at")
 
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return CachedCountPaginator(
+            queryset, per_page, user_id=self.request.user.pk, **kwargs
+        )
+
+    @property
+    def keyset_mode(self) -> bool:
+        return "cursor" in self.request.GET
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, page_size)
+        try:
+            page = paginate_keyset(queryset, self.request.GET["cursor"], page_size)
+        except InvalidCursor as exc:
+            raise Http404(str(exc)) from exc
+        return (None, page, page.object_list, page.has_other_pages())
+
+    def _cursor_query(self, cursor: str) -> str:
+        params = self.request.GET.copy()
+        params.pop("page", None)
+        params["cursor"] = cursor
+        return params.urlencode()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        if self.keyset_mode:
+            page = context["page_obj"]
+            context["keyset_page"] = page
+            if page.next_cursor:
+                context["next_cursor_query"] = self._cursor_query(page.next_cursor)
+            if page.previous_cursor:
+                context["previous_cursor_query"] = self._cursor_query(
+                    page.previous_cursor
+                )
+        else:
+            context["keyset_first_query"] = self._cursor_query("")
         context["filter_form"] = getattr(
             self, "filter_form", TransactionFilterForm(user=self.request.user)
         )
         context["create_form"] = TransactionForm(user=self.request.user)
+        context["bulk_form"] = TransactionBulkActionForm(
+            user=self.request.user,
+            initial={"filter_query": self._filter_query()},
+        )
         return context
 
+    def _filter_query(self) -> str:
+        params = self.request.GET.copy()
+        for key in ("page", "cursor"):
+            params.pop(key, None)
+        return params.urlencode()
+
 
 class TransactionCreateView(LoginRequiredMixin, CreateView):
     template_name = "transactions/form.html"
@@ -82,3 +137,49 @@ class TransactionDeleteView(LoginRequiredMixin, DeleteView):
     def delete(self, request, *args, **kwargs):
         messages.success(self.request, "Transaction deleted")
         return super().delete(request, *args, **kwargs)
+
+
+class TransactionBulkActionView(LoginRequiredMixin, View):
+    http_method_names = ["post"]
+
+    def post(self, request, *args, **kwargs):
+        form = TransactionBulkActionForm(request.POST, user=request.user)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return self._redirect(form)
+        if form.needs_confirmation:
+            return self._confirm(form)
+        result = form.apply()
+        verb = "deleted" if result.action == BulkAction.DELETE else "updated"
+        messages.success(
+            request, f"{result.affected} of {result.matched} transactions {verb}"
+        )
+        return self._redirect(form)
+
+    def _confirm(self, form):
+        # Re-post the same selection, plus the confirmation, from a page
+        # that says how many transactions would go.
+        hidden = [
+            (name, value)
+            for name, values in self.request.POST.lists()
+            if name not in ("csrfmiddlewaretoken", "confirmed")
+            for value in values
+        ]
+        url = reverse("core:transactions")
+        query = form.cleaned_data.get("filter_query")
+        return render(
+            self.request,
+            "transactions/confirm_bulk_delete.html",
+            {
+                "count": form.selection().count(),
+                "hidden": hidden,
+                "cancel_url": f"{url}?{query}" if query else url,
+            },
+        )
+
+    def _redirect(self, form):
+        url = reverse("core:transactions")
+        query = form.data.get("filter_query")
+        return redirect(f"{url}?{query}" if query else url)
@@ -56,12 +56,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.QueryInstrumentationMiddleware",
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
+    "core.middleware.ReferenceDataMiddleware",
     "allauth.account.middleware.AccountMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -110,6 +114,21 @@ else:
     }
     conn_health_checks = (True,)
 
+# Optional read replica; safe-method requests read from it (see core.routers).
+replica_db_url = os.getenv("DATABASE_REPLICA_URL")
+if replica_db_url:
+    if dj_database_url:
+        DATABASES["replica"] = dj_database_url.parse(
+            replica_db_url, conn_max_age=600, conn_health_checks=True
+        )
+    else:
+        DATABASES["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": replica_db_url.replace("sqlite:///", ""),
+        }
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -192,6 +211,100 @@ REST_FRAMEWORK = {
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
 
+# Pagination counts: exact up to the threshold, estimated beyond it.
+PAGINATION_COUNT_THRESHOLD = int(os.getenv("PAGINATION_COUNT_THRESHOLD", "10000"))
+PAGINATION_COUNT_CACHE_SECONDS = int(os.getenv("PAGINATION_COUNT_CACHE_SECONDS", "300"))
+SYNC_TOMBSTONE_DAYS = int(os.getenv("SYNC_TOMBSTONE_DAYS", "90"))
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "10"))
+TRANSACTION_PARTITION_MONTHS_AHEAD = int(
+    os.getenv("TRANSACTION_PARTITION_MONTHS_AHEAD", "3")
+)
+# Serve the dashboard and reports from their async variants (for ASGI).
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False").lower() in {"1", "true", "yes"}
+# Per-request query counts and timings (Server-Timing header, core.queries
+# log) and view query budgets; see core.middleware.
+QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "True").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+QUERY_SLOWEST_KEPT = int(os.getenv("QUERY_SLOWEST_KEPT", "3"))
+QUERY_BUDGETS_ENFORCED = False
+# Opt-in slow query capture with EXPLAIN plans, shown at /admin/slow-queries/;
+# see core.slow_queries.
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.environ["SLOW_QUERY_THRESHOLD_MS"])
+    if os.getenv("SLOW_QUERY_THRESHOLD_MS")
+    else None
+)
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+SLOW_QUERY_EXPLAIN_ANALYZE = os.getenv(
+    "SLOW_QUERY_EXPLAIN_ANALYZE", "False"
+).lower() in {"1", "true", "yes"}
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+# Show bound parameters on the slow query page. Those of the session, user
+# and token tables are always redacted.
+SLOW_QUERY_CAPTURE_PARAMS = os.getenv("SLOW_QUERY_CAPTURE_PARAMS", "False").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+# Bearer token required to scrape /metrics; unset leaves it open (restrict it
+# at the proxy instead).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Caching: a small per-process LRU in front of a shared tier that every worker
+# sees (core.cache_backends.TieredCache). CACHE_URL picks the shared tier:
+# redis://... (needs the redis package), db://<table> for a database table
+# (run createcachetable first) or, when unset, files under CACHE_DIR.
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    shared_cache: dict[str, Any] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": CACHE_URL,
+    }
+elif CACHE_URL.startswith("db://"):
+    shared_cache = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": CACHE_URL.removeprefix("db://") or "finance_cache",
+    }
+else:
+    shared_cache = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR") or str(BASE_DIR / ".cache"),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+CACHES = {
+    "default": {
+        "BACKEND": "core.cache_backends.TieredCache",
+        "OPTIONS": {
+            "SHARED": "shared",
+            "LOCAL_MAX_ENTRIES": int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1000")),
+            "LOCAL_TIMEOUT": float(os.getenv("CACHE_LOCAL_SECONDS", "5")),
+            # Read by other workers right after they change; never served
+            # stale from the local tier.
+            "LOCAL_SKIP": ["*:data-version", "*:replica-pin"],
+            "COMPRESS_MIN_BYTES": int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024")),
+        },
+    },
+    "shared": shared_cache,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "core.queries": {
+            "handlers": ["console"],
+            "level": os.getenv("QUERY_LOG_LEVEL", "INFO"),
+        },
+    },
+}
+# Pub/sub for live dashboard updates; core.events.PostgresBroker shares
+# events between server processes.
+EVENT_BROKER = os.getenv("EVENT_BROKER", "core.events.InProcessBroker")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(
         minutes=int(os.getenv("JWT_ACCESS_MINUTES", "15"))
@@ -202,7 +315,11 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
-REST_USE_JWT = True
+REST_AUTH = {
+    "USE_JWT": True,
+    # API clients read the refresh token from the login response.
+    "JWT_AUTH_HTTPONLY": False,
+}
 
 CRISPY_TEMPLATE_PACK = "bootstrap4"
 
@@ -7,8 +7,16 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import MetricsView, SlowQueryListView
+
 urlpatterns = [
+    path(
+        "admin/slow-queries/",
+        admin.site.admin_view(SlowQueryListView.as_view()),
+        name="slow-queries",
+    ),
     path("admin/", admin.site.urls),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("accounts/", include("allauth.urls")),
     path("auth/", include("dj_rest_auth.urls")),
     path("auth/registration/", include("dj_rest_auth.registration.urls")),
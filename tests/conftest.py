@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from core.instrumentation import QueryBudgetExceeded, recording_queries
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Fail any request whose view runs more queries than its
+    ``query_budget`` (see ``QueryInstrumentationMiddleware``)."""
+    settings.QUERY_BUDGETS_ENFORCED = True
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings, tmp_path):
+    """Give each test an empty file-based shared cache tier of its own."""
+    settings.CACHES = {
+        **settings.CACHES,
+        "shared": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        },
+    }
+    # Also empties the in-process tier, which outlives the settings change.
+    cache.clear()
+
+
+@pytest.fixture
+def query_budget():
+    """``with query_budget(3): ...`` fails if the block runs more queries."""
+
+    @contextmanager
+    def within(budget: int):
+        with recording_queries() as stats:
+            yield stats
+        if stats.count > budget:
+            statements = "\n".join(sql for _, sql in stats.slowest)
+            raise QueryBudgetExceeded(
+                f"Ran {stats.count} queries, budget is {budget}. "
+                f"Slowest:\n{statements}"
+            )
+
+    return within
+
+
+@pytest.fixture
+def static_storage(settings):
+    """Serve static files without the manifest, which tests never build."""
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username="user", email="user@example.com", password="SuperSecret123"
+    )
@@ -4,8 +4,12 @@ from datetime import date
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
+from core.api.serializers import TransactionSerializer
 from core.models import Category, Tag, Transaction
 
 
@@ -97,3 +101,109 @@ def test_transaction_create_assigns_user_and_tags(api_client, user):
     transaction = Transaction.objects.get(id=transaction_id)
     assert transaction.user == user
     assert transaction.tags.filter(name="Food").exists()
+
+
+@pytest.mark.django_db
+def test_transaction_list_matches_model_serializer_output(api_client, user):
+    category = Category.objects.create(
+        user=user, name="Travel", kind=Category.Kind.EXPENSE
+    )
+    zebra = Tag.objects.create(user=user, name="Zebra")
+    alpha = Tag.objects.create(user=user, name="Alpha")
+    tagged = Transaction.objects.create(
+        user=user,
+        type=Transaction.Type.EXPENSE,
+        amount="12.30",
+        date=date(2024, 3, 4),
+        category=category,
+        notes="Train",
+    )
+    tagged.tags.set([zebra, alpha])
+    Transaction.objects.create(
+        user=user,
+        type=Transaction.Type.INCOME,
+        amount="100.00",
+        date=date(2024, 3, 5),
+    )
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get("/api/transactions/")
+
+    queryset = Transaction.objects.for_user(user).with_related()
+    expected = TransactionSerializer(
+        queryset.order_by("-date", "-created_at"),
+        many=True,
+        context={"request": response.wsgi_request},
+    ).data
+    assert JSONRenderer().render(response.data["results"]) == JSONRenderer().render(
+        expected
+    )
+    assert response.data["results"][1]["tags"] == [alpha.id, zebra.id]
+
+
+@pytest.mark.django_db
+def test_transaction_list_sparse_fieldset(api_client, user):
+    Transaction.objects.create(
+        user=user,
+        type=Transaction.Type.EXPENSE,
+        amount="3.00",
+        date=date(2024, 3, 4),
+    )
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get(
+        "/api/transactions/", {"fields": "date,amount,category,bogus"}
+    )
+
+    assert response.status_code == 200
+    assert response.data["results"] == [
+        {"amount": "3.00", "date": "2024-03-04", "category": None}
+    ]
+
+
+@pytest.mark.django_db
+def test_transaction_list_create_batches_writes(api_client, user):
+    dining = Category.objects.create(
+        user=user, name="Dining", kind=Category.Kind.EXPENSE
+    )
+    salary = Category.objects.create(
+        user=user, name="Salary", kind=Category.Kind.INCOME
+    )
+    tags = [Tag.objects.create(user=user, name=name) for name in ("a", "b")]
+
+    def rows(count):
+        return [
+            {
+                "type": Transaction.Type.EXPENSE,
+                "amount": f"{index}.50",
+                "date": "2024-04-01",
+                "category": dining.id,
+                "tags": [tag.id for tag in tags],
+            }
+            for index in range(1, count + 1)
+        ]
+
+    api_client.force_authenticate(user=user)
+
+    # Batched: the query count does not grow with the number of rows.
+    with CaptureQueriesContext(connection) as few:
+        response = api_client.post("/api/transactions/", rows(5), format="json")
+    assert response.status_code == 201, response.content
+    payload = rows(20)
+    with CaptureQueriesContext(connection) as many:
+        response = api_client.post("/api/transactions/", payload, format="json")
+
+    assert response.status_code == 201, response.content
+    assert len(many) == len(few)
+    assert [row["amount"] for row in response.data] == [
+        item["amount"] for item in payload
+    ]
+    assert response.data[0]["tags"] == [tags[0].id, tags[1].id]
+    assert Transaction.objects.filter(user=user).count() == 25
+    assert Transaction.tags.through.objects.count() == 50
+
+    payload[3]["category"] = salary.id
+    response = api_client.post("/api/transactions/", payload, format="json")
+    assert response.status_code == 400
+    assert "category" in response.data[3]
+    assert Transaction.objects.filter(user=user).count() == 25
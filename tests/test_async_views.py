@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.api.views import AsyncBudgetMatrixView, BudgetMatrixView
+from core.models import Budget, Category, Transaction
+from core.views import (
+    AsyncDashboardView,
+    AsyncMonthlyReportView,
+    DashboardView,
+    MonthlyReportView,
+)
+
+# The async views read on worker-thread connections, which cannot see rows
+# written inside a test's wrapping transaction.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def user():
+    User = get_user_model()
+    user = User.objects.create_user(
+        username="async", email="async@example.com", password="SuperSecret123"
+    )
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    today = timezone.localdate()
+    for amount, txn_type, category in [
+        ("12.50", Transaction.Type.EXPENSE, food),
+        ("7.25", Transaction.Type.EXPENSE, None),
+        ("100.00", Transaction.Type.INCOME, None),
+    ]:
+        Transaction.objects.create(
+            user=user, type=txn_type, amount=amount, date=today, category=category
+        )
+    Budget.objects.create(
+        user=user, category=food, amount="50.00", start_month=today.replace(day=1)
+    )
+    return user
+
+
+def _request(user, path="/"):
+    request = RequestFactory().get(path)
+    request.user = user
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    return request
+
+
+def test_async_dashboard_matches_sync_dashboard(user):
+    expected = DashboardView.as_view()(_request(user)).context_data
+    response = async_to_sync(AsyncDashboardView.as_view())(_request(user))
+
+    assert response.status_code == 200
+    context = response.context_data
+    for key in ("income_total", "expense_total", "net_total", "top_categories"):
+        assert context[key] == expected[key]
+    assert [txn.pk for txn in context["recent_transactions"]] == [
+        txn.pk for txn in expected["recent_transactions"]
+    ]
+
+    anonymous = async_to_sync(AsyncDashboardView.as_view())(_request(AnonymousUser()))
+    assert anonymous.status_code == 302
+
+
+def test_async_monthly_report_renders(user, static_storage):
+    expected = MonthlyReportView.as_view()(_request(user)).context_data
+    response = async_to_sync(AsyncMonthlyReportView.as_view())(_request(user))
+
+    assert response.context_data["monthly_rows"] == expected["monthly_rows"]
+    assert "Monthly Trends" in response.render().content.decode()
+
+
+def test_async_budget_matrix_api_matches_sync(user):
+    month = timezone.localdate().replace(day=1)
+    factory = APIRequestFactory()
+    params = {"start": f"{month:%Y-%m}", "end": f"{month:%Y-%m}"}
+
+    request = factory.get("/api/reports/budget-matrix/", params)
+    force_authenticate(request, user=user)
+    expected = BudgetMatrixView.as_view()(request).data
+    request = factory.get("/api/reports/budget-matrix/", params)
+    force_authenticate(request, user=user)
+    response = async_to_sync(AsyncBudgetMatrixView.as_view())(request)
+
+    assert response.status_code == 200
+    assert response.data == expected
+    assert response.data["categories"][0]["spent"] == ["12.50"]
+
+    request = factory.get("/api/reports/budget-matrix/", {"start": "nope"})
+    force_authenticate(request, user=user)
+    assert async_to_sync(AsyncBudgetMatrixView.as_view())(request).status_code == 400
+    anonymous = factory.get("/api/reports/budget-matrix/")
+    response = async_to_sync(AsyncBudgetMatrixView.as_view())(anonymous)
+    assert response.status_code in (401, 403)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.benchmarks import (
+    CASES,
+    DatasetSpec,
+    Session,
+    compare_reports,
+    generate_dataset,
+    run_benchmarks,
+)
+from core.models import Budget, Transaction
+
+
+@pytest.mark.django_db
+def test_every_case_runs_and_reports_percentiles(user, static_storage):
+    spec = DatasetSpec(transactions=120, categories=6, tags=4, months=6, seed=7)
+    generate_dataset(user, spec)
+    assert Transaction.objects.for_user(user).count() == 120
+    assert (
+        Budget.objects.filter(user=user).count() == 12 * 5
+    )  # One income, five expense categories.
+    assert Transaction.tags.through.objects.exists()
+
+    session = Session.start(user, spec, "testserver", import_rows=20)
+    report = run_benchmarks(session, CASES, iterations=2)
+
+    assert json.loads(json.dumps(report)) == report
+    assert [result["name"] for result in report["results"]] == [
+        case.name for case in CASES
+    ]
+    for result in report["results"]:
+        assert result["iterations"] == 2
+        assert 0 < result["min_ms"] <= result["p50_ms"] <= result["p99_ms"]
+        assert result["queries"] > 0
+    # Cleanups leave the dataset as generated.
+    assert Transaction.objects.for_user(user).count() == 120
+
+
+def test_compare_reports_flags_slower_cases_and_extra_queries():
+    baseline = {
+        "results": [
+            {"name": "dashboard", "p95_ms": 10.0, "queries": 7},
+            {"name": "budgets", "p95_ms": 10.0, "queries": 5},
+        ]
+    }
+    current = {
+        "results": [
+            {"name": "dashboard", "p95_ms": 10.9, "queries": 7},
+            {"name": "budgets", "p95_ms": 12.0, "queries": 6},
+            {"name": "new", "p95_ms": 99.0, "queries": 99},
+        ]
+    }
+    regressions = compare_reports(baseline, current, tolerance=0.1)
+    assert [(r.name, r.metric) for r in regressions] == [
+        ("budgets", "p95_ms"),
+        ("budgets", "queries"),
+    ]
+
+
+@pytest.mark.django_db
+def test_benchmark_command_writes_and_compares_reports(static_storage, tmp_path):
+    output = tmp_path / "report.json"
+    options = dict(
+        transactions=40, iterations=1, warmup=0, case=["dashboard"], host="testserver"
+    )
+    call_command("benchmark", output=str(output), stdout=StringIO(), **options)
+    report = json.loads(output.read_text())
+    assert report["dataset"]["transactions"] == 40
+    assert report["results"][0]["name"] == "dashboard"
+    assert not get_user_model().objects.filter(email="benchmark@example.invalid")
+
+    report["results"][0]["queries"] = 1
+    output.write_text(json.dumps(report))
+    with pytest.raises(CommandError, match="dashboard: queries"):
+        call_command("benchmark", compare=str(output), stdout=StringIO(), **options)
+
+
+@pytest.mark.django_db
+def test_benchmark_command_rejects_bad_options(static_storage):
+    options = dict(transactions=10, warmup=0, case=["dashboard"], stdout=StringIO())
+    with pytest.raises(CommandError, match="--iterations must be at least 1"):
+        call_command("benchmark", iterations=0, host="testserver", **options)
+    with pytest.raises(CommandError, match="returned 400; is --host in ALLOWED"):
+        call_command("benchmark", iterations=1, host="unknown.invalid", **options)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Category, Tag, Transaction
+
+
+@pytest.fixture
+def other(db):
+    User = get_user_model()
+    return User.objects.create_user(
+        username="other", email="other@example.com", password="SuperSecret123"
+    )
+
+
+def _txn(user, notes, txn_type=Transaction.Type.EXPENSE):
+    return Transaction.objects.create(
+        user=user, type=txn_type, amount="10.00", date=date(2024, 5, 1), notes=notes
+    )
+
+
+@pytest.mark.django_db
+def test_api_bulk_by_ids_and_by_filter(user, other):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    trip = Tag.objects.create(user=user, name="Trip")
+    lunch = _txn(user, "lunch")
+    dinner = _txn(user, "dinner")
+    salary = _txn(user, "salary", Transaction.Type.INCOME)
+    foreign = _txn(other, "lunch")
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    url = "/api/transactions/bulk/"
+
+    response = client.post(
+        url,
+        {
+            "action": "set_category",
+            "ids": [lunch.id, salary.id, foreign.id],
+            "category": food.id,
+        },
+        format="json",
+    )
+    assert response.status_code == 200
+    assert response.data == {"action": "set_category", "matched": 2, "affected": 1}
+    lunch.refresh_from_db()
+    salary.refresh_from_db()
+    assert lunch.category == food and salary.category is None
+
+    response = client.post(
+        url,
+        {"action": "add_tags", "filter": {"type": "EXPENSE"}, "tags": [trip.id]},
+        format="json",
+    )
+    assert response.data["affected"] == 2
+    response = client.post(
+        url,
+        {"action": "add_tags", "ids": [lunch.id, dinner.id], "tags": [trip.id]},
+        format="json",
+    )
+    assert response.data["affected"] == 0
+    assert set(trip.transactions.values_list("id", flat=True)) == {lunch.id, dinner.id}
+
+    response = client.post(
+        url, {"action": "delete", "filter": {"q": "lunch"}}, format="json"
+    )
+    assert response.data == {"action": "delete", "matched": 1, "affected": 1}
+    assert not Transaction.objects.filter(id=lunch.id).exists()
+    assert Transaction.objects.filter(id=foreign.id).exists()
+    assert set(trip.transactions.values_list("id", flat=True)) == {dinner.id}
+
+    response = client.post(url, {"action": "delete"}, format="json")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_view_changes_type_and_clears_mismatched_category(client, user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    refund = _txn(user, "refund")
+    refund.category = food
+    refund.save()
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+
+    response = client.post(
+        reverse("core:transaction-bulk"),
+        {"action": "set_type", "type": "INCOME", "ids": [refund.id]},
+    )
+
+    assert response.status_code == 302
+    refund.refresh_from_db()
+    assert refund.type == Transaction.Type.INCOME
+    assert refund.category is None
+
+
+@pytest.mark.django_db
+def test_bulk_view_asks_before_deleting_everything_matching(
+    client, user, static_storage
+):
+    _txn(user, "lunch")
+    _txn(user, "dinner")
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+    url = reverse("core:transaction-bulk")
+    data = {"action": "delete", "select_all": "on", "filter_query": ""}
+
+    response = client.post(url, data)
+
+    assert response.status_code == 200
+    assert response.context["count"] == 2
+    assert ("select_all", "on") in response.context["hidden"]
+    assert Transaction.objects.filter(user=user).count() == 2
+
+    response = client.post(url, {**data, "confirmed": "on"})
+
+    assert response.status_code == 302
+    assert not Transaction.objects.filter(user=user).exists()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.bulkload import load_rows, reserve_ids
+from core.models import Tag, Transaction
+
+
+def _snapshot(user):
+    return list(
+        Transaction.objects.for_user(user)
+        .order_by("id")
+        .values_list("type", "amount", "date", "category__name", "notes")
+    )
+
+
+@pytest.mark.django_db
+def test_seed_is_deterministic_and_rows_are_consistent():
+    out = StringIO()
+    call_command(
+        "seed_transactions",
+        "--user=seeded",
+        "--transactions=300",
+        "--categories=5",
+        "--tags=3",
+        "--months=3",
+        "--batch-size=64",
+        stdout=out,
+    )
+    assert "Seeded 300 transactions for seeded" in out.getvalue()
+    user = get_user_model().objects.get(username="seeded")
+    first = _snapshot(user)
+    assert len(first) == 300
+
+    for row in Transaction.objects.for_user(user):
+        assert row.amount_minor == int(row.amount * 100)
+        sign = 1 if row.type == Transaction.Type.INCOME else -1
+        assert row.signed_amount_minor == sign * row.amount_minor
+        assert row.category.kind == row.type
+    assert Transaction.tags.through.objects.filter(
+        transaction__user=user, tag__user=user
+    ).exists()
+
+    with pytest.raises(CommandError):
+        call_command("seed_transactions", "--user=seeded", stdout=StringIO())
+    call_command(
+        "seed_transactions",
+        "--user=seeded",
+        "--transactions=300",
+        "--categories=5",
+        "--tags=3",
+        "--months=3",
+        "--replace",
+        stdout=StringIO(),
+    )
+    assert _snapshot(user) == first
+
+
+@pytest.mark.django_db
+def test_reserved_ids_do_not_collide_with_orm_inserts(user):
+    row = Transaction.objects.create(
+        user=user, type=Transaction.Type.EXPENSE, amount="5.00", date="2026-01-02"
+    )
+    first, second, third = (
+        Tag.objects.create(user=user, name=name) for name in ("a", "b", "c")
+    )
+    Link = Transaction.tags.through
+    row.tags.add(first)
+    ids = reserve_ids(Link._meta.db_table, 1)
+    written = load_rows(
+        Link._meta.db_table,
+        ("id", "transaction_id", "tag_id"),
+        [(ids[0], row.pk, second.pk)],
+    )
+    assert written == 1
+    row.tags.add(third)
+    assert list(
+        Link.objects.filter(transaction=row).order_by("id").values_list("tag__name")
+    ) == [("a",), ("b",), ("c",)]
+    assert Link.objects.get(tag=third).pk > ids[-1]
+
+
+@pytest.mark.django_db
+def test_reserved_ids_skip_those_of_deleted_rows(user):
+    row = Transaction.objects.create(
+        user=user, type=Transaction.Type.EXPENSE, amount="5.00", date="2026-01-02"
+    )
+    deleted = row.pk
+    row.delete()
+
+    ids = reserve_ids(Transaction._meta.db_table, 2)
+    assert ids == [deleted + 1, deleted + 2]
+    later = Transaction.objects.create(
+        user=user, type=Transaction.Type.EXPENSE, amount="6.00", date="2026-01-03"
+    )
+    assert later.pk == deleted + 3
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from django.core.cache import cache, caches
+
+from core.cache_backends import Compressed
+from core.caching import bump_data_version, get_data_version, user_key
+
+
+def test_tiers_compression_and_local_skip():
+    shared = caches["shared"]
+    report = {"rows": ["Groceries"] * 500}
+    key = user_key(7, "report", "2026-10")
+    assert key == "finance:user:7:report:2026-10"
+
+    cache.set(key, report, 60)
+    assert isinstance(shared.get(key), Compressed)
+    cache.set("small", "value", 60)
+    assert shared.get("small") == "value"
+
+    # Served from the in-process tier until it expires.
+    shared.delete(key)
+    assert cache.get(key) == report
+    cache.delete(key)
+    assert cache.get(key) is None
+
+    # Data versions always come from the shared tier, where other workers
+    # bump them.
+    version = get_data_version(7)
+    shared.set(user_key(7, "data-version"), version + 1, None)
+    assert get_data_version(7) == version + 1
+    bump_data_version(7)
+    assert get_data_version(7) not in (version, version + 1)
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"total": 42}
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_set("stampede", compute, 60))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [{"total": 42}] * 8
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("tier", ["files", "add"])
+def test_waits_for_another_worker_holding_the_lock(settings, tier):
+    if tier == "add":
+        # Tiers other than files lock with add(), like Redis's SET NX.
+        settings.CACHES = {
+            **settings.CACHES,
+            "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        }
+        cache.clear()
+    shared = caches["shared"]
+    holding = threading.Event()
+
+    def other_worker():
+        # Another process computing "report" holds its lock.
+        with caches["default"]._shared_lock("report", None) as locked:
+            assert locked
+            holding.set()
+            time.sleep(0.2)
+            shared.set("report", "from the other worker", 60)
+
+    worker = threading.Thread(target=other_worker)
+    worker.start()
+    holding.wait()
+    value = cache.get_or_set("report", lambda: "computed here", 60)
+    worker.join()
+    assert value == "from the other worker"
+    with cache._shared_lock("report", None) as locked:
+        assert locked
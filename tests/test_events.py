@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import RequestFactory
+from django.utils import timezone
+
+from core.bulk import BulkAction, apply_bulk_action
+from core.events import STALE, Event, InProcessBroker, get_broker
+from core.live import DASHBOARD_DELTA
+from core.models import Category, Transaction
+from core.views import DashboardEventsView
+
+
+def _collect(user, changes, count):
+    async def scenario():
+        async with get_broker().subscribe(user.pk) as subscription:
+            await sync_to_async(changes)()
+            return [await asyncio.wait_for(subscription.get(), 5) for _ in range(count)]
+
+    return async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_transaction_changes_publish_dashboard_deltas(
+    user, django_capture_on_commit_callbacks
+):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    today = timezone.localdate()
+
+    def changes():
+        with django_capture_on_commit_callbacks(execute=True):
+            txn = Transaction.objects.create(
+                user=user, type="EXPENSE", amount="12.50", date=today, category=food
+            )
+            txn.amount = "20.00"
+            txn.save()
+            Transaction.objects.create(
+                user=user, type="INCOME", amount="99.00", date=date(2001, 1, 1)
+            )
+            txn.delete()
+            apply_bulk_action(
+                user, Transaction.objects.for_user(user), BulkAction.DELETE
+            )
+
+    created, updated, old, deleted, bulk = _collect(user, changes, 5)
+
+    assert created.name == DASHBOARD_DELTA
+    assert created.data["totals"] == {"income": 0, "expense": 1250, "net": -1250}
+    assert created.data["categories"] == [
+        {"id": food.pk, "name": "Food", "kind": "EXPENSE", "delta": 1250}
+    ]
+    assert created.data["recent"]["amount"] == "12.50"
+    assert updated.data["totals"]["expense"] == 750
+    assert updated.data["categories"][0]["delta"] == 750
+    assert old.data["totals"] == {"income": 0, "expense": 0, "net": 0}
+    assert old.data["recent"]["category"] == ""
+    assert deleted.data["totals"]["net"] == 2000
+    assert deleted.data["removed"] == created.data["recent"]["id"]
+    assert bulk.name == STALE
+
+
+def test_event_stream_frames_and_slow_subscribers():
+    async def read():
+        stream = DashboardEventsView().stream(7)
+        first = await anext(stream)
+        get_broker().publish(7, DASHBOARD_DELTA, {"totals": {"net": 1}})
+        second = await anext(stream)
+        await stream.aclose()
+
+        broker = InProcessBroker()
+        broker.queue_size = 2
+        async with broker.subscribe(7) as subscription:
+            for value in range(3):
+                broker.publish(7, DASHBOARD_DELTA, {"value": value})
+            await sync_to_async(lambda: None)()  # Let the deliveries run.
+            overflow = await subscription.get()
+        return first, second, overflow
+
+    first, second, overflow = async_to_sync(read)()
+
+    assert first.startswith(b"retry: ")
+    assert second == b'event: dashboard.delta\ndata: {"totals":{"net":1}}\n\n'
+    assert overflow == Event(STALE, {})
+
+
+@pytest.mark.django_db
+def test_event_stream_is_not_served_over_wsgi(user):
+    request = RequestFactory().get("/dashboard/events/")
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    response = async_to_sync(DashboardEventsView.as_view())(request)
+    assert response.status_code == 204
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import io
+import json
 from decimal import Decimal
+from types import SimpleNamespace
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.urls import reverse
 
-from core.models import Category, Transaction
+from core.models import CategorizationRule, Category, Tag, Transaction
+from core.search import search_transactions
 from core.views.imports import CSVImportView
 
 
@@ -59,3 +65,70 @@ def test_build_transaction_kwargs_skips_invalid_amount(user):
     kwargs = view._build_transaction_kwargs(user, row_data, mapping)
 
     assert kwargs is None
+
+
+@pytest.mark.django_db
+def test_commit_rolls_back_categories_when_a_row_is_invalid(user):
+    headers = ["Date", "Details", "Amount", "Category"]
+    mapping = {header: header.lower() for header in headers}
+    mapping["Details"] = "description"
+    rows = [
+        ["2024-04-05", "Coffee Shop", "-3.50", "Cafe"],
+        ["2024-04-06", "Typo", "-99999999999999.00", "Oddities"],
+    ]
+
+    with pytest.raises(ValidationError):
+        CSVImportView()._commit_rows(SimpleNamespace(user=user), headers, mapping, rows)
+
+    assert not Category.objects.filter(user=user).exists()
+    assert not Transaction.objects.for_user(user).exists()
+
+
+def _import(client, content: str):
+    upload = io.BytesIO(content.encode())
+    upload.name = "statement.csv"
+    url = reverse("core:import")
+    client.post(url, {"file": upload})
+    mapping = {"Date": "date", "Details": "description", "Amount": "amount"}
+    return client.post(
+        url, {"action": "commit", "mapping": json.dumps(mapping)}, follow=True
+    )
+
+
+@pytest.mark.django_db
+def test_commit_skips_rows_already_imported(client, user, static_storage):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    lunch = Tag.objects.create(user=user, name="lunch")
+    rule = CategorizationRule.objects.create(user=user, pattern="pret", category=food)
+    rule.tags.add(lunch)
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+    statement = (
+        "Date,Details,Amount\n"
+        "2024-05-01,PRET A MANGER,-6.50\n"
+        "2024-05-01,PRET A MANGER,-6.50\n"
+        "2024-05-02,Salary,2000\n"
+    )
+
+    response = _import(client, statement)
+    assert "Imported 3 transactions" in response.content.decode()
+    rows = Transaction.objects.for_user(user)
+    assert rows.count() == 3
+    assert len({row.change_seq for row in rows}) == 1
+    pret = rows.filter(category=food)
+    assert pret.count() == 2
+    assert all(row.signed_amount_minor == -650 for row in pret)
+    assert Transaction.tags.through.objects.filter(tag=lunch).count() == 2
+    food.refresh_from_db()
+    lunch.refresh_from_db()
+    assert (food.transaction_count, food.expense_total) == (2, Decimal("13.00"))
+    assert lunch.transaction_count == 2
+    assert search_transactions(rows, "manger").count() == 2
+
+    response = _import(client, statement + "2024-05-03,Rent,-900\n")
+    assert (
+        "Imported 1 transactions (skipped 3 already imported)"
+        in response.content.decode()
+    )
+    assert Transaction.objects.for_user(user).count() == 4
+    food.refresh_from_db()
+    assert food.transaction_count == 2
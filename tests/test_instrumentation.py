@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core.analytics import add_months
+from core.instrumentation import QueryBudgetExceeded
+from core.models import Budget, Category, Tag, Transaction
+from core.views import BudgetListView
+
+PAGES = [
+    "core:dashboard",
+    "core:transactions",
+    "core:categories",
+    "core:tags",
+    "core:budgets",
+    "core:reports-monthly",
+    "core:reports-categories",
+    "core:reports-budgets",
+    "core:export",
+    "core:import",
+    "category-list",
+    "tag-list",
+    "transaction-list",
+    "budget-list",
+    "report-budget-matrix",
+    "sync",
+]
+
+
+@pytest.fixture
+def client(user, static_storage):
+    client = Client()
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+    client.user = user
+    return client
+
+
+def _add_data(user, first: int, count: int) -> None:
+    month = timezone.localdate().replace(day=1)
+    for index in range(first, first + count):
+        category = Category.objects.create(
+            user=user, name=f"Category {index}", kind=Category.Kind.EXPENSE
+        )
+        tag = Tag.objects.create(user=user, name=f"tag {index}")
+        Budget.objects.create(
+            user=user,
+            category=category,
+            amount="100.00",
+            start_month=add_months(month, -index),
+        )
+        txn = Transaction.objects.create(
+            user=user,
+            type=Transaction.Type.EXPENSE,
+            amount="12.00",
+            date=add_months(month, -index),
+            category=category,
+        )
+        txn.tags.add(tag)
+
+
+def _query_counts(client) -> dict[str, int]:
+    counts = {}
+    for name in PAGES:
+        response = client.get(reverse(name))
+        assert response.status_code == 200, name
+        counts[name] = int(response["Server-Timing"].split('desc="')[1].split()[0])
+    response = client.get(reverse("core:export"), {"download": "1"})
+    counts["download"] = int(response["Server-Timing"].split('desc="')[1].split()[0])
+    return counts
+
+
+@pytest.mark.django_db
+def test_pages_stay_within_query_budgets_as_data_grows(client):
+    _add_data(client.user, 0, 2)
+    small = _query_counts(client)
+    _add_data(client.user, 2, 6)
+    large = _query_counts(client)
+
+    # Enforcement already failed any request over its view's budget; the
+    # counts must also not grow with the number of rows.
+    assert small == large
+
+
+@pytest.mark.django_db
+def test_server_timing_log_and_budget_enforcement(client, caplog, monkeypatch):
+    _add_data(client.user, 0, 1)
+    with caplog.at_level(logging.INFO, logger="core.queries"):
+        response = client.get(reverse("core:budgets"))
+
+    assert response["Server-Timing"].startswith("db;dur=")
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["path"] == "/budgets/"
+    assert record["budget"] == BudgetListView.query_budget
+    assert 0 < record["queries"] <= record["budget"]
+    assert record["slowest"] and "sql" in record["slowest"][0]
+
+    monkeypatch.setattr(BudgetListView, "query_budget", 1)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(reverse("core:budgets"))
+
+
+@pytest.mark.django_db
+def test_query_budget_helper(client, query_budget):
+    with query_budget(1) as stats:
+        Transaction.objects.filter(date=date(2024, 1, 1)).count()
+    assert stats.count == 1
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            Category.objects.count()
+            Tag.objects.count()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from core.benchmarks import DatasetSpec
+from core.loadtest import ACTIONS, LoadTestError, prepare_users, run_load_test
+
+PASSWORD = "load-test-pass-123"
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("auth", ["session", "jwt"])
+def test_users_replay_the_mix(live_server, static_storage, auth):
+    spec = DatasetSpec(transactions=60, categories=6, tags=3, months=3)
+    assert prepare_users(1, PASSWORD, spec) == 1
+    # Running it again only resets the password.
+    assert prepare_users(1, PASSWORD, spec) == 0
+
+    # One user: the live server shares a single in-memory SQLite connection
+    # between its threads, so concurrent users would trip over each other.
+    # The budget matrix's SQLite date functions can stall on that shared
+    # connection too; it is covered by the API tests instead.
+    actions = [action for action in ACTIONS if action.name != "api-budget-matrix"]
+    report = run_load_test(
+        live_server.url,
+        1,
+        PASSWORD,
+        auth=auth,
+        duration=60,
+        iterations=40,
+        seed=3,
+        actions=actions,
+    )
+
+    assert json.loads(json.dumps(report)) == report
+    assert report["environment"]["active_users"] == 1
+    assert report["errors"] == {}
+    total = report["total"]
+    assert total["requests"] == 40
+    assert total["throughput_rps"] > 0
+    assert 0 < total["p50_ms"] <= total["p95_ms"] <= total["max_ms"]
+    names = {result["name"] for result in report["results"]}
+    allowed = {action.name for action in actions if auth in action.auth}
+    assert "api-transactions" in names and names <= allowed
+
+
+def test_reports_users_that_never_got_going():
+    # Nothing listens on port 9 (discard) locally.
+    with pytest.raises(LoadTestError, match="login: .*refused"):
+        run_load_test("http://127.0.0.1:9", 2, PASSWORD, duration=1, timeout=2)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.merge import MergeError, MergeResult, merge_categories, merge_tags
+from core.models import Budget, Category, Tag, Tombstone, Transaction
+from core.usage import rebuild_usage_stats
+
+FIELDS = ("transaction_count", "income_total", "expense_total", "last_used")
+
+
+def _expense(user, amount, day, **kwargs):
+    return Transaction.objects.create(
+        user=user, type="EXPENSE", amount=amount, date=date(2024, 3, day), **kwargs
+    )
+
+
+def _stats(model, pk):
+    return model.objects.values_list(*FIELDS).get(pk=pk)
+
+
+@pytest.mark.django_db
+def test_merge_categories_moves_rows_and_combines_budgets(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    meals = Category.objects.create(user=user, name="Meals", kind=Category.Kind.EXPENSE)
+    rows = [_expense(user, "4.00", day, category=meals) for day in (1, 2, 3)]
+    _expense(user, "10.00", 4, category=food)
+    Budget.objects.create(
+        user=user, category=food, amount="100.00", start_month=date(2024, 3, 1)
+    )
+    clash = Budget.objects.create(
+        user=user, category=meals, amount="50.00", start_month=date(2024, 3, 1)
+    )
+    moved = Budget.objects.create(
+        user=user, category=meals, amount="20.00", start_month=date(2024, 4, 1)
+    )
+    clash_id, meals_id = clash.pk, meals.pk
+
+    result = merge_categories(meals, food)
+
+    assert result == MergeResult(transactions=3, budgets_moved=1, budgets_combined=1)
+    assert not Category.objects.filter(pk=meals_id).exists()
+    assert set(Transaction.objects.values_list("category_id", flat=True)) == {food.pk}
+    assert dict(
+        Budget.objects.filter(category=food).values_list("start_month", "amount")
+    ) == {date(2024, 3, 1): Decimal("150.00"), date(2024, 4, 1): Decimal("20.00")}
+    assert Budget.objects.filter(pk=moved.pk, category=food).exists()
+    assert set(Tombstone.objects.values_list("model", "object_id")) == {
+        ("budget", clash_id),
+        ("category", meals_id),
+    }
+    rows[0].refresh_from_db()
+    assert rows[0].change_seq > moved.change_seq
+
+    maintained = _stats(Category, food.pk)
+    rebuild_usage_stats(user)
+    assert maintained == _stats(Category, food.pk)
+    assert maintained == (4, Decimal("0"), Decimal("22.00"), date(2024, 3, 4))
+
+
+@pytest.mark.django_db
+def test_merge_tags_keeps_one_link_per_transaction(user):
+    trip, travel = (Tag.objects.create(user=user, name=n) for n in ("trip", "travel"))
+    both = _expense(user, "5.00", 1)
+    only_trip = _expense(user, "7.00", 9)
+    both.tags.set([trip, travel])
+    only_trip.tags.set([trip])
+    trip_id = trip.pk
+
+    result = merge_tags(trip, travel)
+
+    assert result.transactions == 2
+    assert not Tag.objects.filter(pk=trip_id).exists()
+    assert sorted(
+        Transaction.tags.through.objects.values_list("transaction_id", "tag_id")
+    ) == [(both.pk, travel.pk), (only_trip.pk, travel.pk)]
+    maintained = _stats(Tag, travel.pk)
+    rebuild_usage_stats(user)
+    assert maintained == _stats(Tag, travel.pk)
+    assert maintained[0] == 2
+
+
+@pytest.mark.django_db
+def test_merge_rejects_mismatched_items(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    pay = Category.objects.create(user=user, name="Pay", kind=Category.Kind.INCOME)
+
+    with pytest.raises(MergeError):
+        merge_categories(food, pay)
+    with pytest.raises(MergeError):
+        merge_categories(food, food)
+
+
+@pytest.mark.django_db
+def test_merge_api(user):
+    other = get_user_model().objects.create_user(
+        username="merge2", email="merge2@example.com", password="SuperSecret123"
+    )
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    meals = Category.objects.create(user=user, name="Meals", kind=Category.Kind.EXPENSE)
+    theirs = Category.objects.create(
+        user=other, name="Food", kind=Category.Kind.EXPENSE
+    )
+    _expense(user, "4.00", 1, category=meals)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.post(
+        f"/api/categories/{meals.pk}/merge/", {"target": theirs.pk}, format="json"
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        f"/api/categories/{meals.pk}/merge/", {"target": food.pk}, format="json"
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "transactions": 1,
+        "budgets_moved": 0,
+        "budgets_combined": 0,
+    }
+
+
+@pytest.mark.django_db
+def test_merge_page_offers_active_categories_of_the_same_kind(
+    client, user, static_storage
+):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    meals = Category.objects.create(user=user, name="Meals", kind=Category.Kind.EXPENSE)
+    Category.objects.create(user=user, name="Salary", kind=Category.Kind.INCOME)
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+
+    response = client.get(reverse("core:category-merge", args=[meals.pk]))
+
+    assert response.status_code == 200
+    choices = [value for value, _ in response.context["form"].fields["target"].choices]
+    assert choices[1:] == [food.pk]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+import threading
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core import metrics
+from core.models import Category, Transaction
+
+
+@pytest.fixture
+def client(user, static_storage):
+    for metric in metrics.REGISTRY:
+        metric.clear()
+    client = Client()
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+    client.user = user
+    return client
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    for line in text.splitlines():
+        match = re.fullmatch(rf"{name}(?:\{{(.*)\}})? (\S+)", line)
+        if match is None:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(1) or ""))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(2))
+    raise AssertionError(f"No {name} sample with {labels}")
+
+
+@pytest.mark.django_db
+def test_metrics_cover_views_actions_queries_caches_and_exports(client):
+    food = Category.objects.create(user=client.user, name="Food", kind="EXPENSE")
+    for _ in range(3):
+        Transaction.objects.create(
+            user=client.user,
+            type="EXPENSE",
+            amount="4.00",
+            date=timezone.localdate(),
+            category=food,
+        )
+    client.get(reverse("core:dashboard"))
+    client.get(reverse("core:transactions"))
+    client.get(reverse("core:transactions"))
+    client.get(reverse("transaction-list"))
+    client.get(reverse("core:export"), {"download": "1"})
+
+    text = Client().get("/metrics").content.decode()
+
+    assert "# TYPE finance_request_duration_seconds histogram" in text
+    assert (
+        _sample(
+            text,
+            "finance_request_duration_seconds_count",
+            view="core:dashboard",
+            method="GET",
+        )
+        == 1
+    )
+    assert (
+        _sample(
+            text,
+            "finance_request_duration_seconds_bucket",
+            view="transaction-list",
+            action="list",
+            le="+Inf",
+        )
+        == 1
+    )
+    assert (
+        _sample(text, "finance_db_queries_per_request_sum", view="core:dashboard") > 0
+    )
+    assert (
+        _sample(text, "finance_cache_requests_total", cache="row_count", result="hit")
+        >= 1
+    )
+    assert 0 < _sample(text, "finance_cache_hit_ratio", cache="row_count") < 1
+    assert _sample(text, "finance_export_rows_total") == 3
+
+
+def test_counters_sum_across_threads():
+    counter = metrics.Counter("test_events_total", "Events.", ("kind",))
+    histogram = metrics.Histogram("test_seconds", "Seconds.", buckets=(1, 2))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(kind="a")
+            histogram.observe(1.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.totals() == {("a",): 4000}
+    samples = {
+        (name, labels.get("le")): value for name, labels, value in histogram.samples()
+    }
+    assert samples[("test_seconds_bucket", "1")] == 0
+    assert samples[("test_seconds_bucket", "2")] == 4000
+    assert samples[("test_seconds_count", None)] == 4000
+
+
+def test_exited_threads_are_folded_into_the_totals():
+    counter = metrics.Counter("test_requests_total", "Requests.")
+    histogram = metrics.Histogram("test_latency", "Latency.", buckets=(1,))
+
+    # One short-lived thread per request, as under ASGI or runserver.
+    for _ in range(200):
+        thread = threading.Thread(target=lambda: (counter.inc(), histogram.observe(2)))
+        thread.start()
+        thread.join()
+
+    assert counter.totals() == {(): 200}
+    samples = {name: value for name, _, value in histogram.samples()}
+    assert samples["test_latency_count"] == 200
+    assert counter._shards._shards == []
+    assert histogram._shards._shards == []
+
+
+@pytest.mark.django_db
+def test_metrics_token(client, settings):
+    settings.METRICS_TOKEN = "scrape-me"
+    assert Client().get("/metrics").status_code == 401
+    response = Client().get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-me")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+
+
+def test_metrics_must_implement_samples():
+    class Incomplete(metrics.Metric):
+        type = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Has no samples.")
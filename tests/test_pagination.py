@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Transaction
+from core.pagination import (
+    CachedCountPaginator,
+    Cursor,
+    InvalidCursor,
+    paginate_keyset,
+)
+
+
+@pytest.fixture
+def transactions(user):
+    start = date(2024, 1, 1)
+    rows = [
+        Transaction(
+            user=user,
+            type=Transaction.Type.EXPENSE,
+            amount="1.00",
+            date=start + timedelta(days=index // 3),
+            notes=f"row {index}",
+        )
+        for index in range(20)
+    ]
+    Transaction.objects.bulk_create(rows)
+    return list(
+        Transaction.objects.for_user(user).order_by("-date", "-created_at", "id")
+    )
+
+
+@pytest.mark.django_db
+def test_keyset_pages_walk_forward_and_back(user, transactions):
+    queryset = Transaction.objects.for_user(user)
+    seen = []
+    cursor = ""
+    pages = []
+    while cursor is not None:
+        page = paginate_keyset(queryset, cursor, 6)
+        pages.append(page)
+        seen.extend(page.object_list)
+        cursor = page.next_cursor
+
+    assert [txn.id for txn in seen] == [txn.id for txn in transactions]
+    assert [len(page) for page in pages] == [6, 6, 6, 2]
+    assert not pages[0].has_previous()
+
+    back = paginate_keyset(queryset, pages[2].previous_cursor, 6)
+    assert [txn.id for txn in back] == [txn.id for txn in pages[1]]
+    assert back.has_previous() and back.has_next()
+
+
+def test_cursor_rejects_garbage():
+    with pytest.raises(InvalidCursor):
+        Cursor.decode("not-a-cursor")
+
+
+@pytest.mark.django_db
+def test_api_cursor_mode_omits_count(user, transactions):
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    first = client.get("/api/transactions/", {"cursor": "", "page_size": 10})
+    assert first.status_code == 200
+    assert "count" not in first.data
+    assert first.data["previous"] is None
+    assert len(first.data["results"]) == 10
+
+    second = client.get(first.data["next"])
+    ids = [row["id"] for row in first.data["results"] + second.data["results"]]
+    assert ids == [txn.id for txn in transactions]
+    assert second.data["next"] is None
+
+    assert client.get("/api/transactions/", {"cursor": "bogus"}).status_code == 404
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    from django.core.cache import cache
+
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_cached_count_reused_until_data_changes(user, transactions, locmem_cache):
+    queryset = Transaction.objects.for_user(user).order_by("-date")
+
+    assert CachedCountPaginator(queryset, 5, user_id=user.pk).count == 20
+    with CaptureQueriesContext(connection) as queries:
+        assert CachedCountPaginator(queryset, 5, user_id=user.pk).count == 20
+    assert not any("COUNT" in query["sql"] for query in queries)
+
+    Transaction.objects.create(
+        user=user, type=Transaction.Type.INCOME, amount="5.00", date=date(2024, 2, 1)
+    )
+    assert CachedCountPaginator(queryset, 5, user_id=user.pk).count == 21
+
+
+@pytest.mark.django_db
+def test_count_is_capped_past_threshold(user, transactions, settings, locmem_cache):
+    settings.PAGINATION_COUNT_THRESHOLD = 8
+    paginator = CachedCountPaginator(
+        Transaction.objects.for_user(user).order_by("-date"), 5, user_id=user.pk
+    )
+
+    assert paginator.count == 8
+    assert paginator.count_is_estimate
+    assert paginator.count_display == "8+"
+    deep = paginator.page(4)
+    assert len(deep) == 5
+    assert not deep.has_next()
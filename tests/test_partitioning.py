@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from core.models import Tag, Transaction
+from core.partitioning import (
+    TABLE,
+    TAGS_TABLE,
+    existing_partitions,
+    is_partitioned,
+    month_partitions,
+)
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Partitioning needs PostgreSQL."
+)
+
+
+def test_month_partitions_cover_whole_months():
+    partitions = month_partitions(date(2023, 11, 15), date(2024, 2, 1))
+
+    assert [(p.name, p.start, p.end) for p in partitions] == [
+        ("core_transaction_p2023_11", date(2023, 11, 1), date(2023, 12, 1)),
+        ("core_transaction_p2023_12", date(2023, 12, 1), date(2024, 1, 1)),
+        ("core_transaction_p2024_01", date(2024, 1, 1), date(2024, 2, 1)),
+        ("core_transaction_p2024_02", date(2024, 2, 1), date(2024, 3, 1)),
+    ]
+
+
+@pytest.mark.django_db
+def test_command_refuses_non_postgres_databases():
+    if connection.vendor == "postgresql":
+        pytest.skip("Only meaningful on other backends.")
+
+    with pytest.raises(CommandError, match="only available on PostgreSQL"):
+        call_command("partition_transactions", "--convert", stdout=None)
+    assert not is_partitioned(connection)
+
+
+@pytest.fixture
+def tagged(django_user_model):
+    user = django_user_model.objects.create_user(username="part", email="p@x.test")
+    tag = Tag.objects.create(user=user, name="trip")
+    rows = [
+        Transaction.objects.create(
+            user=user, type=Transaction.Type.EXPENSE, amount="5.00", date=day
+        )
+        for day in (date(2024, 1, 10), date(2024, 2, 10))
+    ]
+    rows[0].tags.add(tag)
+    return user, tag, rows
+
+
+def _tags_foreign_keys():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE contype = 'f' "
+            "AND conrelid = to_regclass(%s) AND confrelid = to_regclass(%s)",
+            [TAGS_TABLE, TABLE],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_convert_names_what_it_drops_and_keeps_data(tagged):
+    user, tag, rows = tagged
+    (tags_fk,) = _tags_foreign_keys()
+    out = StringIO()
+
+    call_command("partition_transactions", "--convert", stdout=out)
+
+    output = out.getvalue()
+    assert "Copied 2 transactions" in output
+    assert f"Dropped foreign key {tags_fk} on {TAGS_TABLE}" in output
+    assert "Recreated index" in output and "Recreated foreign key" in output
+    assert is_partitioned(connection)
+    assert {"core_transaction_p2024_01", "core_transaction_p2024_02"} <= (
+        existing_partitions(connection)
+    )
+    assert _tags_foreign_keys() == []
+    assert list(Transaction.objects.filter(tags=tag)) == [rows[0]]
+    later = Transaction.objects.create(
+        user=user, type=Transaction.Type.INCOME, amount="9.00", date=date(2024, 2, 1)
+    )
+    assert later.pk > rows[-1].pk
+
+
+@postgres_only
+@pytest.mark.django_db
+def test_convert_refuses_when_other_objects_depend_on_the_table(tagged):
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE VIEW transaction_dates AS SELECT date FROM {TABLE}")
+
+    with pytest.raises(CommandError, match="view transaction_dates"):
+        call_command("partition_transactions", "--convert", stdout=StringIO())
+    assert not is_partitioned(connection)
+    assert _tags_foreign_keys()
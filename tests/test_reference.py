@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.forms import TransactionForm
+from core.models import Category, Tag, Transaction
+
+
+@pytest.fixture
+def reference(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    pay = Category.objects.create(user=user, name="Pay", kind=Category.Kind.INCOME)
+    tags = [Tag.objects.create(user=user, name=name) for name in ("a", "b", "c")]
+    return food, pay, tags
+
+
+def _reference_queries(queries, table):
+    return [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith("SELECT")
+        and f'FROM "{table}"' in query["sql"]
+        and "core_transaction_tags" not in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_list_page_loads_categories_and_tags_once(
+    client, static_storage, user, reference
+):
+    food, _, tags = reference
+    txn = Transaction.objects.create(
+        user=user, type="EXPENSE", amount="2.00", date=date(2024, 1, 2), category=food
+    )
+    txn.tags.set(tags)
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("core:transactions"), {"category": food.pk})
+
+    assert response.status_code == 200
+    assert len(_reference_queries(queries, "core_category")) == 1
+    assert len(_reference_queries(queries, "core_tag")) == 1
+
+
+@pytest.mark.django_db
+def test_api_resolves_ids_from_reference_data(user, reference):
+    food, _, tags = reference
+    client = APIClient()
+    client.force_authenticate(user=user)
+    payload = {
+        "type": "EXPENSE",
+        "amount": "9.99",
+        "date": "2024-02-01",
+        "category": food.pk,
+        "tags": [tag.pk for tag in tags],
+    }
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post("/api/transactions/", payload, format="json")
+
+    assert response.status_code == 201
+    assert len(_reference_queries(queries, "core_category")) == 1
+    assert len(_reference_queries(queries, "core_tag")) == 1
+
+
+@pytest.mark.django_db
+def test_other_users_references_are_rejected(user, reference):
+    other = get_user_model().objects.create_user(
+        username="ref2", email="ref2@example.com", password="SuperSecret123"
+    )
+    theirs = Category.objects.create(
+        user=other, name="Theirs", kind=Category.Kind.EXPENSE
+    )
+    form = TransactionForm(
+        {
+            "type": "EXPENSE",
+            "amount": "1.00",
+            "currency": "GBP",
+            "date": "2024-01-01",
+            "category": theirs.pk,
+        },
+        user=user,
+    )
+
+    assert not form.is_valid()
+    assert "category" in form.errors
+    assert [label for _, label in form.fields["category"].choices][1:] == [
+        "Food (Expense)",
+        "Pay (Income)",
+    ]
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.analytics import build_budget_matrix
+from core.bulk import BulkAction, apply_bulk_action, select_transactions
+from core.models import Budget, Category, Transaction
+from core.views.reports import MonthlyReportView
+
+
+@pytest.fixture
+def groceries(user):
+    return Category.objects.create(
+        user=user, name="Groceries", kind=Category.Kind.EXPENSE
+    )
+
+
+@pytest.fixture
+def rent(user):
+    return Category.objects.create(user=user, name="Rent", kind=Category.Kind.EXPENSE)
+
+
+def _expense(user, category, amount, when):
+    return Transaction.objects.create(
+        user=user,
+        type=Transaction.Type.EXPENSE,
+        amount=amount,
+        date=when,
+        category=category,
+    )
+
+
+@pytest.mark.django_db
+def test_budget_matrix_pivots_budgets_and_spend(user, groceries, rent):
+    Budget.objects.create(
+        user=user, category=groceries, amount="200.00", start_month=date(2024, 1, 1)
+    )
+    Budget.objects.create(
+        user=user, category=groceries, amount="250.00", start_month=date(2024, 3, 1)
+    )
+    _expense(user, groceries, "120.00", date(2024, 1, 5))
+    _expense(user, groceries, "30.50", date(2024, 1, 20))
+    _expense(user, rent, "900.00", date(2024, 2, 1))
+    _expense(user, rent, "900.00", date(2024, 4, 1))
+
+    with CaptureQueriesContext(connection) as queries:
+        matrix = build_budget_matrix(user, date(2024, 1, 1), date(2024, 3, 1))
+
+    assert len(queries) == 2
+    assert matrix.months == [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)]
+    assert [name for _, name in matrix.categories] == ["Groceries", "Rent"]
+    groceries_row, rent_row = matrix.rows()
+    assert groceries_row["budgeted"] == [
+        Decimal("200.00"),
+        Decimal("0"),
+        Decimal("250.00"),
+    ]
+    assert groceries_row["spent"] == [Decimal("150.50"), Decimal("0"), Decimal("0")]
+    assert groceries_row["variance"][0] == Decimal("49.50")
+    assert rent_row["spent"] == [Decimal("0"), Decimal("900.00"), Decimal("0")]
+    assert matrix.totals()["variance"] == [
+        Decimal("49.50"),
+        Decimal("-900.00"),
+        Decimal("250.00"),
+    ]
+
+
+@pytest.mark.django_db
+def test_budget_matrix_api_returns_string_amounts(user, groceries):
+    Budget.objects.create(
+        user=user, category=groceries, amount="80.00", start_month=date(2024, 5, 1)
+    )
+    _expense(user, groceries, "95.25", date(2024, 5, 9))
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get(
+        "/api/reports/budget-matrix/", {"start": "2024-05", "end": "2024-06"}
+    )
+
+    assert response.status_code == 200
+    assert response.data["months"] == ["2024-05", "2024-06"]
+    assert response.data["categories"][0]["variance"] == ["-15.25", "0.00"]
+    assert response.data["totals"]["budgeted"] == ["80.00", "0.00"]
+
+
+@pytest.mark.django_db
+def test_budget_matrix_api_rejects_inverted_range(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.get(
+        "/api/reports/budget-matrix/", {"start": "2024-06", "end": "2024-01"}
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_minor_amount_columns_follow_amount_and_type(user, groceries):
+    txn = _expense(user, groceries, "12.34", date(2024, 1, 5))
+    assert (txn.amount_minor, txn.signed_amount_minor) == (1234, -1234)
+
+    txn.amount = "0.50"
+    txn.save(update_fields=["amount"])
+    txn.refresh_from_db()
+    assert (txn.amount_minor, txn.signed_amount_minor) == (50, -50)
+
+    apply_bulk_action(
+        user,
+        select_transactions(user, ids=[txn.pk]),
+        BulkAction.SET_TYPE,
+        txn_type=Transaction.Type.INCOME,
+    )
+    Transaction.objects.bulk_create(
+        [
+            Transaction(
+                user=user, type="INCOME", amount=Decimal("7.05"), date=date.today()
+            )
+        ]
+    )
+
+    assert sorted(
+        Transaction.objects.values_list("amount_minor", "signed_amount_minor")
+    ) == [(50, 50), (705, 705)]
+
+
+@pytest.mark.django_db
+def test_monthly_report_sums_minor_units(rf, user, groceries):
+    today = timezone.localdate()
+    _expense(user, groceries, "10.10", today)
+    _expense(user, groceries, "0.20", today)
+    Transaction.objects.create(
+        user=user, type=Transaction.Type.INCOME, amount="100.00", date=today
+    )
+    request = rf.get("/reports/monthly/")
+    request.user = user
+    view = MonthlyReportView()
+    view.setup(request)
+
+    context = view.get_context_data()
+
+    current = context["monthly_rows"][-1]
+    assert (current["income"], current["expense"], current["net"]) == (
+        Decimal("100.00"),
+        Decimal("10.30"),
+        Decimal("89.70"),
+    )
+    assert json.loads(context["chart_data_json"])["net"][-1] == 89.7
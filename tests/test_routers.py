@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import Transaction
+from core import routers
+from core.routers import REPLICA_ALIAS, ReplicaRouter
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    # Routing decisions only; no query is sent to the replica alias.
+    monkeypatch.setattr(routers, "replica_configured", lambda: True)
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def replica_db(settings, monkeypatch, tmp_path):
+    """A real ``replica`` alias: a second SQLite file, copied from the
+    primary when ``replicate()`` is called."""
+    path = tmp_path / "replica.sqlite3"
+    replica_settings = {"ENGINE": "django.db.backends.sqlite3", "NAME": str(path)}
+    settings.DATABASES = {**settings.DATABASES, REPLICA_ALIAS: replica_settings}
+    monkeypatch.setattr(
+        connections, "settings", connections.configure_settings(settings.DATABASES)
+    )
+    cache.clear()
+
+    def replicate():
+        primary = connections["default"]
+        primary.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        return path
+
+    yield replicate
+    connections[REPLICA_ALIAS].close()
+    del connections[REPLICA_ALIAS]
+    cache.clear()
+
+
+def _route(method, user, inside_atomic=False):
+    """Run a request through the middleware and report where a read would go."""
+    seen = []
+
+    def view(request):
+        request.user = user
+        if inside_atomic:
+            with transaction.atomic():
+                seen.append(ReplicaRouter().db_for_read(Transaction))
+        else:
+            seen.append(ReplicaRouter().db_for_read(Transaction))
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method)("/")
+    ReplicaRoutingMiddleware(view)(request)
+    return seen[0]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_use_replica_until_the_user_writes(replica, user):
+    assert _route("get", user) == REPLICA_ALIAS
+    assert _route("post", user) is None
+    assert _route("get", user) is None
+
+    cache.clear()
+    assert _route("get", user) == REPLICA_ALIAS
+    assert _route("get", user, inside_atomic=True) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_are_served_by_a_second_database(replica_db, user):
+    txn = Transaction.objects.create(
+        user=user, type=Transaction.Type.EXPENSE, amount="5.00", date=date(2024, 1, 2)
+    )
+    # Give the replica's copy different notes to show where reads went.
+    replica = sqlite3.connect(replica_db())
+    try:
+        with replica:
+            replica.execute(
+                f'UPDATE "{Transaction._meta.db_table}" SET notes = ? WHERE id = ?',
+                ["replicated", txn.pk],
+            )
+    finally:
+        replica.close()
+
+    def read(method):
+        notes = []
+
+        def view(request):
+            request.user = user
+            notes.append(Transaction.objects.get(pk=txn.pk).notes)
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(getattr(RequestFactory(), method)("/"))
+        return notes[0]
+
+    assert read("get") == "replicated"
+    assert read("post") == ""
+    assert read("get") == ""
+
+
+@pytest.mark.django_db
+def test_primary_is_used_without_a_replica(user):
+    assert _route("get", user) is None
+    assert ReplicaRouter().db_for_read(Transaction) is None
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from core.models import CategorizationRule, Category, Tag, Transaction
+from core.reference import UserReferenceData
+from core.rules import CompiledRule, KeywordAutomaton, RuleMatcher
+
+KEYWORD = CategorizationRule.MatchType.KEYWORD
+REGEX = CategorizationRule.MatchType.REGEX
+
+
+def _rule(rule_id, match_type, pattern, category=None, **kwargs):
+    return CompiledRule(
+        rule_id=rule_id,
+        match_type=match_type,
+        pattern=pattern,
+        min_amount=kwargs.get("min_amount"),
+        max_amount=kwargs.get("max_amount"),
+        category=category,
+        tags=(),
+    )
+
+
+def test_keyword_automaton_reports_overlapping_keywords():
+    automaton = KeywordAutomaton(
+        [("he", 1), ("she", 2), ("his", 3), ("hers", 4), ("xyz", 5)]
+    )
+
+    assert automaton.find("ushers") == {1, 2, 4}
+    assert automaton.find("this") == {3}
+    assert automaton.find("") == set()
+
+
+def test_matcher_picks_highest_priority_rule_that_fits():
+    food = Category(pk=1, name="Food", kind=Category.Kind.EXPENSE)
+    pay = Category(pk=2, name="Pay", kind=Category.Kind.INCOME)
+    big = Category(pk=3, name="Big shop", kind=Category.Kind.EXPENSE)
+    matcher = RuleMatcher(
+        [
+            _rule(1, REGEX, r"tesco\s+(extra|metro)", big, min_amount=Decimal("100")),
+            _rule(2, KEYWORD, "Salary", pay),
+            _rule(3, REGEX, r"tesco", food),
+            _rule(4, KEYWORD, "tes", big),
+        ]
+    )
+
+    assert matcher.match("TESCO Extra 123", Decimal("150"), "EXPENSE").rule_id == 1
+    # The first rule matches at the same position but is out of range, so the
+    # combined pattern alone would not report rule 3.
+    assert matcher.match("tesco extra", Decimal("20"), "EXPENSE").rule_id == 3
+    assert matcher.match("ACME salary", Decimal("2000"), "INCOME").rule_id == 2
+    assert matcher.match("ACME salary", Decimal("20"), "EXPENSE") is None
+    assert matcher.match("testing", Decimal("5"), "EXPENSE").rule_id == 4
+    assert matcher.match("", Decimal("5"), "EXPENSE") is None
+
+
+@pytest.mark.django_db
+def test_regex_rules_reject_unsupported_patterns(user):
+    for pattern in ["(", r"(a)\1", "(?P<x>a)", "(?i)a"]:
+        rule = CategorizationRule(user=user, match_type=REGEX, pattern=pattern)
+        with pytest.raises(ValidationError):
+            rule.clean()
+    CategorizationRule(user=user, match_type=REGEX, pattern=r"(a|b)+c").clean()
+
+
+@pytest.mark.django_db
+def test_api_list_create_applies_rules(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    lunch = Tag.objects.create(user=user, name="lunch")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.post(
+        "/api/rules/",
+        {"pattern": "pret", "category": food.pk, "tags": [lunch.pk]},
+        format="json",
+    )
+    assert response.status_code == 201
+    response = client.post("/api/rules/", {"pattern": "x"}, format="json")
+    assert response.status_code == 400
+
+    rows = [
+        {"type": "EXPENSE", "amount": "6.50", "date": "2024-05-01", "notes": n}
+        for n in ("PRET A MANGER 123", "Rent")
+    ]
+    response = client.post("/api/transactions/", rows, format="json")
+
+    assert response.status_code == 201
+    assert [(row["category"], row["tags"]) for row in response.json()] == [
+        (food.pk, [lunch.pk]),
+        (None, []),
+    ]
+    food.refresh_from_db()
+    assert food.transaction_count == 1
+
+
+@pytest.mark.django_db
+def test_apply_rules_command_categorizes_history(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    rows = [
+        Transaction.objects.create(
+            user=user, type="EXPENSE", amount="3.00", date=date(2024, 1, 1), notes=n
+        )
+        for n in ("Greggs 1", "Greggs 2", "Rent", "greggs 3")
+    ]
+    rule = CategorizationRule.objects.create(user=user, pattern="greggs", category=food)
+    assert UserReferenceData(user.pk).rule_matcher.rules[0].rule_id == rule.pk
+
+    call_command("apply_rules", user=user.username, batch_size=2, stdout=None)
+
+    assert [Transaction.objects.get(pk=row.pk).category_id for row in rows] == [
+        food.pk,
+        food.pk,
+        None,
+        food.pk,
+    ]
+    food.refresh_from_db()
+    assert food.transaction_count == 3
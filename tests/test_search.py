@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+from rest_framework.test import APIClient
+
+from core.forms import TransactionFilterForm
+from core.models import Transaction
+from core.search import SearchBackend, SQLiteFTSSearchBackend, search_transactions
+
+
+def _txn(user, notes):
+    return Transaction.objects.create(
+        user=user,
+        type=Transaction.Type.EXPENSE,
+        amount="4.20",
+        date=date(2024, 3, 1),
+        notes=notes,
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_follows_inserts_updates_and_deletes(user):
+    coffee = _txn(user, "Morning coffee at the station")
+    _txn(user, "Weekly groceries")
+    queryset = Transaction.objects.for_user(user)
+
+    assert list(search_transactions(queryset, "coff")) == [coffee]
+
+    coffee.notes = "Morning tea"
+    coffee.save()
+    assert not search_transactions(queryset, "coffee").exists()
+    assert list(search_transactions(queryset, "tea")) == [coffee]
+
+    coffee.delete()
+    assert not search_transactions(queryset, "tea").exists()
+
+
+def test_fts_query_quotes_tokens():
+    backend = SQLiteFTSSearchBackend()
+
+    assert backend.build_query('café "OR" 50%') == '"café"* "OR"* "50"*'
+
+
+@pytest.mark.django_db
+def test_filter_form_and_api_share_search(user):
+    lunch = _txn(user, "Lunch with team, lunch again")
+    _txn(user, "Team dinner lunch")
+    _txn(user, "Fuel")
+
+    form = TransactionFilterForm({"q": "lunch"}, user=user)
+    assert form.is_valid()
+    assert form.filter_queryset(Transaction.objects.for_user(user)).count() == 2
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.get(
+        "/api/transactions/", {"search": "lunch", "ordering": "-search_rank"}
+    )
+    assert response.status_code == 200
+    assert response.data["count"] == 2
+    assert response.data["results"][0]["id"] == lunch.id
+
+
+def test_backends_must_implement_search():
+    class Incomplete(SearchBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from core.models import Category
+from core.slow_queries import (
+    REDACTED,
+    analyzable,
+    explain,
+    fingerprint,
+    install_all,
+    slow_query_log,
+)
+
+
+@pytest.fixture
+def slow_log(settings, static_storage):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    install_all()
+    log = slow_query_log()
+    log.clear()
+    yield log
+    log.clear()
+
+
+def _client(username, **extra):
+    user = get_user_model().objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="SuperSecret123",
+        **extra,
+    )
+    client = Client()
+    client.force_login(user, backend="django.contrib.auth.backends.ModelBackend")
+    client.user = user
+    return client
+
+
+def test_fingerprint_groups_queries_by_shape():
+    assert fingerprint(
+        "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'Food'  LIMIT 21"
+    ) == fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'Rent' LIMIT 5")
+
+
+def test_only_read_only_selects_are_analyzed():
+    assert analyzable('SELECT "id" FROM "core_category" WHERE "user_id" = %s')
+    assert not analyzable("SELECT nextval(pg_get_serial_sequence(%s, 'id'))")
+    assert not analyzable("SELECT pg_notify(%s, %s)")
+    assert not analyzable('SELECT * FROM "core_changesequence" FOR UPDATE')
+    assert not analyzable('UPDATE "core_category" SET "name" = %s')
+
+
+@pytest.mark.django_db
+def test_parameters_are_opt_in_and_never_kept_for_sessions(slow_log, settings):
+    client = _client("session-owner")
+    client.get(reverse("core:categories"))
+    entries = [e for e in slow_log.entries() if e.view == "core:categories"]
+    assert entries and all(entry.params is None for entry in entries)
+
+    settings.SLOW_QUERY_CAPTURE_PARAMS = True
+    slow_log.clear()
+    client.get(reverse("core:categories"))
+    session = next(e for e in slow_log.entries() if '"django_session"' in e.sql)
+    assert set(session.params) == {REDACTED}
+    assert session.plan == ""
+    assert client.session.session_key not in repr(slow_log.entries())
+
+
+@pytest.mark.django_db
+def test_failed_explain_leaves_the_transaction_usable():
+    with transaction.atomic():
+        Category.objects.create(
+            user=_client("explainer").user, name="Food", kind="EXPENSE"
+        )
+        plan = explain(connection, "SELECT * FROM no_such_table", ())
+        assert plan.startswith("EXPLAIN failed")
+        assert Category.objects.filter(name="Food").count() == 1
+        assert explain(connection, 'SELECT * FROM "core_category"', ())
+
+
+@pytest.mark.django_db
+def test_slow_queries_are_explained_and_grouped_by_view(slow_log, settings):
+    settings.SLOW_QUERY_CAPTURE_PARAMS = True
+    client = _client("owner")
+    Category.objects.create(user=client.user, name="Food", kind="EXPENSE")
+    slow_log.clear()
+
+    client.get(reverse("core:categories"))
+    client.get(reverse("core:categories"))
+
+    entries = [e for e in slow_log.entries() if e.view == "core:categories"]
+    category_query = next(e for e in entries if '"core_category"' in e.sql)
+    assert category_query.params == (repr(client.user.pk),)
+    assert category_query.plan  # SQLite's EXPLAIN QUERY PLAN output.
+    group = next(g for g in slow_log.groups() if g.key == category_query.key)
+    assert group.view == "core:categories"
+    assert group.count == 2
+
+
+@pytest.mark.django_db
+def test_slow_query_page_is_staff_only(slow_log):
+    client = _client("member")
+    client.get(reverse("core:categories"))
+
+    response = client.get(reverse("slow-queries"))
+    assert response.status_code == 302
+    assert reverse("admin:login") in response["Location"]
+
+    staff = _client("staff", is_staff=True)
+    response = staff.get(reverse("slow-queries"))
+    assert response.status_code == 200
+    assert b"core:categories" in response.content
+    assert b"SCAN" in response.content or b"SEARCH" in response.content
+
+    staff.post(reverse("slow-queries"))
+    assert not [e for e in slow_log.entries() if e.view == "core:categories"]
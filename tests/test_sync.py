@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+from rest_framework.test import APIClient
+
+from core.models import Category, Tag, Tombstone, Transaction
+from core.sync import backfill_change_sequences, prune_tombstones
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _txn(user, notes, category=None):
+    return Transaction.objects.create(
+        user=user,
+        type=Transaction.Type.EXPENSE,
+        amount="3.00",
+        date=date(2024, 6, 1),
+        notes=notes,
+        category=category,
+    )
+
+
+@pytest.mark.django_db
+def test_sync_returns_only_changes_since_token(client, user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    lunch = _txn(user, "lunch", food)
+    dinner = _txn(user, "dinner")
+
+    full = client.get("/api/sync/")
+    assert full.status_code == 200
+    assert full.data["full"] and not full.data["more"]
+    assert [row["id"] for row in full.data["changes"]["transactions"]] == [
+        lunch.id,
+        dinner.id,
+    ]
+    token = full.data["token"]
+
+    empty = client.get("/api/sync/", {"since": token})
+    assert empty.data["token"] == token
+    assert all(not rows for rows in empty.data["changes"].values())
+
+    dinner.notes = "late dinner"
+    dinner.save()
+    trip = Tag.objects.create(user=user, name="Trip")
+    food_id = food.id
+    food.delete()
+
+    delta = client.get("/api/sync/", {"since": token})
+    changes = delta.data["changes"]
+    assert [row["id"] for row in changes["transactions"]] == [dinner.id, lunch.id]
+    assert changes["transactions"][1]["category"] is None
+    assert [row["id"] for row in changes["tags"]] == [trip.id]
+    assert delta.data["deleted"]["categories"] == [food_id]
+
+    token = delta.data["token"]
+    client.post(
+        "/api/transactions/bulk/",
+        {"action": "delete", "ids": [lunch.id, dinner.id]},
+        format="json",
+    )
+    delta = client.get("/api/sync/", {"since": token})
+    assert sorted(delta.data["deleted"]["transactions"]) == sorted(
+        [lunch.id, dinner.id]
+    )
+    assert not delta.data["changes"]["transactions"]
+
+
+@pytest.mark.django_db
+def test_sync_limit_pages_through_changes(client, user):
+    rows = [_txn(user, f"row {index}") for index in range(5)]
+
+    seen, pages, token, more = [], 0, None, True
+    while more:
+        pages += 1
+        params = {"limit": 2}
+        if token is not None:
+            params["since"] = token
+        response = client.get("/api/sync/", params)
+        seen.extend(row["id"] for row in response.data["changes"]["transactions"])
+        token, more = response.data["token"], response.data["more"]
+
+    assert seen == [txn.id for txn in rows]
+
+
+@pytest.mark.django_db
+def test_sync_rejects_bad_and_expired_tokens(client, user):
+    txn = _txn(user, "old")
+    token = client.get("/api/sync/").data["token"]
+    txn.delete()
+    Tombstone.objects.update(deleted_at=date(2020, 1, 1))
+
+    assert prune_tombstones(timedelta(days=1)) == 1
+    assert client.get("/api/sync/", {"since": token}).status_code == 410
+    assert client.get("/api/sync/", {"since": "abc"}).status_code == 400
+    assert client.get("/api/sync/", {"since": "999"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_backfill_numbers_rows_that_predate_change_tracking(client, user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    rows = [_txn(user, f"row {index}") for index in range(5)]
+    latest = _txn(user, "after the migration")
+    Category.objects.update(change_seq=0)
+    Transaction.objects.exclude(pk=latest.pk).update(change_seq=0)
+
+    assert backfill_change_sequences(batch_size=2) == 6
+    assert backfill_change_sequences() == 0
+
+    # Numbered after the latest change, so the full sync pages through them.
+    seen, pages, token, more = [], 0, None, True
+    while more:
+        pages += 1
+        params = {"limit": 2}
+        if token is not None:
+            params["since"] = token
+        changes = client.get("/api/sync/", params).data
+        page = [*changes["changes"]["categories"], *changes["changes"]["transactions"]]
+        assert len(page) <= 2
+        seen.extend(row["id"] for row in changes["changes"]["transactions"])
+        token, more = changes["token"], changes["more"]
+
+    assert pages == 4
+    assert seen == [latest.id, *(txn.id for txn in rows)]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+
+from core.bulk import BulkAction, apply_bulk_action, select_transactions
+from core.models import Category, Tag, Transaction
+from core.usage import rebuild_usage_stats
+
+FIELDS = ("transaction_count", "income_total", "expense_total", "last_used")
+
+
+def _stats(user):
+    return {
+        model.__name__: sorted(
+            model.objects.filter(user=user).values_list("pk", *FIELDS)
+        )
+        for model in (Category, Tag)
+    }
+
+
+def assert_matches_rebuild(user):
+    maintained = _stats(user)
+    rebuild_usage_stats(user)
+    assert maintained == _stats(user)
+
+
+@pytest.mark.django_db
+def test_single_writes_keep_stats_current(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    fun = Category.objects.create(user=user, name="Fun", kind=Category.Kind.EXPENSE)
+    trip, work = (Tag.objects.create(user=user, name=name) for name in ("trip", "w"))
+
+    lunch = Transaction.objects.create(
+        user=user, type="EXPENSE", amount="12.50", date="2024-03-01", category=food
+    )
+    Transaction.objects.create(
+        user=user, type="EXPENSE", amount="7.00", date=date(2024, 1, 5), category=food
+    )
+    lunch.tags.set([trip, work])
+    food.refresh_from_db()
+    assert (food.transaction_count, food.expense_total) == (2, Decimal("19.50"))
+    assert food.last_used == date(2024, 3, 1)
+    assert_matches_rebuild(user)
+
+    lunch.amount = Decimal("20.00")
+    lunch.date = date(2024, 2, 1)
+    lunch.save()
+    assert_matches_rebuild(user)
+
+    lunch.category = fun
+    lunch.save()
+    lunch.tags.remove(work)
+    assert_matches_rebuild(user)
+
+    trip.transactions.clear()
+    lunch.delete()
+    assert_matches_rebuild(user)
+    fun.refresh_from_db()
+    assert (fun.transaction_count, fun.last_used) == (0, None)
+
+
+@pytest.mark.django_db
+def test_bulk_actions_keep_stats_current(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    trip = Tag.objects.create(user=user, name="trip")
+    rows = [
+        Transaction.objects.create(
+            user=user, type="EXPENSE", amount="5.00", date=date(2024, 4, day)
+        )
+        for day in range(1, 6)
+    ]
+    ids = [row.pk for row in rows]
+
+    for action, kwargs in [
+        (BulkAction.SET_CATEGORY, {"category": food}),
+        (BulkAction.ADD_TAGS, {"tags": [trip]}),
+        (BulkAction.SET_TYPE, {"txn_type": "INCOME"}),
+        (BulkAction.REMOVE_TAGS, {"tags": [trip]}),
+    ]:
+        apply_bulk_action(user, select_transactions(user, ids=ids), action, **kwargs)
+        assert_matches_rebuild(user)
+
+    apply_bulk_action(
+        user, select_transactions(user, ids=ids[:2]), BulkAction.ADD_TAGS, tags=[trip]
+    )
+    apply_bulk_action(user, select_transactions(user, ids=ids[1:]), BulkAction.DELETE)
+    assert_matches_rebuild(user)
+    trip.refresh_from_db()
+    assert (trip.transaction_count, trip.last_used) == (1, date(2024, 4, 1))
+
+
+@pytest.mark.django_db
+def test_rebuild_command_repairs_drift(user):
+    food = Category.objects.create(user=user, name="Food", kind=Category.Kind.EXPENSE)
+    Transaction.objects.create(
+        user=user, type="EXPENSE", amount="3.00", date=date(2024, 5, 1), category=food
+    )
+    Category.objects.filter(pk=food.pk).update(transaction_count=99)
+
+    call_command("rebuild_usage_stats", user=user.username, stdout=None)
+
+    food.refresh_from_db()
+    assert food.transaction_count == 1